@@ -4,12 +4,48 @@ from __future__ import annotations
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.helpers.typing import ConfigType
 
-from .api import RaypakApiClient
-from .const import CONF_POLL_INTERVAL, CONF_SERVER, CONF_TOKEN, DEFAULT_POLL_INTERVAL
-from .coordinator import RaypakDataUpdateCoordinator
+from .anomaly import RaypakAnomalyDetector, async_delete_issues
+from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_ANOMALY_DETECTION,
+    CONF_EMAIL,
+    CONF_FAST_POLL_INTERVAL,
+    CONF_FLEET_SENSORS,
+    CONF_HUB_MODE,
+    CONF_MAX_STALE_AGE,
+    CONF_PASSWORD,
+    CONF_PIN_DISCOVERY,
+    CONF_POLL_INTERVAL,
+    CONF_PUSH_UPDATES,
+    CONF_SERVER,
+    CONF_SLOW_POLL_INTERVAL,
+    CONF_TIERED_POLLING,
+    CONF_TOKEN,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_ANOMALY_DETECTION,
+    DEFAULT_FAST_POLL_INTERVAL,
+    DEFAULT_FLEET_SENSORS,
+    DEFAULT_HUB_MODE,
+    DEFAULT_MAX_STALE_AGE,
+    DEFAULT_PIN_DISCOVERY,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_PUSH_UPDATES,
+    DEFAULT_SLOW_POLL_INTERVAL,
+    DEFAULT_TIERED_POLLING,
+    DOMAIN,
+)
+from .coordinator import RaypakDataUpdateCoordinator, cache_store
+from .discovery import RaypakPinDiscovery, profile_store
+from .fleet import async_get_fleet
+from .hub import async_get_hub
+from .planner import RaypakHeatingPlanner, schedule_store
+from .services import async_setup_services
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 PLATFORMS: list[Platform] = [
     Platform.WATER_HEATER,
@@ -18,21 +54,79 @@ PLATFORMS: list[Platform] = [
 ]
 
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Raypak services."""
+    async_setup_services(hass)
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Raypak Pool Heater from a config entry."""
-    session = async_get_clientsession(hass)
-    client = RaypakApiClient(
-        session=session,
-        server=entry.data[CONF_SERVER],
-        token=entry.data[CONF_TOKEN],
-    )
+    hub = async_get_hub(hass, entry.data[CONF_SERVER])
+    client = hub.async_create_client(entry.entry_id, entry.data[CONF_TOKEN])
+    entry.async_on_unload(lambda: hub.async_release(entry.entry_id))
 
     poll_interval = entry.options.get(CONF_POLL_INTERVAL, DEFAULT_POLL_INTERVAL)
-    coordinator = RaypakDataUpdateCoordinator(hass, client, poll_interval)
-    await coordinator.async_config_entry_first_refresh()
+    hub_mode = entry.options.get(CONF_HUB_MODE, DEFAULT_HUB_MODE)
+    tiered_polling = entry.options.get(CONF_TIERED_POLLING, DEFAULT_TIERED_POLLING)
+    adaptive_bounds = None
+    if entry.options.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING):
+        adaptive_bounds = (
+            entry.options.get(CONF_FAST_POLL_INTERVAL, DEFAULT_FAST_POLL_INTERVAL),
+            entry.options.get(CONF_SLOW_POLL_INTERVAL, DEFAULT_SLOW_POLL_INTERVAL),
+        )
+    coordinator = RaypakDataUpdateCoordinator(
+        hass,
+        client,
+        poll_interval,
+        hub_mode=hub_mode,
+        tiered_polling=tiered_polling,
+        adaptive_bounds=adaptive_bounds,
+        max_stale_age=entry.options.get(CONF_MAX_STALE_AGE, DEFAULT_MAX_STALE_AGE),
+    )
+    if entry.options.get(CONF_PIN_DISCOVERY, DEFAULT_PIN_DISCOVERY):
+        coordinator.discovery = RaypakPinDiscovery(hass, coordinator, entry.entry_id)
+        await coordinator.discovery.async_load()
+    coordinator.planner = RaypakHeatingPlanner(hass, coordinator, entry.entry_id)
+    await coordinator.planner.async_load()
+    if await coordinator.async_load_cache():
+        # Start from the cached state; don't hold up startup on the cloud
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} initial refresh"
+        )
+    else:
+        await coordinator.async_config_entry_first_refresh()
+
+    if hub_mode:
+        entry.async_on_unload(hub.async_add_coordinator(entry.entry_id, coordinator))
+
+    fleet = async_get_fleet(hass)
+    entry.async_on_unload(fleet.async_add_coordinator(entry.entry_id, coordinator))
+
+    if (
+        entry.options.get(CONF_PUSH_UPDATES, DEFAULT_PUSH_UPDATES)
+        and CONF_EMAIL in entry.data
+    ):
+        entry.async_on_unload(
+            hub.async_add_stream_coordinator(
+                entry.data[CONF_TOKEN],
+                coordinator,
+                entry.data[CONF_EMAIL],
+                entry.data[CONF_PASSWORD],
+            )
+        )
 
     entry.runtime_data = coordinator
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    coordinator.platforms = _async_enabled_platforms(hass, entry)
+    await hass.config_entries.async_forward_entry_setups(
+        entry, coordinator.platforms
+    )
+    if coordinator.discovery is not None:
+        entry.async_on_unload(coordinator.discovery.async_start())
+    entry.async_on_unload(coordinator.planner.async_start())
+    if entry.options.get(CONF_ANOMALY_DETECTION, DEFAULT_ANOMALY_DETECTION):
+        coordinator.anomalies = RaypakAnomalyDetector(hass, coordinator, entry)
+        entry.async_on_unload(coordinator.anomalies.async_start())
 
     entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
@@ -41,7 +135,41 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    return await hass.config_entries.async_unload_platforms(
+        entry, entry.runtime_data.platforms
+    )
+
+
+@callback
+def _async_enabled_platforms(hass: HomeAssistant, entry: ConfigEntry) -> list[str]:
+    """Return the platforms that have an entity to set up.
+
+    A platform is skipped when every entity it registered for this entry is
+    disabled, so neither the platform nor its descriptions are loaded. A
+    platform with nothing registered yet is always set up, so new entities
+    get created, as is the sensor platform when fleet sensors are turned on.
+    """
+    enabled: set[str] = set()
+    disabled: set[str] = set()
+    for entity in er.async_entries_for_config_entry(
+        er.async_get(hass), entry.entry_id
+    ):
+        (disabled if entity.disabled else enabled).add(entity.domain)
+    if entry.options.get(CONF_FLEET_SENSORS, DEFAULT_FLEET_SENSORS):
+        enabled.add(Platform.SENSOR)
+    return [
+        platform
+        for platform in PLATFORMS
+        if platform in enabled or platform not in disabled
+    ]
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the stored data and anomaly repair issues of a removed entry."""
+    await cache_store(hass, entry.entry_id).async_remove()
+    await profile_store(hass, entry.entry_id).async_remove()
+    await schedule_store(hass, entry.entry_id).async_remove()
+    async_delete_issues(hass, entry.entry_id)
 
 
 async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
@@ -0,0 +1,343 @@
+"""Streaming fault and anomaly detection for Raypak pool heater."""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import issue_registry as ir
+
+from .const import (
+    ANOMALY_BASELINE_ALPHA,
+    ANOMALY_CLEAR_Z,
+    ANOMALY_FAST_ALPHA,
+    ANOMALY_WARMUP_SAMPLES,
+    ANOMALY_Z,
+    DOMAIN,
+    EVENT_ANOMALY,
+    PIN_FLAME_CURRENT,
+    PIN_FLOW_PRESSURE,
+    PIN_FLUE_TEMP,
+    PIN_HEATING_CYCLES,
+    PIN_INLET_TEMP,
+    PIN_OUTLET_TEMP,
+    SHORT_CYCLE_COUNT,
+    SHORT_CYCLE_WINDOW,
+    to_float_1,
+    to_float_2,
+    to_int,
+)
+from .coordinator import (
+    SLOT_FIRING_RATE,
+    SLOT_INLET_TEMP,
+    RaypakDataUpdateCoordinator,
+)
+from .snapshot import SNAPSHOT_SCHEMA
+
+_LOGGER = logging.getLogger(__name__)
+
+SLOT_FLAME_CURRENT = SNAPSHOT_SCHEMA.slot(PIN_FLAME_CURRENT, to_float_1)
+SLOT_FLUE_TEMP = SNAPSHOT_SCHEMA.slot(PIN_FLUE_TEMP, to_float_1)
+SLOT_OUTLET_TEMP = SNAPSHOT_SCHEMA.slot(PIN_OUTLET_TEMP, to_float_1)
+SLOT_FLOW_PRESSURE = SNAPSHOT_SCHEMA.slot(PIN_FLOW_PRESSURE, to_float_2)
+SLOT_HEATING_CYCLES = SNAPSHOT_SCHEMA.slot(PIN_HEATING_CYCLES, to_int)
+
+# Live pins the detectors read, fetched on every tiered poll
+ANOMALY_PINS = (
+    PIN_FLAME_CURRENT,
+    PIN_FLUE_TEMP,
+    PIN_OUTLET_TEMP,
+    PIN_INLET_TEMP,
+    PIN_FLOW_PRESSURE,
+)
+
+ANOMALY_SHORT_CYCLING = "short_cycling"
+
+
+class Ewma:
+    """Exponentially weighted moving mean and variance, O(1) per sample."""
+
+    __slots__ = ("alpha", "count", "mean", "variance")
+
+    def __init__(self, alpha: float) -> None:
+        """Initialize the average."""
+        self.alpha = alpha
+        self.count = 0
+        self.mean = 0.0
+        self.variance = 0.0
+
+    @property
+    def std(self) -> float:
+        """Return the weighted standard deviation."""
+        return math.sqrt(self.variance)
+
+    def update(self, value: float) -> None:
+        """Add a sample."""
+        if not self.count:
+            self.mean = value
+        else:
+            diff = value - self.mean
+            increment = self.alpha * diff
+            self.mean += increment
+            self.variance = (1 - self.alpha) * (self.variance + diff * increment)
+        self.count += 1
+
+
+class AnomalySpec(NamedTuple):
+    """A signal watched for drifting away from its own baseline.
+
+    ``direction`` is -1 to flag drops and 1 to flag rises. A deviation is
+    only flagged when it is at least ``min_deviation`` in the signal's
+    unit, so a very steady baseline doesn't turn noise into anomalies.
+    """
+
+    key: str
+    value_fn: Callable[[list[Any]], float | None]
+    direction: int
+    min_deviation: float
+    firing_only: bool
+
+
+def _delta_t(values: list[Any]) -> float | None:
+    """Return outlet minus inlet temperature."""
+    outlet, inlet = values[SLOT_OUTLET_TEMP], values[SLOT_INLET_TEMP]
+    if outlet is None or inlet is None:
+        return None
+    return outlet - inlet
+
+
+ANOMALY_SPECS: tuple[AnomalySpec, ...] = (
+    # Weakening flame sense comes before ignition lockouts
+    AnomalySpec(
+        "flame_current_low",
+        lambda values: values[SLOT_FLAME_CURRENT],
+        direction=-1,
+        min_deviation=0.3,
+        firing_only=True,
+    ),
+    # A hotter flue for the same firing points to a fouled heat exchanger
+    AnomalySpec(
+        "flue_temperature_high",
+        lambda values: values[SLOT_FLUE_TEMP],
+        direction=1,
+        min_deviation=15.0,
+        firing_only=True,
+    ),
+    # A wider delta-T for the same firing means less water is flowing
+    AnomalySpec(
+        "delta_t_high",
+        _delta_t,
+        direction=1,
+        min_deviation=5.0,
+        firing_only=True,
+    ),
+    AnomalySpec(
+        "flow_pressure_low",
+        lambda values: values[SLOT_FLOW_PRESSURE],
+        direction=-1,
+        min_deviation=0.5,
+        firing_only=False,
+    ),
+)
+
+
+class _Signal:
+    """Baseline and recent level of one watched signal."""
+
+    __slots__ = ("active", "baseline", "recent", "spec")
+
+    def __init__(self, spec: AnomalySpec) -> None:
+        """Initialize the signal."""
+        self.spec = spec
+        self.baseline = Ewma(ANOMALY_BASELINE_ALPHA)
+        self.recent = Ewma(ANOMALY_FAST_ALPHA)
+        self.active = False
+
+    def update(self, value: float) -> bool | None:
+        """Add a sample; return the new state if it flipped, else None."""
+        self.baseline.update(value)
+        self.recent.update(value)
+        if self.baseline.count < ANOMALY_WARMUP_SAMPLES:
+            return None
+        deviation = self.spec.direction * (self.recent.mean - self.baseline.mean)
+        z = deviation / max(self.baseline.std, 1e-9)
+        if not self.active and z >= ANOMALY_Z and deviation >= self.spec.min_deviation:
+            self.active = True
+            return True
+        if self.active and z < ANOMALY_CLEAR_Z:
+            self.active = False
+            return False
+        return None
+
+
+class RaypakAnomalyDetector:
+    """Flag heater problems from each poll, before the heater trips.
+
+    Each watched signal keeps a slow EWMA as its baseline and a fast EWMA
+    of recent samples. An anomaly starts when the recent level is
+    ANOMALY_Z baseline standard deviations out in the bad direction, and
+    ends when it is back within ANOMALY_CLEAR_Z. Short cycling is flagged
+    when SHORT_CYCLE_COUNT heating cycles (v45) start within
+    SHORT_CYCLE_WINDOW. Everything is read from polled data, so no extra
+    requests are made, and each poll costs O(1).
+
+    Starting or clearing an anomaly fires a ``raypak_anomaly`` event and
+    creates or deletes a repair issue.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: RaypakDataUpdateCoordinator,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the detector."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.entry = entry
+        self._signals = [_Signal(spec) for spec in ANOMALY_SPECS]
+        self._last_cycles: int | None = None
+        self._cycle_starts: deque[float] = deque(maxlen=SHORT_CYCLE_COUNT)
+        self._short_cycling = False
+        self._last_poll = 0
+
+    @property
+    def active(self) -> list[str]:
+        """Return the anomalies currently flagged."""
+        active = [signal.spec.key for signal in self._signals if signal.active]
+        if self._short_cycling:
+            active.append(ANOMALY_SHORT_CYCLING)
+        return active
+
+    @property
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the baselines for diagnostics."""
+        return {
+            "active": self.active,
+            "signals": {
+                signal.spec.key: {
+                    "samples": signal.baseline.count,
+                    "baseline": round(signal.baseline.mean, 2),
+                    "baseline_std": round(signal.baseline.std, 3),
+                    "recent": round(signal.recent.mean, 2),
+                }
+                for signal in self._signals
+            },
+        }
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start watching coordinator updates; return a stop callback."""
+        unsub_listener = self.coordinator.async_add_listener(self._async_sample)
+        unsub_pins = self.coordinator.async_track_pins(ANOMALY_PINS)
+
+        @callback
+        def _async_stop() -> None:
+            unsub_listener()
+            unsub_pins()
+            # Baselines are relearned from scratch, so flags don't carry over
+            async_delete_issues(self.hass, self.entry.entry_id)
+
+        return _async_stop
+
+    @callback
+    def _async_sample(self) -> None:
+        """Run every detector on the latest poll."""
+        coordinator = self.coordinator
+        if coordinator.data is None or coordinator.stale:
+            return
+        if not coordinator.last_update_success:
+            return
+        # Commands, pushes and skipped polls repeat held values, which
+        # would narrow the baselines
+        if coordinator.polls == self._last_poll:
+            return
+        self._last_poll = coordinator.polls
+        values = coordinator.data.values
+        firing = (values[SLOT_FIRING_RATE] or 0) > 0
+        for signal in self._signals:
+            if signal.spec.firing_only and not firing:
+                continue
+            if (value := signal.spec.value_fn(values)) is None:
+                continue
+            flipped = signal.update(value)
+            if flipped is not None:
+                self._async_report(
+                    signal.spec.key,
+                    flipped,
+                    {
+                        "value": round(signal.recent.mean, 2),
+                        "baseline": round(signal.baseline.mean, 2),
+                    },
+                )
+        self._check_short_cycling(values[SLOT_HEATING_CYCLES])
+
+    @callback
+    def _check_short_cycling(self, cycles: int | None) -> None:
+        """Track heating cycle starts and flag too many in the window."""
+        if cycles is None:
+            return
+        now = time.monotonic()
+        if self._last_cycles is not None and cycles > self._last_cycles:
+            for _ in range(min(cycles - self._last_cycles, SHORT_CYCLE_COUNT)):
+                self._cycle_starts.append(now)
+        self._last_cycles = cycles
+        short_cycling = (
+            len(self._cycle_starts) == SHORT_CYCLE_COUNT
+            and now - self._cycle_starts[0] <= SHORT_CYCLE_WINDOW
+        )
+        if short_cycling != self._short_cycling:
+            self._short_cycling = short_cycling
+            self._async_report(
+                ANOMALY_SHORT_CYCLING,
+                short_cycling,
+                {
+                    "value": str(SHORT_CYCLE_COUNT),
+                    "baseline": str(SHORT_CYCLE_WINDOW // 60),
+                },
+            )
+
+    @callback
+    def _async_report(self, key: str, active: bool, details: dict[str, Any]) -> None:
+        """Fire an event and raise or clear the repair issue for an anomaly."""
+        entry_id = self.entry.entry_id
+        issue_id = _issue_id(key, entry_id)
+        self.hass.bus.async_fire(
+            EVENT_ANOMALY,
+            {"entry_id": entry_id, "anomaly": key, "active": active, **details},
+        )
+        if not active:
+            _LOGGER.info("%s: %s cleared", self.entry.title, key)
+            ir.async_delete_issue(self.hass, DOMAIN, issue_id)
+            return
+        _LOGGER.warning("%s: %s detected (%s)", self.entry.title, key, details)
+        ir.async_create_issue(
+            self.hass,
+            DOMAIN,
+            issue_id,
+            is_fixable=False,
+            severity=ir.IssueSeverity.WARNING,
+            translation_key=f"anomaly_{key}",
+            translation_placeholders={
+                "name": self.entry.title,
+                **{name: str(value) for name, value in details.items()},
+            },
+        )
+
+
+def _issue_id(key: str, entry_id: str) -> str:
+    """Return the repair issue id for an anomaly on a heater."""
+    return f"anomaly_{key}_{entry_id}"
+
+
+@callback
+def async_delete_issues(hass: HomeAssistant, entry_id: str) -> None:
+    """Delete the anomaly repair issues of a heater."""
+    for key in (*(spec.key for spec in ANOMALY_SPECS), ANOMALY_SHORT_CYCLING):
+        ir.async_delete_issue(hass, DOMAIN, _issue_id(key, entry_id))
@@ -3,9 +3,143 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import functools
+import heapq
+import itertools
+import json
+import random
+import ssl
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Mapping
+from enum import IntEnum, StrEnum
 from typing import Any
 
 import aiohttp
+from yarl import URL
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - Home Assistant ships orjson
+    orjson = None
+
+from .metrics import (
+    CIRCUIT_OPEN,
+    ERRORS,
+    REQUESTS,
+    THROTTLED,
+    TIMEOUTS,
+    RaypakMetrics,
+    create_trace_config,
+)
+
+ENDPOINTS = ("getAll", "get", "update", "batch/update", "isHardwareConnected")
+
+# Connection pool tuning: every request goes to the same host, so keep a few
+# connections alive between polls instead of paying a TLS handshake each time
+CONNECTION_LIMIT_PER_HOST = 8
+KEEPALIVE_TIMEOUT = 120
+DNS_CACHE_TTL = 600
+
+# Request budget per server: sustained requests per second and burst size
+RATE_LIMIT_PER_SECOND = 5.0
+RATE_LIMIT_BURST = 10
+# Seconds assumed for a 429 without a Retry-After header
+DEFAULT_RETRY_AFTER = 10.0
+
+
+# Circuit breaker: consecutive failures that open it, and the jittered
+# exponential backoff before a half-open probe (seconds)
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_BASE_DELAY = 10.0
+BREAKER_MAX_DELAY = 600.0
+
+# Adaptive timeout: a multiple of the p99 latency of recent requests, within
+# bounds (seconds). The upper bound is used until enough samples exist.
+LATENCY_SAMPLES = 100
+MIN_LATENCY_SAMPLES = 10
+TIMEOUT_P99_FACTOR = 3.0
+MIN_REQUEST_TIMEOUT = 2.0
+MAX_REQUEST_TIMEOUT = 10.0
+
+
+class RequestPriority(IntEnum):
+    """Order in which queued requests get the rate limiter's budget."""
+
+    COMMAND = 0
+    POLL = 1
+    COUNTERS = 2
+
+
+# Longest a request of each priority may queue before it is shed (seconds)
+MAX_QUEUE_WAIT: dict[RequestPriority, float] = {
+    RequestPriority.COMMAND: 30.0,
+    RequestPriority.POLL: 10.0,
+    RequestPriority.COUNTERS: 2.0,
+}
+
+
+def server_base_url(server: str) -> str:
+    """Return the base URL for a server, defaulting to HTTPS.
+
+    A server given with an explicit scheme, such as a local test server at
+    http://127.0.0.1:8080, is used as is.
+    """
+    return server if "://" in server else f"https://{server}"
+
+
+PinTypes = Mapping[str, Callable[[Any], Any]]
+
+_json_loads: Callable[[bytes], Any] = orjson.loads if orjson else json.loads
+
+
+def decode_pins(body: bytes, pin_types: PinTypes) -> dict[str, Any]:
+    """Decode a getAll body, keeping and typing only the given pins.
+
+    Pins are converted once here, so decoders downstream get numbers
+    instead of parsing strings again. A value that doesn't convert is
+    kept as is and left to the decoder.
+    """
+    try:
+        data = _json_loads(body)
+    except ValueError as err:
+        raise RaypakApiError(f"Invalid JSON in getAll response: {err}") from err
+    if not isinstance(data, dict):
+        raise RaypakApiError(f"Unexpected response type: {type(data)}")
+    return {
+        pin: convert_pin(value, convert)
+        for pin, convert in pin_types.items()
+        if (value := data.get(pin)) is not None
+    }
+
+
+def convert_pin(value: Any, convert: Callable[[Any], Any] | None) -> Any:
+    """Convert a pin value to its type, keeping it as is if it doesn't fit."""
+    if convert is None or isinstance(value, convert):
+        return value
+    try:
+        return convert(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def create_session(ssl_context: ssl.SSLContext | bool = True) -> aiohttp.ClientSession:
+    """Create a session whose pool keeps RayMoTe connections warm.
+
+    aiohttp doesn't pipeline HTTP/1.1 requests, so reuse comes from
+    keep-alive connections held open across poll intervals.
+    """
+    connector = aiohttp.TCPConnector(
+        ssl=ssl_context,
+        limit_per_host=CONNECTION_LIMIT_PER_HOST,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        enable_cleanup_closed=True,
+    )
+    return aiohttp.ClientSession(
+        connector=connector, trace_configs=[create_trace_config()]
+    )
 
 
 class RaypakApiError(Exception):
@@ -16,6 +150,217 @@ class RaypakAuthError(RaypakApiError):
     """Authentication error."""
 
 
+class RaypakRateLimitedError(RaypakApiError):
+    """Request shed by the rate limiter or throttled by the server."""
+
+
+class RaypakCircuitOpenError(RaypakApiError):
+    """Request refused because the server is considered down."""
+
+
+class BreakerState(StrEnum):
+    """Circuit breaker states."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class RaypakCircuitBreaker:
+    """Stops requests to a server that keeps failing, shared per server.
+
+    After BREAKER_FAILURE_THRESHOLD consecutive failures the breaker opens
+    and requests fail immediately. After a jittered, exponentially growing
+    delay, a single probe request is let through (half-open). Its success
+    closes the breaker; its failure opens it again for longer.
+
+    The breaker also tracks request latency and derives the request timeout
+    from the recent p99 instead of always waiting the full bound.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the breaker."""
+        self.state = BreakerState.CLOSED
+        self.consecutive_failures = 0
+        self._open_count = 0
+        self._retry_at = 0.0
+        self._probe_in_flight = False
+        self._latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.timeout = MAX_REQUEST_TIMEOUT
+
+    @property
+    def retry_in(self) -> float:
+        """Return seconds until an open breaker allows a probe."""
+        if self.state is not BreakerState.OPEN:
+            return 0.0
+        return max(0.0, self._retry_at - time.monotonic())
+
+    @property
+    def metrics(self) -> dict[str, Any]:
+        """Return breaker state for diagnostics."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in": round(self.retry_in, 1),
+            "timeout": round(self.timeout, 2),
+        }
+
+    def before_request(self) -> bool:
+        """Raise RaypakCircuitOpenError if a request may not be sent now.
+
+        Returns True if the request is the half-open probe, which must then
+        be released with release_probe once it is over.
+        """
+        if self.state is BreakerState.OPEN:
+            if time.monotonic() < self._retry_at:
+                raise RaypakCircuitOpenError(
+                    f"Server unavailable, retrying in {self.retry_in:.0f}s"
+                )
+            self.state = BreakerState.HALF_OPEN
+        if self.state is BreakerState.HALF_OPEN:
+            if self._probe_in_flight:
+                raise RaypakCircuitOpenError("Server unavailable, probe in progress")
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """Allow another half-open probe once the current request is over."""
+        self._probe_in_flight = False
+
+    def record_success(self, latency: float) -> None:
+        """Close the breaker and fold a latency sample into the timeout."""
+        self.state = BreakerState.CLOSED
+        self.consecutive_failures = 0
+        self._open_count = 0
+        self._latencies.append(latency)
+        if len(self._latencies) >= MIN_LATENCY_SAMPLES:
+            ordered = sorted(self._latencies)
+            p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+            self.timeout = min(
+                MAX_REQUEST_TIMEOUT,
+                max(MIN_REQUEST_TIMEOUT, p99 * TIMEOUT_P99_FACTOR),
+            )
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the breaker past the threshold."""
+        self.consecutive_failures += 1
+        if (
+            self.state is BreakerState.HALF_OPEN
+            or self.consecutive_failures >= BREAKER_FAILURE_THRESHOLD
+        ):
+            self._open_count += 1
+            delay = min(
+                BREAKER_MAX_DELAY, BREAKER_BASE_DELAY * 2 ** (self._open_count - 1)
+            )
+            self._retry_at = time.monotonic() + random.uniform(delay / 2, delay)
+            self.state = BreakerState.OPEN
+
+
+class RaypakRateLimiter:
+    """Token bucket with priority queueing, shared by clients on one server.
+
+    Requests take a token when one is free. Otherwise they queue, and
+    tokens go to the highest-priority waiter first. A request whose
+    expected wait exceeds MAX_QUEUE_WAIT for its priority is shed instead.
+    """
+
+    def __init__(
+        self,
+        rate: float = RATE_LIMIT_PER_SECOND,
+        burst: int = RATE_LIMIT_BURST,
+    ) -> None:
+        """Initialize the limiter."""
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._wakeup: asyncio.TimerHandle | None = None
+        self.granted = 0
+        self.queued = 0
+        self.shed = 0
+        self.throttled = 0
+
+    @property
+    def metrics(self) -> dict[str, Any]:
+        """Return limiter counters for diagnostics."""
+        self._refill()
+        return {
+            "tokens": round(self._tokens, 2),
+            "waiting": sum(not future.done() for *_, future in self._waiters),
+            "granted": self.granted,
+            "queued": self.queued,
+            "shed": self.shed,
+            "throttled": self.throttled,
+        }
+
+    def _refill(self) -> None:
+        """Add the tokens accrued since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(
+            self._burst, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    async def acquire(self, priority: RequestPriority) -> None:
+        """Wait for a token, or raise RaypakRateLimitedError if shed."""
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            self.granted += 1
+            return
+
+        ahead = sum(
+            1
+            for waiter_priority, _, future in self._waiters
+            if waiter_priority <= priority and not future.done()
+        )
+        expected_wait = (ahead + 1 - self._tokens) / self._rate
+        if expected_wait > MAX_QUEUE_WAIT[priority]:
+            self.shed += 1
+            raise RaypakRateLimitedError(
+                f"Request budget exhausted, shed {priority.name.lower()} request"
+            )
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self.queued += 1
+        self._schedule_wakeup()
+        await future
+
+    def penalize(self, retry_after: float) -> None:
+        """Stop granting tokens for a while after the server throttled us."""
+        self._refill()
+        self.throttled += 1
+        self._tokens = min(self._tokens, 0) - retry_after * self._rate
+
+    def _schedule_wakeup(self) -> None:
+        """Wake queued requests when the next token is due."""
+        if self._wakeup is not None:
+            return
+        delay = max(0.0, (1 - self._tokens) / self._rate)
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._release)
+
+    def _release(self) -> None:
+        """Hand accrued tokens to the highest-priority waiters."""
+        self._wakeup = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            *_, future = heapq.heappop(self._waiters)
+            if future.done():  # cancelled while queued
+                continue
+            self._tokens -= 1
+            self.granted += 1
+            future.set_result(None)
+        # Drop cancelled waiters so they don't hold the queue open
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        if self._waiters:
+            self._schedule_wakeup()
+
+
 class RaypakApiClient:
     """Async HTTP client for the Raypak/Blynk API."""
 
@@ -24,51 +369,184 @@ class RaypakApiClient:
         session: aiohttp.ClientSession,
         server: str,
         token: str,
+        request_semaphore: asyncio.Semaphore | None = None,
+        rate_limiter: RaypakRateLimiter | None = None,
+        circuit_breaker: RaypakCircuitBreaker | None = None,
     ) -> None:
         """Initialize the API client."""
         self._session = session
-        self._base_url = f"https://{server}/external/api"
+        self._base_url = f"{server_base_url(server)}/external/api"
         self._token = token
+        self._request_semaphore = request_semaphore
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker or RaypakCircuitBreaker()
+        self.metrics = RaypakMetrics()
+        # Pins to keep from getAll and how to type them; None keeps them all
+        self.pin_types: PinTypes | None = None
+        # Request templates, built once so polls only add pin parameters
+        self._urls = {
+            endpoint: URL(f"{self._base_url}/{endpoint}") for endpoint in ENDPOINTS
+        }
+        self._token_params = {"token": token}
 
-    async def _request(self, endpoint: str, params: dict[str, Any] | None = None) -> Any:
-        """Make an API request."""
-        url = f"{self._base_url}/{endpoint}"
-        request_params = {"token": self._token}
-        if params:
-            request_params.update(params)
+    async def _request(
+        self,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        priority: RequestPriority = RequestPriority.POLL,
+        decoder: Callable[[bytes], Any] | None = None,
+    ) -> Any:
+        """Make an API request.
 
+        The body is parsed as JSON or text by content type, unless a decoder
+        for the raw bytes is given.
+        """
+        url = self._urls[endpoint]
+        request_params = (
+            {**self._token_params, **params} if params else self._token_params
+        )
+
+        breaker = self.circuit_breaker
+        try:
+            probe = breaker.before_request()
+        except RaypakCircuitOpenError:
+            self.metrics.count(CIRCUIT_OPEN)
+            raise
         try:
-            async with asyncio.timeout(10):
-                resp = await self._session.get(url, params=request_params)
-        except asyncio.TimeoutError as err:
-            raise RaypakApiError(f"Timeout connecting to {url}") from err
-        except aiohttp.ClientError as err:
-            raise RaypakApiError(f"Error connecting to {url}: {err}") from err
-
-        if resp.status == 401:
-            raise RaypakAuthError("Invalid token")
-        if resp.status != 200:
-            raise RaypakApiError(f"API returned status {resp.status}")
-
-        content_type = resp.content_type or ""
-        if "json" in content_type:
-            return await resp.json()
-        return await resp.text()
-
-    async def async_get_all(self) -> dict[str, Any]:
-        """Get all pin values."""
-        result = await self._request("getAll")
+            return await self._send(url, request_params, priority, decoder)
+        except RaypakRateLimitedError:
+            self.metrics.count(THROTTLED)
+            raise
+        except RaypakApiError:
+            self.metrics.count(ERRORS)
+            raise
+        finally:
+            # A probe that was shed or cancelled must not block the next one
+            if probe:
+                breaker.release_probe()
+
+    async def _send(
+        self,
+        url: str,
+        request_params: dict[str, str],
+        priority: RequestPriority,
+        decoder: Callable[[bytes], Any] | None,
+    ) -> Any:
+        """Send one request within the rate limit and the breaker's timeout."""
+        breaker = self.circuit_breaker
+        metrics = self.metrics
+        queued = time.monotonic()
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(priority)
+        async with self._request_semaphore or contextlib.nullcontext():
+            start = time.monotonic()
+            metrics.record_duration("queue_wait", start - queued)
+            metrics.count(REQUESTS)
+            try:
+                async with asyncio.timeout(breaker.timeout), self._session.get(
+                    url, params=request_params, trace_request_ctx=metrics
+                ) as resp:
+                    metrics.count(f"status_{resp.status}")
+                    if resp.status >= 500:
+                        breaker.record_failure()
+                        raise RaypakApiError(f"API returned status {resp.status}")
+                    if resp.status == 429:
+                        # Neither up nor down: leave the breaker and timeout
+                        if self.rate_limiter is not None:
+                            self.rate_limiter.penalize(_retry_after(resp))
+                        raise RaypakRateLimitedError("API throttled the request")
+                    # Any other answer means the server is up
+                    breaker.record_success(time.monotonic() - start)
+                    if resp.status == 401:
+                        raise RaypakAuthError("Invalid token")
+                    if resp.status != 200:
+                        raise RaypakApiError(f"API returned status {resp.status}")
+
+                    body = await resp.read()
+                    metrics.record_duration("request", time.monotonic() - start)
+                    metrics.record_size("response", len(body))
+                    with metrics.span("decode"):
+                        if decoder is not None:
+                            return decoder(body)
+                        return _decode_body(resp, body)
+            except asyncio.TimeoutError as err:
+                breaker.record_failure()
+                metrics.count(TIMEOUTS)
+                raise RaypakApiError(f"Timeout connecting to {url}") from err
+            except aiohttp.ClientError as err:
+                breaker.record_failure()
+                raise RaypakApiError(f"Error connecting to {url}: {err}") from err
+
+    async def async_get_all(
+        self, priority: RequestPriority = RequestPriority.POLL
+    ) -> dict[str, Any]:
+        """Get all pin values, or only the typed pins if pin_types is set."""
+        decoder = None
+        if (pin_types := self.pin_types) is not None:
+            decoder = functools.partial(decode_pins, pin_types=pin_types)
+        with self.metrics.span("get_all"):
+            result = await self._request("getAll", priority=priority, decoder=decoder)
         if not isinstance(result, dict):
             raise RaypakApiError(f"Unexpected response type: {type(result)}")
         return result
 
+    async def async_get_pins(
+        self,
+        pins: Iterable[str],
+        priority: RequestPriority = RequestPriority.POLL,
+    ) -> dict[str, Any]:
+        """Get the values of selected pins in one batched request."""
+        pins = list(pins)
+        result = await self._request("get", dict.fromkeys(pins, ""), priority)
+        if not isinstance(result, dict):
+            # A single-pin get returns the bare value rather than an object
+            if len(pins) != 1:
+                raise RaypakApiError(f"Unexpected response type: {type(result)}")
+            if isinstance(result, list) and len(result) == 1:
+                result = result[0]
+            result = {pins[0]: result}
+        if (pin_types := self.pin_types) is None:
+            return result
+        return {
+            pin: convert_pin(value, pin_types.get(pin)) for pin, value in result.items()
+        }
+
     async def async_update_pin(self, pin: str, value: Any) -> None:
         """Update a pin value."""
-        await self._request("update", {pin: str(value)})
+        await self._request("update", {pin: str(value)}, RequestPriority.COMMAND)
+
+    async def async_update_pins(self, values: Mapping[str, Any]) -> None:
+        """Update several pin values in one request."""
+        await self._request(
+            "batch/update",
+            {pin: str(value) for pin, value in values.items()},
+            RequestPriority.COMMAND,
+        )
 
     async def async_is_connected(self) -> bool:
         """Check if the hardware is connected."""
-        result = await self._request("isHardwareConnected")
+        result = await self._request(
+            "isHardwareConnected", priority=RequestPriority.COUNTERS
+        )
         if isinstance(result, bool):
             return result
         return str(result).strip().lower() == "true"
+
+
+def _decode_body(resp: aiohttp.ClientResponse, body: bytes) -> Any:
+    """Decode a response body as JSON or text, by its content type."""
+    text = body.decode(resp.charset or "utf-8", errors="replace")
+    if "json" in (resp.content_type or ""):
+        try:
+            return json.loads(text)
+        except ValueError as err:
+            raise RaypakApiError(f"Invalid JSON from {resp.url}: {err}") from err
+    return text
+
+
+def _retry_after(resp: aiohttp.ClientResponse) -> float:
+    """Return the seconds a 429 response asks us to wait."""
+    try:
+        return float(resp.headers.get("Retry-After", DEFAULT_RETRY_AFTER))
+    except ValueError:
+        return DEFAULT_RETRY_AFTER
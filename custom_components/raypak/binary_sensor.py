@@ -2,17 +2,49 @@
 
 from __future__ import annotations
 
-from homeassistant.components.binary_sensor import BinarySensorEntity
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import (
-    BINARY_SENSOR_DESCRIPTIONS,
-    RaypakBinarySensorEntityDescription,
-)
+from .const import PIN_VSP_RUN_STATUS, to_flag
 from .coordinator import RaypakDataUpdateCoordinator
-from .entity import RaypakEntity
+from .entity import RaypakEntity, async_entity_disabled
+from .snapshot import SNAPSHOT_SCHEMA
+
+
+@dataclass(frozen=True, kw_only=True)
+class RaypakBinarySensorEntityDescription(BinarySensorEntityDescription):
+    """Describes a Raypak binary sensor entity."""
+
+    pin: str | None = None
+    value_fn: Callable[[Any], bool] = lambda x: bool(x)
+
+
+BINARY_SENSOR_DESCRIPTIONS: tuple[RaypakBinarySensorEntityDescription, ...] = (
+    RaypakBinarySensorEntityDescription(
+        key="hardware_connected",
+        translation_key="hardware_connected",
+        device_class=BinarySensorDeviceClass.CONNECTIVITY,
+        pin=None,
+    ),
+    RaypakBinarySensorEntityDescription(
+        key="vsp_run_status",
+        translation_key="vsp_run_status",
+        device_class=BinarySensorDeviceClass.RUNNING,
+        pin=PIN_VSP_RUN_STATUS,
+        value_fn=to_flag,
+    ),
+)
 
 
 async def async_setup_entry(
@@ -20,12 +52,17 @@ async def async_setup_entry(
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
-    """Set up Raypak binary sensor entities."""
+    """Set up Raypak binary sensor entities, skipping disabled ones."""
     coordinator: RaypakDataUpdateCoordinator = entry.runtime_data
-    async_add_entities(
+    entities = [
         RaypakBinarySensor(coordinator, entry.entry_id, description)
         for description in BINARY_SENSOR_DESCRIPTIONS
-    )
+        if not async_entity_disabled(
+            hass, Platform.BINARY_SENSOR, f"{entry.entry_id}_{description.key}"
+        )
+    ]
+    coordinator.async_sync_schema()
+    async_add_entities(entities)
 
 
 class RaypakBinarySensor(RaypakEntity, BinarySensorEntity):
@@ -43,6 +80,15 @@ class RaypakBinarySensor(RaypakEntity, BinarySensorEntity):
         super().__init__(coordinator, entry_id)
         self.entity_description = description
         self._attr_unique_id = f"{entry_id}_{description.key}"
+        if description.pin is not None:
+            self._pins = (description.pin,)
+            self._slot = SNAPSHOT_SCHEMA.slot(description.pin, description.value_fn)
+
+    def _coordinator_data_changed(self) -> bool:
+        """Return True if the last poll changed this sensor's value."""
+        if self.entity_description.pin is None:
+            return self.coordinator.connected_changed
+        return super()._coordinator_data_changed()
 
     @property
     def is_on(self) -> bool | None:
@@ -50,10 +96,4 @@ class RaypakBinarySensor(RaypakEntity, BinarySensorEntity):
         if self.entity_description.pin is None:
             # Hardware connected — use coordinator property
             return self.coordinator.connected
-        raw = self.coordinator.data.get(self.entity_description.pin)
-        if raw is None:
-            return None
-        try:
-            return self.entity_description.value_fn(raw)
-        except (ValueError, TypeError):
-            return None
+        return self.coordinator.data.values[self._slot]
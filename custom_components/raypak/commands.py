@@ -0,0 +1,376 @@
+"""Debounced, batched pin writes for Raypak pool heater."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterable
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import issue_registry as ir
+from homeassistant.helpers.event import async_call_later
+
+from .api import RaypakApiError, RaypakAuthError, RequestPriority
+from .const import (
+    COMMAND_DEBOUNCE_DELAY,
+    COMMAND_MAX_DELAY,
+    COMMAND_VERIFY_DEADLINE,
+    COMMAND_VERIFY_DELAY,
+    DOMAIN,
+)
+from .metrics import COMMAND_RETRIES
+
+if TYPE_CHECKING:
+    from .coordinator import RaypakDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RaypakCommandQueue:
+    """Coalesces pin writes, shows them optimistically and verifies them.
+
+    Each queued write restarts a short debounce timer, so dragging the
+    thermostat only sends the final value. Writes to different pins that
+    land in the same window go out as a single batched update.
+
+    Queued values are shown immediately. A failed send is raised to the
+    callers waiting on it, or reported as a repair issue if none are. Once
+    sent, values are confirmed by reading back just the written pins,
+    retrying with exponential backoff. Values the heater hasn't reported
+    COMMAND_VERIFY_DEADLINE after their own send are reverted to what it
+    does report, or to a fresh poll if the read-back failed, and a repair
+    issue is raised.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, coordinator: RaypakDataUpdateCoordinator
+    ) -> None:
+        """Initialize the command queue."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self._pending: dict[str, Any] = {}
+        # Callers waiting for the pending writes to be sent
+        self._waiters: list[asyncio.Future[None]] = []
+        self._first_queued: float | None = None
+        self._unsub_flush: CALLBACK_TYPE | None = None
+        self._lock = asyncio.Lock()
+        # Commanded values shown before the heater confirms them
+        self.optimistic: dict[str, Any] = {}
+        # When each sent pin must be confirmed by
+        self._deadlines: dict[str, float] = {}
+        self._verify_delay = COMMAND_VERIFY_DELAY
+        self._unsub_verify: CALLBACK_TYPE | None = None
+
+    @property
+    def pending(self) -> bool:
+        """Return True if writes are waiting to be sent or confirmed."""
+        return bool(self._pending or self.optimistic)
+
+    @callback
+    def async_queue(self, pin: str, value: Any) -> None:
+        """Queue a pin write, replacing any pending value for the same pin."""
+        now = time.monotonic()
+        if self._first_queued is None:
+            self._first_queued = now
+        self._pending[pin] = value
+        self.optimistic[pin] = value
+        self.coordinator.async_note_command()
+        self.coordinator.async_set_pin_values({pin: value})
+
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+        # Stop extending the window once a write has waited long enough
+        delay = min(
+            COMMAND_DEBOUNCE_DELAY,
+            max(0, self._first_queued + COMMAND_MAX_DELAY - now),
+        )
+        self._unsub_flush = async_call_later(self.hass, delay, self._async_start_flush)
+
+    async def async_queue_and_wait(self, pin: str, value: Any) -> None:
+        """Queue a pin write and wait until it is sent.
+
+        Raises HomeAssistantError if sending fails.
+        """
+        waiter: asyncio.Future[None] = self.hass.loop.create_future()
+        self._waiters.append(waiter)
+        self.async_queue(pin, value)
+        await waiter
+
+    @callback
+    def async_apply_optimistic(self, data: dict[str, Any]) -> None:
+        """Overlay unconfirmed values onto polled data, confirming matches."""
+        for pin, value in list(self.optimistic.items()):
+            if pin not in data:
+                continue
+            if pin in self._pending:
+                data[pin] = value
+            elif _same_value(data.get(pin), value):
+                self._async_confirm(pin)
+            else:
+                data[pin] = value
+
+    @callback
+    def _async_start_flush(self, _now: datetime) -> None:
+        """Send the pending writes in the background."""
+        self._unsub_flush = None
+        self.hass.async_create_background_task(
+            self.async_flush(), f"{DOMAIN} command flush"
+        )
+
+    async def async_flush(self) -> None:
+        """Send all pending writes now."""
+        async with self._lock:
+            values, self._pending = self._pending, {}
+            waiters, self._waiters = self._waiters, []
+            self._first_queued = None
+            if not values:
+                _resolve(waiters)
+                return
+
+            try:
+                await self._async_write(values)
+            except RaypakApiError as err:
+                _LOGGER.error("Failed to send %s to heater: %s", values, err)
+                for pin in values:
+                    self.optimistic.pop(pin, None)
+                    self._deadlines.pop(pin, None)
+                if all(waiter.done() for waiter in waiters):
+                    self._async_create_send_issue(values, err)
+                _resolve(
+                    waiters,
+                    HomeAssistantError(f"Failed to send {values} to heater: {err}"),
+                )
+                # Restore the heater's real values
+                await self.coordinator.async_request_refresh()
+                return
+
+        _resolve(waiters)
+        ir.async_delete_issue(self.hass, DOMAIN, self._send_issue_id())
+        self.coordinator.async_note_command()
+        self._async_start_deadlines(values)
+
+    async def async_send(self, values: dict[str, Any]) -> dict[str, bool]:
+        """Write pins now and read them back once; return which took effect.
+
+        Unlike async_queue this skips the debounce and waits for the
+        outcome, for callers that report it, like bulk changes across
+        heaters. Pins not yet reported at their new value are left to the
+        usual verification. Raises RaypakApiError if the write fails.
+        """
+        async with self._lock:
+            for pin in values:
+                self._pending.pop(pin, None)
+            if not self._pending:
+                self._first_queued = None
+            self.optimistic.update(values)
+            self.coordinator.async_set_pin_values(values)
+            try:
+                await self._async_write(values)
+            except RaypakApiError:
+                for pin in values:
+                    self.optimistic.pop(pin, None)
+                    self._deadlines.pop(pin, None)
+                await self.coordinator.async_request_refresh()
+                raise
+            self.coordinator.async_note_command()
+            try:
+                actual = await self.coordinator.client.async_get_pins(
+                    list(values), RequestPriority.COMMAND
+                )
+            except RaypakApiError as err:
+                _LOGGER.debug("Read-back of %s failed: %s", list(values), err)
+                actual = {}
+
+        applied = {
+            pin: _same_value(actual.get(pin), value) for pin, value in values.items()
+        }
+        for pin, confirmed in applied.items():
+            if confirmed and pin in self.optimistic:
+                self._async_confirm(pin)
+        unconfirmed = [pin for pin, confirmed in applied.items() if not confirmed]
+        if unconfirmed:
+            self._async_start_deadlines(unconfirmed)
+        return applied
+
+    async def _async_write(self, values: dict[str, Any]) -> None:
+        """Send pin writes, batched when there is more than one."""
+        client = self.coordinator.client
+        if len(values) == 1:
+            [(pin, value)] = values.items()
+            await client.async_update_pin(pin, value)
+        else:
+            await client.async_update_pins(values)
+
+    @callback
+    def _async_start_deadlines(self, pins: Iterable[str]) -> None:
+        """Give just-sent pins their deadline and start reading them back."""
+        deadline = time.monotonic() + COMMAND_VERIFY_DEADLINE
+        for pin in pins:
+            self._deadlines[pin] = deadline
+        self._verify_delay = COMMAND_VERIFY_DELAY
+        self._async_schedule_verify()
+
+    @callback
+    def _async_schedule_verify(self) -> None:
+        """Schedule the next read-back of unconfirmed pins."""
+        if self._unsub_verify is not None:
+            self._unsub_verify()
+        self._unsub_verify = async_call_later(
+            self.hass, self._verify_delay, self._async_start_verify
+        )
+
+    @callback
+    def _async_start_verify(self, _now: datetime) -> None:
+        """Read back unconfirmed pins in the background."""
+        self._unsub_verify = None
+        self.hass.async_create_background_task(
+            self._async_verify(), f"{DOMAIN} command verify"
+        )
+
+    async def _async_verify(self) -> None:
+        """Confirm sent values against the heater, or revert them."""
+        pins = [pin for pin in self.optimistic if pin not in self._pending]
+        if not pins:
+            return
+        try:
+            actual = await self.coordinator.client.async_get_pins(
+                pins, RequestPriority.COMMAND
+            )
+        except RaypakAuthError as err:
+            # Unverifiable until reauthenticated: drop them, and let the
+            # refresh restore the held values and start reauth
+            _LOGGER.debug("Read-back of %s rejected: %s", pins, err)
+            for pin in pins:
+                if pin not in self._pending:
+                    self.optimistic.pop(pin, None)
+                    self._deadlines.pop(pin, None)
+            await self.coordinator.async_request_refresh()
+            return
+        except RaypakApiError as err:
+            _LOGGER.debug("Read-back of %s failed: %s", pins, err)
+            actual = {}
+
+        now = time.monotonic()
+        reverted: dict[str, Any] = {}
+        unread = False
+        for pin in pins:
+            if pin not in self.optimistic or pin in self._pending:
+                continue
+            value = self.optimistic[pin]
+            if _same_value(actual.get(pin), value):
+                self._async_confirm(pin)
+            elif now >= self._deadlines.get(pin, 0):
+                del self.optimistic[pin]
+                self._deadlines.pop(pin, None)
+                if pin in actual:
+                    reverted[pin] = actual[pin]
+                else:
+                    unread = True
+                self._async_create_issue(pin, value, actual.get(pin))
+        if reverted:
+            self.coordinator.async_set_pin_values(reverted)
+        if unread:
+            # The held data still shows the commanded value
+            await self.coordinator.async_request_refresh()
+
+        if any(pin not in self._pending for pin in self.optimistic):
+            self.coordinator.client.metrics.count(COMMAND_RETRIES)
+            self._verify_delay *= 2
+            self._async_schedule_verify()
+
+    @callback
+    def _async_confirm(self, pin: str) -> None:
+        """Accept an optimistic value as the heater's real state."""
+        del self.optimistic[pin]
+        self._deadlines.pop(pin, None)
+        ir.async_delete_issue(self.hass, DOMAIN, self._issue_id(pin))
+
+    @callback
+    def _async_create_issue(self, pin: str, value: Any, actual: Any) -> None:
+        """Raise a repair issue for a command the heater didn't apply."""
+        _LOGGER.warning(
+            "Heater did not apply %s=%s within %ss (reports %s)",
+            pin,
+            value,
+            COMMAND_VERIFY_DEADLINE,
+            actual,
+        )
+        ir.async_create_issue(
+            self.hass,
+            DOMAIN,
+            self._issue_id(pin),
+            is_fixable=False,
+            severity=ir.IssueSeverity.WARNING,
+            translation_key="command_not_applied",
+            translation_placeholders={
+                "pin": pin,
+                "value": str(value),
+                "actual": str(actual),
+            },
+        )
+
+    def _issue_id(self, pin: str) -> str:
+        """Return the repair issue id for a pin on this heater."""
+        entry = self.coordinator.config_entry
+        return f"command_not_applied_{entry.entry_id if entry else ''}_{pin}"
+
+    @callback
+    def _async_create_send_issue(
+        self, values: dict[str, Any], err: RaypakApiError
+    ) -> None:
+        """Raise a repair issue for writes nobody was waiting on that failed."""
+        ir.async_create_issue(
+            self.hass,
+            DOMAIN,
+            self._send_issue_id(),
+            is_fixable=False,
+            severity=ir.IssueSeverity.ERROR,
+            translation_key="command_not_sent",
+            translation_placeholders={
+                "values": ", ".join(f"{pin}={value}" for pin, value in values.items()),
+                "error": str(err),
+            },
+        )
+
+    def _send_issue_id(self) -> str:
+        """Return the repair issue id for failed sends on this heater."""
+        entry = self.coordinator.config_entry
+        return f"command_not_sent_{entry.entry_id if entry else ''}"
+
+    async def async_shutdown(self) -> None:
+        """Send anything still pending and stop the timers."""
+        for unsub in (self._unsub_flush, self._unsub_verify):
+            if unsub is not None:
+                unsub()
+        self._unsub_flush = self._unsub_verify = None
+        await self.async_flush()
+        if self._unsub_verify is not None:
+            self._unsub_verify()
+            self._unsub_verify = None
+
+
+def _resolve(
+    waiters: list[asyncio.Future[None]], err: Exception | None = None
+) -> None:
+    """Wake callers waiting on a send, raising err in them if it failed."""
+    for waiter in waiters:
+        if waiter.done():
+            continue
+        if err is None:
+            waiter.set_result(None)
+        else:
+            waiter.set_exception(err)
+
+
+def _same_value(actual: Any, expected: Any) -> bool:
+    """Return True if a pin value read back matches the commanded one."""
+    if actual is None:
+        return False
+    try:
+        return float(actual) == float(expected)
+    except (ValueError, TypeError):
+        return str(actual).strip('"') == str(expected)
@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from collections.abc import Mapping
 from typing import Any
 
 import aiohttp
@@ -13,20 +15,53 @@ from homeassistant.config_entries import (
     ConfigFlow,
     OptionsFlow,
 )
-from homeassistant.core import callback
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers.selector import (
+    TextSelector,
+    TextSelectorConfig,
+    TextSelectorType,
+)
 
 from .api import RaypakApiClient, RaypakApiError, RaypakAuthError
 from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_ANOMALY_DETECTION,
+    CONF_EMAIL,
+    CONF_FAST_POLL_INTERVAL,
+    CONF_FLEET_SENSORS,
+    CONF_HUB_MODE,
+    CONF_LONG_TERM_STATISTICS,
+    CONF_MAX_STALE_AGE,
+    CONF_PASSWORD,
+    CONF_PIN_DISCOVERY,
     CONF_POLL_INTERVAL,
+    CONF_PUSH_UPDATES,
     CONF_SERVER,
+    CONF_SLOW_POLL_INTERVAL,
+    CONF_TIERED_POLLING,
     CONF_TOKEN,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_ANOMALY_DETECTION,
+    DEFAULT_FAST_POLL_INTERVAL,
+    DEFAULT_FLEET_SENSORS,
+    DEFAULT_HUB_MODE,
+    DEFAULT_LONG_TERM_STATISTICS,
+    DEFAULT_MAX_STALE_AGE,
+    DEFAULT_PIN_DISCOVERY,
     DEFAULT_POLL_INTERVAL,
+    DEFAULT_PUSH_UPDATES,
     DEFAULT_SERVER,
+    DEFAULT_SLOW_POLL_INTERVAL,
+    DEFAULT_TIERED_POLLING,
     DOMAIN,
+    MAX_MAX_STALE_AGE,
     MAX_POLL_INTERVAL,
     MIN_POLL_INTERVAL,
+    REAUTH_ACCOUNT,
 )
+from .session import async_get_session
+from .stream import RaypakStream, RaypakStreamAuthError, RaypakStreamError
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,6 +74,57 @@ USER_SCHEMA = vol.Schema(
         ): vol.All(int, vol.Range(min=MIN_POLL_INTERVAL, max=MAX_POLL_INTERVAL)),
     }
 )
+ACCOUNT_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_EMAIL): TextSelector(
+            TextSelectorConfig(type=TextSelectorType.EMAIL)
+        ),
+        vol.Required(CONF_PASSWORD): TextSelector(
+            TextSelectorConfig(type=TextSelectorType.PASSWORD)
+        ),
+    }
+)
+TOKEN_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_TOKEN): TextSelector(
+            TextSelectorConfig(type=TextSelectorType.PASSWORD)
+        ),
+    }
+)
+
+
+async def _async_validate_token(
+    hass: HomeAssistant, server: str, token: str
+) -> str | None:
+    """Check a device token; return an error key if it doesn't work."""
+    client = RaypakApiClient(async_get_session(hass), server, token)
+    try:
+        await client.async_is_connected()
+    except RaypakAuthError:
+        return "invalid_auth"
+    except RaypakApiError:
+        return "cannot_connect"
+    except Exception:
+        _LOGGER.exception("Unexpected error")
+        return "unknown"
+    return None
+
+
+async def _async_validate_account(
+    hass: HomeAssistant, server: str, email: str, password: str
+) -> str | None:
+    """Log in with a RayMoTe account; return an error key if that fails."""
+    stream = RaypakStream(hass, async_get_session(hass), server, email, password)
+    try:
+        await stream.async_validate_login()
+    except RaypakStreamAuthError:
+        return "invalid_account"
+    except (aiohttp.ClientError, asyncio.TimeoutError, RaypakStreamError):
+        return "cannot_connect"
+    except Exception:
+        _LOGGER.exception("Unexpected error")
+        return "unknown"
+    return None
 
 
 class RaypakConfigFlow(ConfigFlow, domain=DOMAIN):
@@ -46,6 +132,8 @@ class RaypakConfigFlow(ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    _reauth_entry: ConfigEntry
+
     async def async_step_user(
         self,
         user_input: dict[str, Any] | None = None,
@@ -60,21 +148,9 @@ class RaypakConfigFlow(ConfigFlow, domain=DOMAIN):
             await self.async_set_unique_id(token)
             self._abort_if_unique_id_configured()
 
-            session = aiohttp.ClientSession()
-            client = RaypakApiClient(session, server, token)
-            try:
-                await client.async_is_connected()
-            except RaypakAuthError:
-                errors["base"] = "invalid_auth"
-            except RaypakApiError:
-                errors["base"] = "cannot_connect"
-            except Exception:
-                _LOGGER.exception("Unexpected error")
-                errors["base"] = "unknown"
-            finally:
-                await session.close()
-
-            if not errors:
+            if error := await _async_validate_token(self.hass, server, token):
+                errors["base"] = error
+            else:
                 return self.async_create_entry(
                     title="Raypak Pool Heater",
                     data={
@@ -94,6 +170,77 @@ class RaypakConfigFlow(ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
+        """Handle a rejected device token or RayMoTe account."""
+        entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
+        assert entry is not None
+        self._reauth_entry = entry
+        if self.context.get(REAUTH_ACCOUNT):
+            return await self.async_step_reauth_account()
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self,
+        user_input: dict[str, Any] | None = None,
+    ) -> FlowResult:
+        """Ask for a new device token."""
+        errors: dict[str, str] = {}
+        entry = self._reauth_entry
+
+        if user_input is not None:
+            token = user_input[CONF_TOKEN]
+            if token != entry.unique_id:
+                await self.async_set_unique_id(token)
+                self._abort_if_unique_id_configured()
+            if error := await _async_validate_token(
+                self.hass, entry.data[CONF_SERVER], token
+            ):
+                errors["base"] = error
+            else:
+                self.hass.config_entries.async_update_entry(
+                    entry, unique_id=token, data={**entry.data, CONF_TOKEN: token}
+                )
+                await self.hass.config_entries.async_reload(entry.entry_id)
+                return self.async_abort(reason="reauth_successful")
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=TOKEN_SCHEMA,
+            errors=errors,
+        )
+
+    async def async_step_reauth_account(
+        self,
+        user_input: dict[str, Any] | None = None,
+    ) -> FlowResult:
+        """Ask for the RayMoTe account again after push login was rejected."""
+        errors: dict[str, str] = {}
+        entry = self._reauth_entry
+
+        if user_input is not None:
+            if error := await _async_validate_account(
+                self.hass,
+                entry.data[CONF_SERVER],
+                user_input[CONF_EMAIL],
+                user_input[CONF_PASSWORD],
+            ):
+                errors["base"] = error
+            else:
+                self.hass.config_entries.async_update_entry(
+                    entry, data={**entry.data, **user_input}
+                )
+                # Reload even if unchanged: the rejected stream was dropped
+                await self.hass.config_entries.async_reload(entry.entry_id)
+                return self.async_abort(reason="reauth_successful")
+
+        return self.async_show_form(
+            step_id="reauth_account",
+            data_schema=self.add_suggested_values_to_schema(
+                ACCOUNT_SCHEMA, {CONF_EMAIL: entry.data.get(CONF_EMAIL)}
+            ),
+            errors=errors,
+        )
+
     @staticmethod
     @callback
     def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
@@ -107,17 +254,53 @@ class RaypakOptionsFlow(OptionsFlow):
     def __init__(self, config_entry: ConfigEntry) -> None:
         """Initialize options flow."""
         self._config_entry = config_entry
+        self._options: dict[str, Any] = {}
 
     async def async_step_init(
         self,
         user_input: dict[str, Any] | None = None,
     ) -> FlowResult:
         """Manage the options."""
+        errors: dict[str, str] = {}
+
         if user_input is not None:
-            return self.async_create_entry(data=user_input)
+            if user_input.get(
+                CONF_FAST_POLL_INTERVAL, DEFAULT_FAST_POLL_INTERVAL
+            ) > user_input.get(CONF_SLOW_POLL_INTERVAL, DEFAULT_SLOW_POLL_INTERVAL):
+                errors["base"] = "invalid_poll_bounds"
+            elif (
+                user_input.get(CONF_PUSH_UPDATES)
+                and CONF_EMAIL not in self._config_entry.data
+            ):
+                self._options = user_input
+                return await self.async_step_account()
+            else:
+                return self.async_create_entry(data=user_input)
 
-        current_interval = self._config_entry.options.get(
-            CONF_POLL_INTERVAL, DEFAULT_POLL_INTERVAL
+        options = user_input or self._config_entry.options
+        current_interval = options.get(CONF_POLL_INTERVAL, DEFAULT_POLL_INTERVAL)
+        current_hub_mode = options.get(CONF_HUB_MODE, DEFAULT_HUB_MODE)
+        current_tiered_polling = options.get(
+            CONF_TIERED_POLLING, DEFAULT_TIERED_POLLING
+        )
+        current_adaptive_polling = options.get(
+            CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING
+        )
+        current_fast_interval = options.get(
+            CONF_FAST_POLL_INTERVAL, DEFAULT_FAST_POLL_INTERVAL
+        )
+        current_slow_interval = options.get(
+            CONF_SLOW_POLL_INTERVAL, DEFAULT_SLOW_POLL_INTERVAL
+        )
+        current_max_stale_age = options.get(CONF_MAX_STALE_AGE, DEFAULT_MAX_STALE_AGE)
+        current_push_updates = options.get(CONF_PUSH_UPDATES, DEFAULT_PUSH_UPDATES)
+        current_long_term_statistics = options.get(
+            CONF_LONG_TERM_STATISTICS, DEFAULT_LONG_TERM_STATISTICS
+        )
+        current_fleet_sensors = options.get(CONF_FLEET_SENSORS, DEFAULT_FLEET_SENSORS)
+        current_pin_discovery = options.get(CONF_PIN_DISCOVERY, DEFAULT_PIN_DISCOVERY)
+        current_anomaly_detection = options.get(
+            CONF_ANOMALY_DETECTION, DEFAULT_ANOMALY_DETECTION
         )
 
         return self.async_show_form(
@@ -130,6 +313,74 @@ class RaypakOptionsFlow(OptionsFlow):
                         int,
                         vol.Range(min=MIN_POLL_INTERVAL, max=MAX_POLL_INTERVAL),
                     ),
+                    vol.Optional(CONF_HUB_MODE, default=current_hub_mode): bool,
+                    vol.Optional(
+                        CONF_TIERED_POLLING, default=current_tiered_polling
+                    ): bool,
+                    vol.Optional(
+                        CONF_ADAPTIVE_POLLING, default=current_adaptive_polling
+                    ): bool,
+                    vol.Optional(
+                        CONF_FAST_POLL_INTERVAL, default=current_fast_interval
+                    ): vol.All(
+                        int,
+                        vol.Range(min=MIN_POLL_INTERVAL, max=MAX_POLL_INTERVAL),
+                    ),
+                    vol.Optional(
+                        CONF_SLOW_POLL_INTERVAL, default=current_slow_interval
+                    ): vol.All(
+                        int,
+                        vol.Range(min=MIN_POLL_INTERVAL, max=MAX_POLL_INTERVAL),
+                    ),
+                    vol.Optional(
+                        CONF_MAX_STALE_AGE, default=current_max_stale_age
+                    ): vol.All(int, vol.Range(min=0, max=MAX_MAX_STALE_AGE)),
+                    vol.Optional(
+                        CONF_PUSH_UPDATES, default=current_push_updates
+                    ): bool,
+                    vol.Optional(
+                        CONF_LONG_TERM_STATISTICS,
+                        default=current_long_term_statistics,
+                    ): bool,
+                    vol.Optional(
+                        CONF_FLEET_SENSORS, default=current_fleet_sensors
+                    ): bool,
+                    vol.Optional(
+                        CONF_PIN_DISCOVERY, default=current_pin_discovery
+                    ): bool,
+                    vol.Optional(
+                        CONF_ANOMALY_DETECTION, default=current_anomaly_detection
+                    ): bool,
                 }
             ),
+            errors=errors,
+        )
+
+    async def async_step_account(
+        self,
+        user_input: dict[str, Any] | None = None,
+    ) -> FlowResult:
+        """Ask for the RayMoTe account push updates log in with."""
+        errors: dict[str, str] = {}
+        entry = self._config_entry
+
+        if user_input is not None:
+            if error := await _async_validate_account(
+                self.hass,
+                entry.data[CONF_SERVER],
+                user_input[CONF_EMAIL],
+                user_input[CONF_PASSWORD],
+            ):
+                errors["base"] = error
+            else:
+                # Credentials live in the entry data, not the options
+                self.hass.config_entries.async_update_entry(
+                    entry, data={**entry.data, **user_input}, options=self._options
+                )
+                return self.async_create_entry(data=self._options)
+
+        return self.async_show_form(
+            step_id="account",
+            data_schema=ACCOUNT_SCHEMA,
+            errors=errors,
         )
@@ -2,35 +2,140 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Callable
-
-from homeassistant.components.sensor import (
-    SensorDeviceClass,
-    SensorEntityDescription,
-    SensorStateClass,
-)
-from homeassistant.components.binary_sensor import (
-    BinarySensorDeviceClass,
-    BinarySensorEntityDescription,
-)
-from homeassistant.const import (
-    UnitOfTemperature,
-    UnitOfElectricPotential,
-    UnitOfTime,
-    PERCENTAGE,
-)
+from datetime import timedelta
+from typing import Any, Callable, NamedTuple
 
 DOMAIN = "raypak"
 
 CONF_SERVER = "server"
 CONF_TOKEN = "token"
 CONF_POLL_INTERVAL = "poll_interval"
+CONF_HUB_MODE = "hub_mode"
+CONF_TIERED_POLLING = "tiered_polling"
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_FAST_POLL_INTERVAL = "fast_poll_interval"
+CONF_SLOW_POLL_INTERVAL = "slow_poll_interval"
+CONF_MAX_STALE_AGE = "max_stale_age"
+CONF_PUSH_UPDATES = "push_updates"
+CONF_EMAIL = "email"
+CONF_PASSWORD = "password"
+CONF_LONG_TERM_STATISTICS = "long_term_statistics"
+CONF_FLEET_SENSORS = "fleet_sensors"
+CONF_PIN_DISCOVERY = "pin_discovery"
+CONF_ANOMALY_DETECTION = "anomaly_detection"
 
 DEFAULT_SERVER = "raymote.raypak.com"
 DEFAULT_POLL_INTERVAL = 30
 MIN_POLL_INTERVAL = 10
 MAX_POLL_INTERVAL = 300
+DEFAULT_HUB_MODE = False
+DEFAULT_TIERED_POLLING = False
+DEFAULT_ADAPTIVE_POLLING = False
+DEFAULT_FAST_POLL_INTERVAL = MIN_POLL_INTERVAL
+DEFAULT_SLOW_POLL_INTERVAL = MAX_POLL_INTERVAL
+
+# Setpoint range the heater accepts (°F)
+MIN_TEMP = 60
+MAX_TEMP = 104
+
+OPERATION_OFF = "off"
+OPERATION_HEAT = "heat"
+OPERATION_LIST = [OPERATION_OFF, OPERATION_HEAT]
+
+DEFAULT_MAX_STALE_AGE = 1800
+DEFAULT_PUSH_UPDATES = False
+DEFAULT_LONG_TERM_STATISTICS = False
+DEFAULT_FLEET_SENSORS = False
+DEFAULT_PIN_DISCOVERY = False
+DEFAULT_ANOMALY_DETECTION = False
+MAX_MAX_STALE_AGE = 86400
+
+# Adaptive polling: calm polls required before backing off, and the growth
+# factor applied to the interval on each further calm poll
+ADAPTIVE_STABLE_POLLS = 3
+ADAPTIVE_BACKOFF_FACTOR = 1.5
+
+# Hub mode: cap on concurrent requests to one server across all heaters
+HUB_MAX_CONCURRENT_REQUESTS = 4
+
+DATA_HUBS = "hubs"
+DATA_SESSION = "session"
+DATA_FLEET = "fleet"
+
+# Reauth flow context flag: the RayMoTe account, not the device token, was
+# rejected
+REAUTH_ACCOUNT = "reauth_account"
+
+# Last-known pin cache: storage version and minimum seconds between saves
+STORAGE_VERSION = 1
+CACHE_SAVE_INTERVAL = 300
+
+# Hardware connectivity changes rarely, so probe it less often than data
+CONNECTIVITY_CHECK_INTERVAL = timedelta(seconds=60)
+
+# Tiered polling: non-volatile pins (lifetime counters) only refresh via getAll
+FULL_REFRESH_INTERVAL = timedelta(minutes=15)
+
+# Push updates: reconciliation getAll interval while the stream is up, and
+# the reconnect backoff bounds (seconds)
+PUSH_RECONCILE_INTERVAL = timedelta(minutes=5)
+PUSH_RECONNECT_MIN_DELAY = 5
+PUSH_RECONNECT_MAX_DELAY = 300
+
+# Commands: quiet period before queued writes are sent, and the longest a
+# write may be held back while new ones keep arriving (seconds)
+COMMAND_DEBOUNCE_DELAY = 1.0
+COMMAND_MAX_DELAY = 3.0
+# First read-back of a sent write (doubling on each retry), and how long the
+# heater gets to report the new value before it is reverted (seconds)
+COMMAND_VERIFY_DELAY = 2.0
+COMMAND_VERIFY_DEADLINE = 60.0
+
+# Long-term statistics: aggregation window and imported period (seconds),
+# and the most samples buffered per window
+STATISTICS_WINDOW = 300
+STATISTICS_PERIOD = 3600
+STATISTICS_BUFFER_SIZE = 512
+
+# Thermal model: seconds of samples averaged into one fit observation, fit
+# observations needed before predicting, and the per-observation forgetting
+# factor (0.998 weighs roughly the last 500 observations)
+THERMAL_SAMPLE_INTERVAL = 900
+THERMAL_MIN_SAMPLES = 8
+THERMAL_FORGETTING_FACTOR = 0.998
+
+# Anomaly detection: EWMA weights of the baseline and of recent samples,
+# samples before a baseline is trusted, and the z-scores that start and
+# clear an anomaly
+ANOMALY_BASELINE_ALPHA = 0.002
+ANOMALY_FAST_ALPHA = 0.1
+ANOMALY_WARMUP_SAMPLES = 120
+ANOMALY_Z = 3.0
+ANOMALY_CLEAR_Z = 1.5
+# Short cycling: this many heating cycles starting within the window (seconds)
+SHORT_CYCLE_COUNT = 6
+SHORT_CYCLE_WINDOW = 3600
+
+EVENT_ANOMALY = f"{DOMAIN}_anomaly"
+
+# Pin discovery: full getAll payloads profiled before the profile is saved,
+# and the age (seconds) at which a saved profile is profiled again
+DISCOVERY_POLLS = 20
+DISCOVERY_MAX_AGE = 30 * 86400
+
+# Heating planner: length of the slots firing is planned in, the furthest
+# ahead a plan may end (seconds), and how far the pool temperature may
+# drift from the plan (°F) before it is recomputed
+PLAN_SLOT_INTERVAL = 900
+PLAN_MAX_HORIZON = 7 * 86400
+PLAN_REPLAN_TOLERANCE = 1.0
+
+SERVICE_PLAN_HEATING = "plan_heating"
+SERVICE_CANCEL_HEATING_PLAN = "cancel_heating_plan"
+SERVICE_BULK_SET = "bulk_set"
+
+# Bulk set: most heaters written to at the same time
+BULK_MAX_CONCURRENT = 8
 
 # Pin mappings
 PIN_INLET_TEMP = "v52"
@@ -52,161 +157,112 @@ PIN_VSP_SPEED = "v14"
 PIN_VSP_RUN_STATUS = "v162"
 PIN_FIRING_RATE = "v160"
 
+# Pins with a dedicated entity, so discovery doesn't generate one
+KNOWN_PINS = frozenset(
+    {
+        PIN_INLET_TEMP,
+        PIN_OUTLET_TEMP,
+        PIN_FLUE_TEMP,
+        PIN_OPERATION_MODE,
+        PIN_IGNITION_VOLTAGE,
+        PIN_SETPOINT,
+        PIN_FLAME_CURRENT,
+        PIN_FAULT_CODE,
+        PIN_ERROR_TEXT,
+        PIN_CAPACITY,
+        PIN_HEATING_CYCLES,
+        PIN_HEATING_TIME,
+        PIN_POWER_CYCLES,
+        PIN_FLOW_PRESSURE,
+        PIN_FLOW_RATE,
+        PIN_VSP_SPEED,
+        PIN_VSP_RUN_STATUS,
+        PIN_FIRING_RATE,
+    }
+)
+
+IGNITION_NO_DEMAND = "No Demand"
+
+ATTR_STALE = "stale"
+ATTR_DATA_AS_OF = "data_as_of"
+ATTR_TIME_TO_SETPOINT = "time_to_setpoint"
+ATTR_READY_BY = "ready_by"
+ATTR_PRICES = "prices"
+ATTR_PRICE = "price"
+ATTR_START = "start"
+ATTR_HEATING_PLAN = "heating_plan"
+ATTR_OPERATION_MODE = "operation_mode"
+
 MANUFACTURER = "Raypak"
 MODEL = "Pool Heater"
 
 
-@dataclass(frozen=True, kw_only=True)
-class RaypakSensorEntityDescription(SensorEntityDescription):
-    """Describes a Raypak sensor entity."""
+# Pin value decoders. The coordinator decodes each distinct (pin, decoder)
+# pair once per poll, so entities reading the same pin share one result.
+def to_float_1(x: Any) -> float | None:
+    """Decode a numeric pin rounded to one decimal."""
+    return round(float(x), 1) if x is not None else None
 
-    pin: str
-    value_fn: Callable[[Any], Any] = lambda x: x
-
-
-@dataclass(frozen=True, kw_only=True)
-class RaypakBinarySensorEntityDescription(BinarySensorEntityDescription):
-    """Describes a Raypak binary sensor entity."""
-
-    pin: str | None = None
-    value_fn: Callable[[Any], bool] = lambda x: bool(x)
-
-
-SENSOR_DESCRIPTIONS: tuple[RaypakSensorEntityDescription, ...] = (
-    RaypakSensorEntityDescription(
-        key="inlet_temperature",
-        translation_key="inlet_temperature",
-        pin=PIN_INLET_TEMP,
-        native_unit_of_measurement=UnitOfTemperature.FAHRENHEIT,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda x: round(float(x), 1) if x is not None else None,
-    ),
-    RaypakSensorEntityDescription(
-        key="outlet_temperature",
-        translation_key="outlet_temperature",
-        pin=PIN_OUTLET_TEMP,
-        native_unit_of_measurement=UnitOfTemperature.FAHRENHEIT,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda x: round(float(x), 1) if x is not None else None,
-    ),
-    RaypakSensorEntityDescription(
-        key="flue_temperature",
-        translation_key="flue_temperature",
-        pin=PIN_FLUE_TEMP,
-        native_unit_of_measurement=UnitOfTemperature.FAHRENHEIT,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda x: round(float(x), 1) if x is not None else None,
-    ),
-    RaypakSensorEntityDescription(
-        key="ignition_voltage",
-        translation_key="ignition_voltage",
-        pin=PIN_IGNITION_VOLTAGE,
-        value_fn=lambda x: str(x).strip('"') if x is not None else None,
-    ),
-    RaypakSensorEntityDescription(
-        key="flame_current",
-        translation_key="flame_current",
-        pin=PIN_FLAME_CURRENT,
-        native_unit_of_measurement="µA",
-        state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda x: round(float(x), 1) if x is not None else None,
-    ),
-    RaypakSensorEntityDescription(
-        key="fault_code",
-        translation_key="fault_code",
-        pin=PIN_FAULT_CODE,
-        value_fn=lambda x: str(x) if x is not None else None,
-    ),
-    RaypakSensorEntityDescription(
-        key="error_text",
-        translation_key="error_text",
-        pin=PIN_ERROR_TEXT,
-        value_fn=lambda x: str(x).strip('"') if x is not None else None,
-    ),
-    RaypakSensorEntityDescription(
-        key="capacity",
-        translation_key="capacity",
-        pin=PIN_CAPACITY,
-        native_unit_of_measurement=PERCENTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda x: round(float(x), 1) if x is not None else None,
-    ),
-    RaypakSensorEntityDescription(
-        key="heating_cycles",
-        translation_key="heating_cycles",
-        pin=PIN_HEATING_CYCLES,
-        state_class=SensorStateClass.TOTAL_INCREASING,
-        value_fn=lambda x: int(float(x)) if x is not None else None,
-    ),
-    RaypakSensorEntityDescription(
-        key="heating_time",
-        translation_key="heating_time",
-        pin=PIN_HEATING_TIME,
-        native_unit_of_measurement=UnitOfTime.HOURS,
-        device_class=SensorDeviceClass.DURATION,
-        state_class=SensorStateClass.TOTAL_INCREASING,
-        value_fn=lambda x: round(float(x), 1) if x is not None else None,
-    ),
-    RaypakSensorEntityDescription(
-        key="power_cycles",
-        translation_key="power_cycles",
-        pin=PIN_POWER_CYCLES,
-        state_class=SensorStateClass.TOTAL_INCREASING,
-        value_fn=lambda x: int(float(x)) if x is not None else None,
-    ),
-    RaypakSensorEntityDescription(
-        key="flow_pressure",
-        translation_key="flow_pressure",
-        pin=PIN_FLOW_PRESSURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda x: round(float(x), 2) if x is not None else None,
-    ),
-    RaypakSensorEntityDescription(
-        key="flow_rate",
-        translation_key="flow_rate",
-        pin=PIN_FLOW_RATE,
-        state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda x: round(float(x), 1) if x is not None else None,
-    ),
-    RaypakSensorEntityDescription(
-        key="vsp_speed",
-        translation_key="vsp_speed",
-        pin=PIN_VSP_SPEED,
-        native_unit_of_measurement=PERCENTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda x: round(float(x), 1) if x is not None else None,
-    ),
-    RaypakSensorEntityDescription(
-        key="firing_rate",
-        translation_key="firing_rate",
-        pin=PIN_FIRING_RATE,
-        native_unit_of_measurement=PERCENTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda x: round(float(x), 1) if x is not None else None,
-    ),
-    RaypakSensorEntityDescription(
-        key="operation_mode",
-        translation_key="operation_mode_sensor",
-        pin=PIN_OPERATION_MODE,
-        value_fn=lambda x: str(x) if x is not None else None,
-    ),
+
+def to_float_2(x: Any) -> float | None:
+    """Decode a numeric pin rounded to two decimals."""
+    return round(float(x), 2) if x is not None else None
+
+
+def to_int(x: Any) -> int | None:
+    """Decode a numeric pin as an integer."""
+    return int(float(x)) if x is not None else None
+
+
+def to_str(x: Any) -> str | None:
+    """Decode a pin as its string form."""
+    return str(x) if x is not None else None
+
+
+def to_text(x: Any) -> str | None:
+    """Decode a text pin, dropping the quotes Blynk wraps it in."""
+    return str(x).strip('"') if x is not None else None
+
+
+def to_flag(x: Any) -> bool:
+    """Decode a 0/1 pin as a boolean."""
+    return bool(int(float(x))) if x is not None else False
+
+
+def to_heat_mode(x: Any) -> bool:
+    """Decode the operation mode pin as True when heating is enabled."""
+    return int(float(x)) != 0 if x is not None else False
+
+
+def to_firing(x: Any) -> float | None:
+    """Decode the firing rate pin as 1.0 while firing and 0.0 otherwise."""
+    return (1.0 if float(x) > 0 else 0.0) if x is not None else None
+
+
+# Decoders that read a pin as a number, so getAll can parse it as one
+NUMERIC_DECODERS: frozenset[Callable[[Any], Any]] = frozenset(
+    {to_float_1, to_float_2, to_int, to_flag, to_heat_mode, to_firing}
 )
 
-BINARY_SENSOR_DESCRIPTIONS: tuple[RaypakBinarySensorEntityDescription, ...] = (
-    RaypakBinarySensorEntityDescription(
-        key="hardware_connected",
-        translation_key="hardware_connected",
-        device_class=BinarySensorDeviceClass.CONNECTIVITY,
-        pin=None,
-    ),
-    RaypakBinarySensorEntityDescription(
-        key="vsp_run_status",
-        translation_key="vsp_run_status",
-        device_class=BinarySensorDeviceClass.RUNNING,
-        pin=PIN_VSP_RUN_STATUS,
-        value_fn=lambda x: bool(int(float(x))) if x is not None else False,
-    ),
+
+class SeriesSpec(NamedTuple):
+    """A pin whose recent history the coordinator keeps.
+
+    Samples are stored at most every ``min_interval`` seconds and kept for
+    ``horizon`` seconds.
+    """
+
+    pin: str
+    value_fn: Callable[[Any], Any]
+    horizon: float
+    min_interval: float
+
+
+# Pin histories kept by the coordinator for the computed sensors
+SERIES_SPECS: tuple[SeriesSpec, ...] = (
+    SeriesSpec(PIN_INLET_TEMP, to_float_1, horizon=900, min_interval=30),
+    SeriesSpec(PIN_FIRING_RATE, to_firing, horizon=3600, min_interval=10),
+    SeriesSpec(PIN_HEATING_CYCLES, to_int, horizon=86400, min_interval=300),
+    SeriesSpec(PIN_HEATING_TIME, to_float_1, horizon=86400, min_interval=300),
+    SeriesSpec(PIN_POWER_CYCLES, to_int, horizon=86400, min_interval=300),
 )
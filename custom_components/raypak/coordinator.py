@@ -2,21 +2,91 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from collections import Counter
+from collections.abc import Iterable
 from datetime import timedelta
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .api import RaypakApiClient, RaypakApiError, RaypakAuthError
-from .const import DOMAIN
+from .api import (
+    RaypakApiClient,
+    RaypakApiError,
+    RaypakAuthError,
+    RaypakCircuitOpenError,
+    RaypakRateLimitedError,
+    RequestPriority,
+    convert_pin,
+)
+from .commands import RaypakCommandQueue
+from .const import (
+    ADAPTIVE_BACKOFF_FACTOR,
+    ADAPTIVE_STABLE_POLLS,
+    CACHE_SAVE_INTERVAL,
+    CONNECTIVITY_CHECK_INTERVAL,
+    DOMAIN,
+    FULL_REFRESH_INTERVAL,
+    IGNITION_NO_DEMAND,
+    PIN_FAULT_CODE,
+    PIN_FIRING_RATE,
+    PIN_FLOW_RATE,
+    PIN_IGNITION_VOLTAGE,
+    PIN_INLET_TEMP,
+    PIN_OPERATION_MODE,
+    PIN_SETPOINT,
+    PUSH_RECONCILE_INTERVAL,
+    SERIES_SPECS,
+    STORAGE_VERSION,
+    to_float_1,
+    to_heat_mode,
+    to_str,
+    to_text,
+)
+from .snapshot import SNAPSHOT_SCHEMA, RaypakSnapshot
+from .thermal import ThermalModel
+from .timeseries import TimeSeries
+
+if TYPE_CHECKING:
+    from .anomaly import RaypakAnomalyDetector
+    from .discovery import RaypakPinDiscovery
+    from .planner import RaypakHeatingPlanner
 
 _LOGGER = logging.getLogger(__name__)
 
+SLOT_FIRING_RATE = SNAPSHOT_SCHEMA.slot(PIN_FIRING_RATE, to_float_1)
+SLOT_IGNITION = SNAPSHOT_SCHEMA.slot(PIN_IGNITION_VOLTAGE, to_text)
+SLOT_FAULT_CODE = SNAPSHOT_SCHEMA.slot(PIN_FAULT_CODE, to_str)
+SLOT_INLET_TEMP = SNAPSHOT_SCHEMA.slot(PIN_INLET_TEMP, to_float_1)
+SLOT_FLOW_RATE = SNAPSHOT_SCHEMA.slot(PIN_FLOW_RATE, to_float_1)
+SLOT_SETPOINT = SNAPSHOT_SCHEMA.slot(PIN_SETPOINT, to_float_1)
+SLOT_HEAT_MODE = SNAPSHOT_SCHEMA.slot(PIN_OPERATION_MODE, to_heat_mode)
+
+REASON_FIXED = "fixed"
+REASON_FIRING = "firing"
+REASON_IGNITION = "ignition"
+REASON_FAULT = "fault"
+REASON_COMMAND = "pending_command"
+REASON_SETTLING = "settling"
+REASON_STABLE = "stable"
+REASON_PUSH = "push"
+
+
+def cache_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the store holding an entry's last-known pin values."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.pins")
+
+
+class PollSkipped(Exception):
+    """A poll was throttled before anything was fetched."""
 
-class RaypakDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+
+class RaypakDataUpdateCoordinator(DataUpdateCoordinator[RaypakSnapshot]):
     """Coordinator to poll the Raypak API."""
 
     def __init__(
@@ -24,25 +94,438 @@ class RaypakDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         hass: HomeAssistant,
         client: RaypakApiClient,
         poll_interval: int,
+        hub_mode: bool = False,
+        tiered_polling: bool = False,
+        adaptive_bounds: tuple[int, int] | None = None,
+        max_stale_age: int = 0,
     ) -> None:
-        """Initialize the coordinator."""
+        """Initialize the coordinator.
+
+        In hub mode the coordinator does not schedule itself; the server's
+        RaypakHub calls async_refresh on a shared, staggered timer instead.
+
+        With tiered polling, regular polls only fetch the volatile pins read
+        by enabled entities and getAll runs every FULL_REFRESH_INTERVAL.
+
+        With adaptive bounds (fast, slow) the interval drops to the fast bound
+        while the heater is active and backs off toward the slow one when calm.
+
+        With a max_stale_age, the last good data is cached to storage. It is
+        served, flagged as stale, at startup and during cloud outages for up
+        to that many seconds.
+        """
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=poll_interval),
+            update_interval=None if hub_mode else timedelta(seconds=poll_interval),
         )
         self.client = client
+        self.hub_mode = hub_mode
+        self.poll_interval: float = poll_interval
+        self.poll_reason = REASON_FIXED
+        self._base_poll_interval = poll_interval
+        self.push_connected = False
+        self.adaptive_bounds = adaptive_bounds
+        self.command_pending = False
+        self.commands = RaypakCommandQueue(hass, self)
+        self._stable_polls = 0
         self.connected: bool = False
+        # What the last successful poll changed, for change-driven state writes
+        self.changed_pins: frozenset[str] = frozenset()
+        self.connected_changed: bool = False
+        # Entity state writes skipped because nothing they read changed
+        self.suppressed_writes = 0
+        self.tiered_polling = tiered_polling
+        self._last_connectivity_check: float | None = None
+        self._last_full_refresh: float | None = None
+        self._hot_pins: Counter[str] = Counter()
+        self.max_stale_age = max_stale_age
+        self.stale = False
+        # Wall-clock time of the data currently held, for stale-age checks
+        self.data_timestamp: float | None = None
+        # Successful polls, so listeners can tell a poll from other updates
+        self.polls = 0
+        self._store: Store[dict[str, Any]] | None = None
+        if max_stale_age and self.config_entry is not None:
+            self._store = cache_store(hass, self.config_entry.entry_id)
+        self._last_cache_save = 0.0
+        # Recent pin history for rate, duty cycle and per-day sensors
+        self.series: dict[str, TimeSeries] = {}
+        self._series_slots: list[tuple[int, TimeSeries]] = []
+        for spec in SERIES_SPECS:
+            series = self.series[spec.pin] = TimeSeries(
+                spec.horizon, spec.min_interval
+            )
+            self._series_slots.append(
+                (SNAPSHOT_SCHEMA.slot(spec.pin, spec.value_fn), series)
+            )
+        # Learned heat-up model, fed from the same samples as the series
+        self.thermal = ThermalModel()
+        # Platforms forwarded for this entry, so unload matches setup
+        self.platforms: list[str] = []
+        # Pin discovery: profile, whether getAll must keep unread pins, and
+        # whether the last poll downloaded every pin
+        self.discovery: RaypakPinDiscovery | None = None
+        self.keep_all_pins = False
+        self.full_refresh = False
+        self.anomalies: RaypakAnomalyDetector | None = None
+        self.planner: RaypakHeatingPlanner | None = None
 
-    async def _async_update_data(self) -> dict[str, Any]:
-        """Fetch data from the API."""
+    @callback
+    def async_track_pins(self, pins: Iterable[str]) -> CALLBACK_TYPE:
+        """Fetch pins on every tiered poll until the returned callback runs."""
+        pins = tuple(pins)
+        self._hot_pins.update(pins)
+
+        @callback
+        def _async_untrack() -> None:
+            self._hot_pins.subtract(pins)
+            self._hot_pins += Counter()  # drop pins no longer tracked
+
+        return _async_untrack
+
+    @callback
+    def async_sync_schema(self) -> None:
+        """Take up snapshot slots added by entities being set up.
+
+        Until the first platform is set up getAll keeps every pin untyped,
+        so the first refresh has the pins entities will read. From then on
+        it keeps and types only the pins the schema decodes, unless pin
+        discovery needs them all. Held data is decoded again if slots were
+        added since, so new entities can read their slot straight away.
+        """
+        self.client.pin_types = (
+            None if self.keep_all_pins else SNAPSHOT_SCHEMA.pin_types
+        )
+        if self.data is not None and len(self.data.values) != len(SNAPSHOT_SCHEMA):
+            self.data = SNAPSHOT_SCHEMA.decode(self.data.raw)
+
+    @property
+    def diagnostics(self) -> dict[str, Any]:
+        """Return coordinator state for diagnostics."""
+        return {
+            "poll_interval": self.poll_interval,
+            "poll_reason": self.poll_reason,
+            "adaptive_bounds": self.adaptive_bounds,
+            "tiered_polling": self.tiered_polling,
+            "hot_pins": sorted(self._hot_pins),
+            "connected": self.connected,
+            "push_connected": self.push_connected,
+            "rate_limiter": (
+                self.client.rate_limiter.metrics if self.client.rate_limiter else None
+            ),
+            "circuit_breaker": self.client.circuit_breaker.metrics,
+            "metrics": self.client.metrics.as_dict(),
+            "thermal": self.thermal.diagnostics,
+            "suppressed_writes": self.suppressed_writes,
+            "stale": self.stale,
+            "data_timestamp": self.data_timestamp,
+            "polls": self.polls,
+            "unconfirmed_commands": self.commands.optimistic,
+        }
+
+    async def async_shutdown(self) -> None:
+        """Send queued commands, save the cache, then stop polling."""
+        await self.commands.async_shutdown()
+        if self._store is not None and self.data is not None and not self.stale:
+            await self._store.async_save(self._cache_payload())
+        await super().async_shutdown()
+
+    async def async_load_cache(self) -> bool:
+        """Load the cached pin values; return True if they are fresh enough."""
+        if self._store is None or not (cached := await self._store.async_load()):
+            return False
+        if thermal := cached.get("thermal"):
+            # The fit stays valid however old the pin values are
+            self.thermal.restore(thermal)
+        if time.time() - cached["timestamp"] > self.max_stale_age:
+            return False
+        self.data = SNAPSHOT_SCHEMA.decode(cached["data"])
+        self.data_timestamp = cached["timestamp"]
+        self.connected = cached["connected"]
+        self.stale = True
+        return True
+
+    @callback
+    def _cache_payload(self) -> dict[str, Any]:
+        """Return the data to persist for the next startup."""
+        return {
+            "timestamp": self.data_timestamp,
+            "connected": self.connected,
+            "data": self.data.raw,
+            "thermal": self.thermal.as_dict(),
+        }
+
+    @callback
+    def _async_save_cache(self) -> None:
+        """Persist the latest data, at most once per CACHE_SAVE_INTERVAL."""
+        now = time.monotonic()
+        if self._store is None or now - self._last_cache_save < CACHE_SAVE_INTERVAL:
+            return
+        self._last_cache_save = now
+        self._store.async_delay_save(self._cache_payload, 1)
+
+    def _can_serve_stale(self) -> bool:
+        """Return True if held data is young enough to ride out an outage."""
+        if not self.max_stale_age or self.data is None or self.data_timestamp is None:
+            return False
+        return time.time() - self.data_timestamp <= self.max_stale_age
+
+    @callback
+    def async_set_pin_values(self, values: dict[str, Any]) -> None:
+        """Apply pin values received outside a poll and notify entities."""
+        if self.data is None:
+            return
+        raw = self.data.raw
+        changed = frozenset(
+            pin for pin, value in values.items() if raw.get(pin) != value
+        )
+        if not changed:
+            return
+        self.changed_pins = changed
+        self.connected_changed = False
+        self.data = SNAPSHOT_SCHEMA.decode({**raw, **values}, self.data, changed)
+        self._record_series(self.data)
+        self.async_update_listeners()
+
+    @callback
+    def async_push_pin_value(self, pin: str, value: Any) -> None:
+        """Apply a pin write streamed from the server."""
+        pin_types = self.client.pin_types or {}
+        values = {pin: convert_pin(value, pin_types.get(pin))}
+        self.commands.async_apply_optimistic(values)
+        self.data_timestamp = time.time()
+        self.stale = False
+        self.async_set_pin_values(values)
+
+    @callback
+    def async_set_push_connected(self, connected: bool) -> None:
+        """Switch between streamed updates and regular polling.
+
+        While the heater's writes are streamed, polls only reconcile every
+        PUSH_RECONCILE_INTERVAL; when the stream drops, polling resumes at
+        once.
+        """
+        if connected == self.push_connected:
+            return
+        self.push_connected = connected
+        if connected:
+            self._set_poll_interval(
+                PUSH_RECONCILE_INTERVAL.total_seconds(), REASON_PUSH
+            )
+            return
+        self._set_poll_interval(self._base_poll_interval, REASON_FIXED)
+        self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def async_note_command(self) -> None:
+        """Poll fast until a refresh has run after a user command."""
+        self.command_pending = True
+
+    def _activity_reason(self, snapshot: RaypakSnapshot) -> str | None:
+        """Return why the heater needs fast polling, or None if it is calm."""
+        values = snapshot.values
+        if self.command_pending or self.commands.pending:
+            return REASON_COMMAND
+        if (values[SLOT_FIRING_RATE] or 0) > 0:
+            return REASON_FIRING
+        ignition = values[SLOT_IGNITION]
+        if ignition is not None and ignition != IGNITION_NO_DEMAND:
+            return REASON_IGNITION
+        if fault_active(values[SLOT_FAULT_CODE]):
+            return REASON_FAULT
+        return None
+
+    def _adapt_poll_interval(self, snapshot: RaypakSnapshot) -> None:
+        """Pick the next poll interval from the heater state."""
+        fast, slow = self.adaptive_bounds
+        if reason := self._activity_reason(snapshot):
+            self._stable_polls = 0
+            interval: float = fast
+        else:
+            self._stable_polls += 1
+            if self._stable_polls < ADAPTIVE_STABLE_POLLS:
+                reason = REASON_SETTLING
+                interval = self.poll_interval
+            else:
+                reason = REASON_STABLE
+                interval = self.poll_interval * ADAPTIVE_BACKOFF_FACTOR
+            interval = max(fast, min(slow, interval))
+        self.command_pending = False
+        self._set_poll_interval(interval, reason)
+
+    def _set_poll_interval(self, interval: float, reason: str) -> None:
+        """Use a new poll interval from the next scheduled poll on."""
+        if interval != self.poll_interval:
+            _LOGGER.debug(
+                "Poll interval %.0fs -> %.0fs (%s)",
+                self.poll_interval,
+                interval,
+                reason,
+            )
+        self.poll_interval = interval
+        self.poll_reason = reason
+        if not self.hub_mode:
+            self.update_interval = timedelta(seconds=interval)
+
+    def _connectivity_check_due(self) -> bool:
+        """Return True if hardware connectivity should be probed this cycle."""
+        if self._last_connectivity_check is None:
+            return True
+        elapsed = time.monotonic() - self._last_connectivity_check
+        return elapsed >= CONNECTIVITY_CHECK_INTERVAL.total_seconds()
+
+    def _full_refresh_due(self) -> bool:
+        """Return True if this cycle should download every pin."""
+        if not self.tiered_polling or not self._hot_pins or self.data is None:
+            return True
+        if self.keep_all_pins:
+            # Pin discovery profiles full payloads only
+            return True
+        if self._last_full_refresh is None:
+            return True
+        elapsed = time.monotonic() - self._last_full_refresh
+        return elapsed >= FULL_REFRESH_INTERVAL.total_seconds()
+
+    async def _async_get_hot_pins(self) -> dict[str, Any]:
+        """Fetch only the volatile pins and merge them into the last data."""
+        values = await self.client.async_get_pins(sorted(self._hot_pins))
+        return {**self.data.raw, **values}
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify entities, timing the fan-out."""
+        with self.client.metrics.span("fan_out"):
+            super().async_update_listeners()
+
+    async def _async_update_data(self) -> RaypakSnapshot:
+        """Fetch data, falling back to held data during an outage."""
         try:
-            data = await self.client.async_get_all()
-            self.connected = await self.client.async_is_connected()
-        except RaypakAuthError as err:
-            raise ConfigEntryAuthFailed(str(err)) from err
-        except RaypakApiError as err:
-            raise UpdateFailed(str(err)) from err
-
-        return data
+            with self.client.metrics.span("update"):
+                snapshot = await self._async_fetch()
+        except UpdateFailed as err:
+            if not self._can_serve_stale():
+                raise
+            if not self.stale:
+                _LOGGER.warning(
+                    "Serving cached data for up to %ss: %s", self.max_stale_age, err
+                )
+            self.stale = True
+            return self.data
+        except PollSkipped as err:
+            # Nothing was fetched, so the held data is no fresher than before
+            _LOGGER.debug("Skipping poll: %s", err)
+            if self.max_stale_age and not self._can_serve_stale():
+                raise UpdateFailed(
+                    f"No data for over {self.max_stale_age}s: {err}"
+                ) from err
+            return self.data
+
+        self.stale = False
+        self.data_timestamp = time.time()
+        self.polls += 1
+        self._async_save_cache()
+        return snapshot
+
+    async def _async_fetch(self) -> RaypakSnapshot:
+        """Fetch data from the API."""
+        self.changed_pins = frozenset()
+        self.connected_changed = False
+        self.full_refresh = False
+        full_refresh = self._full_refresh_due()
+        if not full_refresh:
+            fetch = self._async_get_hot_pins()
+        elif self.tiered_polling and self.data is not None:
+            # In tiered mode getAll is the low-priority counter refresh
+            fetch = self.client.async_get_all(RequestPriority.COUNTERS)
+        else:
+            fetch = self.client.async_get_all()
+        calls = [fetch]
+        probe = self._connectivity_check_due()
+        if probe:
+            calls.append(self.client.async_is_connected())
+
+        # Issue both calls at once so the probe doesn't add a round-trip.
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        for result in results:
+            if isinstance(result, RaypakAuthError):
+                raise ConfigEntryAuthFailed(str(result)) from result
+        if probe and isinstance(
+            results[1], (RaypakRateLimitedError, RaypakCircuitOpenError)
+        ):
+            # Shed probe, or the data call took the half-open slot; try again
+            # next cycle
+            probe = False
+            results.pop()
+        if isinstance(results[0], RaypakRateLimitedError) and self.data is not None:
+            raise PollSkipped(str(results[0])) from results[0]
+        for result in results:
+            if isinstance(result, RaypakApiError):
+                raise UpdateFailed(str(result)) from result
+            if isinstance(result, BaseException):
+                raise result
+
+        data: dict[str, Any] = results[0]
+        self.commands.async_apply_optimistic(data)
+        if probe:
+            self.connected_changed = results[1] != self.connected
+            self.connected = results[1]
+            self._last_connectivity_check = time.monotonic()
+        if full_refresh:
+            self._last_full_refresh = time.monotonic()
+            self.full_refresh = True
+        previous = self.data
+        self.changed_pins = self._diff(previous and previous.raw, data)
+        snapshot = SNAPSHOT_SCHEMA.decode(data, previous, self.changed_pins)
+        self._record_series(snapshot)
+        if self.adaptive_bounds is not None and not self.push_connected:
+            self._adapt_poll_interval(snapshot)
+        return snapshot
+
+    def _record_series(self, snapshot: RaypakSnapshot) -> None:
+        """Append the current value of each tracked pin to its history."""
+        now = time.time()
+        values = snapshot.values
+        for slot, series in self._series_slots:
+            if (value := values[slot]) is not None:
+                series.append(now, value)
+        temperature, firing_rate = values[SLOT_INLET_TEMP], values[SLOT_FIRING_RATE]
+        if temperature is not None and firing_rate is not None:
+            # Without a flow reading, assume the pump is running
+            flow = values[SLOT_FLOW_RATE]
+            flowing = flow is None or flow > 0
+            self.thermal.add(now, temperature, firing_rate / 100, flowing)
+
+    @property
+    def time_to_setpoint(self) -> float | None:
+        """Return the predicted seconds until the pool reaches the setpoint.
+
+        None while heating is off or the thermal model can't tell yet.
+        """
+        if self.data is None:
+            return None
+        values = self.data.values
+        current, target = values[SLOT_INLET_TEMP], values[SLOT_SETPOINT]
+        if not values[SLOT_HEAT_MODE] or current is None or target is None:
+            return None
+        return self.thermal.time_to_target(current, target)
+
+    @staticmethod
+    def _diff(old: dict[str, Any] | None, new: dict[str, Any]) -> frozenset[str]:
+        """Return the pins whose value differs between two polls."""
+        if old is None:
+            return frozenset(new)
+        changed = {pin for pin, value in new.items() if old.get(pin) != value}
+        changed.update(old.keys() - new.keys())
+        return frozenset(changed)
+
+
+def fault_active(fault_code: str | None) -> bool:
+    """Return True if a fault code pin reports an active fault."""
+    if not fault_code:
+        return False
+    try:
+        return float(fault_code) != 0
+    except ValueError:
+        return True
@@ -0,0 +1,46 @@
+"""Diagnostics support for Raypak pool heater."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_EMAIL, CONF_PASSWORD, CONF_TOKEN
+from .coordinator import RaypakDataUpdateCoordinator
+from .fleet import async_get_fleet
+
+TO_REDACT = {CONF_TOKEN, CONF_EMAIL, CONF_PASSWORD}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: RaypakDataUpdateCoordinator = entry.runtime_data
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": async_redact_data(entry.options, TO_REDACT),
+        },
+        "coordinator": coordinator.diagnostics,
+        "fleet": async_get_fleet(hass).diagnostics,
+        "discovery": (
+            coordinator.discovery.diagnostics
+            if coordinator.discovery is not None
+            else None
+        ),
+        "anomalies": (
+            coordinator.anomalies.diagnostics
+            if coordinator.anomalies is not None
+            else None
+        ),
+        "planner": (
+            coordinator.planner.diagnostics
+            if coordinator.planner is not None
+            else None
+        ),
+        "data": coordinator.data.raw,
+    }
@@ -0,0 +1,228 @@
+"""Pin discovery from the getAll payload for Raypak pool heater."""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DISCOVERY_MAX_AGE,
+    DISCOVERY_POLLS,
+    DOMAIN,
+    KNOWN_PINS,
+    STORAGE_VERSION,
+)
+from .coordinator import RaypakDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+PIN_TYPE_NUMBER = "number"
+PIN_TYPE_TEXT = "text"
+
+
+def profile_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the store holding an entry's pin profile."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.profile")
+
+
+class PinProfile:
+    """What one pin looked like across the profiled getAll payloads."""
+
+    __slots__ = ("changes", "last", "maximum", "minimum", "populated", "type")
+
+    def __init__(self) -> None:
+        """Initialize the profile."""
+        self.type = PIN_TYPE_NUMBER
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        # Payloads with a non-empty value, and value changes between them
+        self.populated = 0
+        self.changes = 0
+        self.last: Any = None
+
+    def add(self, value: Any) -> None:
+        """Add the pin's value from one payload."""
+        if value is None or str(value).strip('"') == "":
+            return
+        if self.populated and value != self.last:
+            self.changes += 1
+        self.populated += 1
+        self.last = value
+        if self.type != PIN_TYPE_NUMBER:
+            return
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            self.type = PIN_TYPE_TEXT
+            return
+        self.minimum = min(self.minimum, number)
+        self.maximum = max(self.maximum, number)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the profile in its stored form."""
+        numeric = self.type == PIN_TYPE_NUMBER and self.populated
+        return {
+            "type": self.type,
+            "min": self.minimum if numeric else None,
+            "max": self.maximum if numeric else None,
+            "populated": self.populated,
+            "changes": self.changes,
+        }
+
+    @classmethod
+    def from_dict(cls, stored: dict[str, Any]) -> PinProfile:
+        """Return a profile from its stored form."""
+        profile = cls()
+        profile.type = stored["type"]
+        if stored["min"] is not None:
+            profile.minimum = stored["min"]
+            profile.maximum = stored["max"]
+        profile.populated = stored["populated"]
+        profile.changes = stored["changes"]
+        return profile
+
+
+class RaypakPinDiscovery:
+    """Profile a heater's getAll payload and remember its pins.
+
+    While profiling, getAll keeps every pin, and each full payload is added
+    to a new profile. After DISCOVERY_POLLS payloads, the profile is saved
+    and, the first time, listeners are called. It is then loaded at each
+    startup instead of profiling again, until it is DISCOVERY_MAX_AGE old:
+    the heater is then profiled again in the background, the old profile
+    staying in use until the new one replaces it.
+
+    A pin populated in most payloads and seen to change is a candidate for
+    a generated sensor.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: RaypakDataUpdateCoordinator,
+        entry_id: str,
+    ) -> None:
+        """Initialize discovery."""
+        self.coordinator = coordinator
+        self.pins: dict[str, PinProfile] = {}
+        self.samples = 0
+        self.complete = False
+        self.profiled_at: float | None = None
+        # The profile being collected, and its payload count
+        self._profiling: dict[str, PinProfile] | None = None
+        self._profiled = 0
+        self._store = profile_store(hass, entry_id)
+        self._listeners: list[CALLBACK_TYPE] = []
+
+    @property
+    def discovered_pins(self) -> dict[str, PinProfile]:
+        """Return the unknown pins worth a generated sensor."""
+        if not self.complete:
+            return {}
+        return {
+            pin: profile
+            for pin, profile in sorted(self.pins.items())
+            if pin not in KNOWN_PINS
+            and profile.changes
+            and profile.populated * 2 >= self.samples
+        }
+
+    @property
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the profile for diagnostics."""
+        return {
+            "complete": self.complete,
+            "profiling": self._profiling is not None,
+            "profiled_at": self.profiled_at,
+            "samples": self.samples,
+            "pins": {pin: profile.as_dict() for pin, profile in self.pins.items()},
+        }
+
+    async def async_load(self) -> None:
+        """Load a saved profile, or start profiling if there is none."""
+        if stored := await self._store.async_load():
+            self.pins = {
+                pin: PinProfile.from_dict(profile)
+                for pin, profile in stored["pins"].items()
+            }
+            self.samples = stored["samples"]
+            self.profiled_at = stored.get("profiled_at")
+            self.complete = True
+        self._async_check_age()
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start profiling coordinator updates; return a stop callback."""
+        return self.coordinator.async_add_listener(self._async_sample)
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Call back when profiling completes; return an unsubscribe callback."""
+        self._listeners.append(update_callback)
+        return lambda: self._listeners.remove(update_callback)
+
+    @callback
+    def _async_check_age(self) -> None:
+        """Start profiling if there is no profile or it is too old."""
+        if self._profiling is not None:
+            return
+        if self.complete and self.profiled_at is not None:
+            if time.time() - self.profiled_at < DISCOVERY_MAX_AGE:
+                return
+        self._profiling = {}
+        self._profiled = 0
+        self.coordinator.keep_all_pins = True
+        self.coordinator.async_sync_schema()
+
+    @callback
+    def _async_sample(self) -> None:
+        """Add the payload of a successful full refresh to the profile."""
+        coordinator = self.coordinator
+        if (pins := self._profiling) is None:
+            # This payload was fetched without the unread pins
+            self._async_check_age()
+            return
+        if not coordinator.full_refresh:
+            return
+        if not coordinator.last_update_success or coordinator.data is None:
+            return
+        raw = coordinator.data.raw
+        for pin in raw.keys() - pins.keys():
+            pins[pin] = PinProfile()
+        for pin, profile in pins.items():
+            profile.add(raw.get(pin))
+        self._profiled += 1
+        if self._profiled < DISCOVERY_POLLS:
+            return
+
+        first = not self.complete
+        self.pins = pins
+        self.samples = self._profiled
+        self.profiled_at = time.time()
+        self.complete = True
+        self._profiling = None
+        _LOGGER.debug(
+            "Profiled %d pins, discovered %s",
+            len(self.pins),
+            list(self.discovered_pins),
+        )
+        self._store.async_delay_save(
+            lambda: {
+                "samples": self.samples,
+                "profiled_at": self.profiled_at,
+                "pins": {
+                    pin: profile.as_dict() for pin, profile in self.pins.items()
+                },
+            },
+            1,
+        )
+        coordinator.keep_all_pins = False
+        if first:
+            for update_callback in list(self._listeners):
+                update_callback()
+        coordinator.async_sync_schema()
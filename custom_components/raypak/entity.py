@@ -2,18 +2,41 @@
 
 from __future__ import annotations
 
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, MANUFACTURER, MODEL
+from .const import ATTR_DATA_AS_OF, ATTR_STALE, DOMAIN, MANUFACTURER, MODEL
 from .coordinator import RaypakDataUpdateCoordinator
 
 
+@callback
+def async_entity_disabled(hass: HomeAssistant, platform: str, unique_id: str) -> bool:
+    """Return True if an entity is registered and disabled.
+
+    Disabled entities are not created at all, so their pins are neither
+    decoded nor fetched. Enabling one reloads the entry, which creates it.
+    """
+    registry = er.async_get(hass)
+    if (entity_id := registry.async_get_entity_id(platform, DOMAIN, unique_id)) is None:
+        return False
+    return registry.entities[entity_id].disabled
+
+
 class RaypakEntity(CoordinatorEntity[RaypakDataUpdateCoordinator]):
     """Base entity for Raypak devices."""
 
     has_entity_name = True
 
+    # Pins this entity reads from coordinator.data
+    _pins: tuple[str, ...] = ()
+    # Whether those pins must be fetched on every tiered poll
+    _volatile: bool = True
+
     def __init__(
         self,
         coordinator: RaypakDataUpdateCoordinator,
@@ -21,9 +44,44 @@ class RaypakEntity(CoordinatorEntity[RaypakDataUpdateCoordinator]):
     ) -> None:
         """Initialize the entity."""
         super().__init__(coordinator)
+        self._last_written_state: tuple[bool, bool] | None = None
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, entry_id)},
             manufacturer=MANUFACTURER,
             model=MODEL,
             name="Raypak Pool Heater",
         )
+
+    async def async_added_to_hass(self) -> None:
+        """Register the pins this entity reads with the coordinator."""
+        await super().async_added_to_hass()
+        if self._volatile and self._pins:
+            self.async_on_remove(self.coordinator.async_track_pins(self._pins))
+
+    def _coordinator_data_changed(self) -> bool:
+        """Return True if the last poll changed anything this entity reads."""
+        if not self._pins:
+            return True
+        return not self.coordinator.changed_pins.isdisjoint(self._pins)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Flag state served from cache while the cloud is unreachable."""
+        if not self.coordinator.stale:
+            return None
+        return {
+            ATTR_STALE: True,
+            ATTR_DATA_AS_OF: dt_util.utc_from_timestamp(
+                self.coordinator.data_timestamp
+            ).isoformat(),
+        }
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when availability, staleness or a read pin changed."""
+        state = (self.available, self.coordinator.stale)
+        if state == self._last_written_state and not self._coordinator_data_changed():
+            self.coordinator.suppressed_writes += 1
+            return
+        self._last_written_state = state
+        super()._handle_coordinator_update()
@@ -0,0 +1,190 @@
+"""Aggregates across every Raypak heater in Home Assistant."""
+
+from __future__ import annotations
+
+import heapq
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import (
+    DATA_FLEET,
+    DOMAIN,
+    PIN_FAULT_CODE,
+    PIN_FIRING_RATE,
+    PIN_FLUE_TEMP,
+    to_float_1,
+)
+from .coordinator import (
+    SLOT_FAULT_CODE,
+    SLOT_FIRING_RATE,
+    RaypakDataUpdateCoordinator,
+    fault_active,
+)
+from .snapshot import SNAPSHOT_SCHEMA
+
+# Pins the aggregates are computed from
+FLEET_PINS = frozenset({PIN_FIRING_RATE, PIN_FAULT_CODE, PIN_FLUE_TEMP})
+
+SLOT_FLUE_TEMP = SNAPSHOT_SCHEMA.slot(PIN_FLUE_TEMP, to_float_1)
+
+
+@callback
+def async_get_fleet(hass: HomeAssistant) -> RaypakFleet:
+    """Return the fleet aggregator, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (fleet := domain_data.get(DATA_FLEET)) is None:
+        fleet = domain_data[DATA_FLEET] = RaypakFleet()
+    return fleet
+
+
+class RaypakFleet:
+    """Running totals over all heaters, updated from each poll's changes.
+
+    Every heater contributes its firing rate, whether it is firing, whether
+    it has a fault, and its flue temperature. A poll that changes none of
+    those pins costs nothing. One that does swaps the heater's old
+    contribution for the new one, so sums and counts are O(1). The maximum
+    uses a heap with lazy deletion, so it is O(log heaters) amortised.
+    A heater whose coordinator is failing drops out until it recovers.
+
+    The fleet sensors exist once, on the first entry that has them turned
+    on. When that entry unloads, the next such entry takes them over.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the fleet."""
+        self.heaters = 0
+        self.total_firing_rate = 0.0
+        self.firing = 0
+        self.faulted = 0
+        self._contributions: dict[str, tuple[float, bool, bool, float | None]] = {}
+        # (-flue temperature, entry id) with stale entries left in place
+        self._flue_heap: list[tuple[float, str]] = []
+        self._listeners: list[CALLBACK_TYPE] = []
+        # Entries offering to host the fleet sensors, in setup order, with
+        # the callback that adds the sensors; the first one hosts them
+        self._hosts: dict[str, CALLBACK_TYPE] = {}
+
+    @property
+    def max_flue_temperature(self) -> float | None:
+        """Return the highest flue temperature across the fleet."""
+        heap = self._flue_heap
+        while heap:
+            negative, entry_id = heap[0]
+            contribution = self._contributions.get(entry_id)
+            if contribution is not None and contribution[3] == -negative:
+                return -negative
+            heapq.heappop(heap)
+        return None
+
+    @property
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the aggregates for diagnostics."""
+        return {
+            "heaters": self.heaters,
+            "total_firing_rate": self.total_firing_rate,
+            "firing": self.firing,
+            "faulted": self.faulted,
+            "max_flue_temperature": self.max_flue_temperature,
+        }
+
+    @callback
+    def async_add_coordinator(
+        self, entry_id: str, coordinator: RaypakDataUpdateCoordinator
+    ) -> CALLBACK_TYPE:
+        """Track a heater; return a callback that removes it."""
+
+        @callback
+        def _async_coordinator_updated() -> None:
+            if coordinator.data is None or not coordinator.last_update_success:
+                self._async_update(entry_id, None)
+            elif (
+                entry_id not in self._contributions
+                or not FLEET_PINS.isdisjoint(coordinator.changed_pins)
+            ):
+                self._async_update(entry_id, coordinator.data.values)
+
+        unsub = coordinator.async_add_listener(_async_coordinator_updated)
+        if coordinator.data is not None:
+            self._async_update(entry_id, coordinator.data.values)
+
+        @callback
+        def _async_remove() -> None:
+            unsub()
+            self._async_update(entry_id, None)
+
+        return _async_remove
+
+    @callback
+    def async_add_host(
+        self, entry_id: str, add_sensors: CALLBACK_TYPE
+    ) -> CALLBACK_TYPE:
+        """Offer an entry to host the fleet sensors; return a withdraw callback.
+
+        The sensors are added right away if no entry hosts them yet, and
+        handed to the next entry in line when the host withdraws.
+        """
+        self._hosts[entry_id] = add_sensors
+        if len(self._hosts) == 1:
+            add_sensors()
+
+        @callback
+        def _async_remove() -> None:
+            hosting = next(iter(self._hosts), None) == entry_id
+            self._hosts.pop(entry_id, None)
+            if hosting and self._hosts:
+                next(iter(self._hosts.values()))()
+
+        return _async_remove
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Call back when an aggregate changes; return an unsubscribe callback."""
+        self._listeners.append(update_callback)
+        return lambda: self._listeners.remove(update_callback)
+
+    @callback
+    def _async_update(self, entry_id: str, values: list[Any] | None) -> None:
+        """Replace a heater's contribution and notify listeners on change."""
+        old = self._contributions.pop(entry_id, None)
+        new = None
+        if values is not None:
+            firing_rate = values[SLOT_FIRING_RATE] or 0.0
+            new = (
+                firing_rate,
+                firing_rate > 0,
+                fault_active(values[SLOT_FAULT_CODE]),
+                values[SLOT_FLUE_TEMP],
+            )
+        if old == new:
+            if new is not None:
+                self._contributions[entry_id] = new
+            return
+
+        if old is not None:
+            self.heaters -= 1
+            self.total_firing_rate -= old[0]
+            self.firing -= old[1]
+            self.faulted -= old[2]
+        if new is not None:
+            self._contributions[entry_id] = new
+            self.heaters += 1
+            self.total_firing_rate += new[0]
+            self.firing += new[1]
+            self.faulted += new[2]
+            if new[3] is not None:
+                heapq.heappush(self._flue_heap, (-new[3], entry_id))
+        if not self._contributions:
+            self.total_firing_rate = 0.0
+            self._flue_heap.clear()
+        elif len(self._flue_heap) > 4 * len(self._contributions) + 16:
+            # Drop stale entries that never reached the top
+            self._flue_heap = [
+                (-contribution[3], entry_id)
+                for entry_id, contribution in self._contributions.items()
+                if contribution[3] is not None
+            ]
+            heapq.heapify(self._flue_heap)
+        for update_callback in list(self._listeners):
+            update_callback()
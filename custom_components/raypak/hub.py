@@ -0,0 +1,173 @@
+"""Shared per-server hub for Raypak pool heaters."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .api import RaypakApiClient, RaypakCircuitBreaker, RaypakRateLimiter
+from .const import DATA_HUBS, DOMAIN, HUB_MAX_CONCURRENT_REQUESTS, REAUTH_ACCOUNT
+from .coordinator import RaypakDataUpdateCoordinator
+from .session import async_get_session
+from .stream import RaypakStream
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_get_hub(hass: HomeAssistant, server: str) -> RaypakHub:
+    """Return the hub for a server, creating it on first use."""
+    hubs: dict[str, RaypakHub] = hass.data.setdefault(DOMAIN, {}).setdefault(
+        DATA_HUBS, {}
+    )
+    if (hub := hubs.get(server)) is None:
+        hub = hubs[server] = RaypakHub(hass, server)
+    return hub
+
+
+class RaypakHub:
+    """Shares one connection pool, request cap and request budget per server.
+
+    Coordinators registered in hub mode are polled by a single scheduler
+    that spreads their refreshes evenly across the poll interval. Entries
+    with push updates share one app stream per RayMoTe account. A stream
+    whose login is rejected is dropped, and its entries are asked to
+    reauthenticate.
+    """
+
+    def __init__(self, hass: HomeAssistant, server: str) -> None:
+        """Initialize the hub."""
+        self.hass = hass
+        self.server = server
+        self.session = async_get_session(hass)
+        self.request_semaphore = asyncio.Semaphore(HUB_MAX_CONCURRENT_REQUESTS)
+        self.rate_limiter = RaypakRateLimiter()
+        self.circuit_breaker = RaypakCircuitBreaker()
+        self._entries: set[str] = set()
+        self._coordinators: dict[str, RaypakDataUpdateCoordinator] = {}
+        self._refresh_tasks: dict[str, asyncio.Task[None]] = {}
+        self._unsub_poll: CALLBACK_TYPE | None = None
+        # App streams by account email
+        self.streams: dict[str, RaypakStream] = {}
+
+    @callback
+    def async_create_client(self, entry_id: str, token: str) -> RaypakApiClient:
+        """Create an API client for a config entry on this server."""
+        self._entries.add(entry_id)
+        return RaypakApiClient(
+            session=self.session,
+            server=self.server,
+            token=token,
+            request_semaphore=self.request_semaphore,
+            rate_limiter=self.rate_limiter,
+            circuit_breaker=self.circuit_breaker,
+        )
+
+    @callback
+    def async_release(self, entry_id: str) -> None:
+        """Release a config entry, dropping the hub once it is unused."""
+        self._entries.discard(entry_id)
+        self._async_remove_coordinator(entry_id)
+        if not self._entries:
+            self.hass.data[DOMAIN][DATA_HUBS].pop(self.server, None)
+
+    @callback
+    def async_add_coordinator(
+        self, entry_id: str, coordinator: RaypakDataUpdateCoordinator
+    ) -> CALLBACK_TYPE:
+        """Poll a coordinator from the hub scheduler."""
+        self._coordinators[entry_id] = coordinator
+        if self._unsub_poll is None:
+            self._async_schedule_poll()
+        return lambda: self._async_remove_coordinator(entry_id)
+
+    @callback
+    def async_add_stream_coordinator(
+        self,
+        token: str,
+        coordinator: RaypakDataUpdateCoordinator,
+        email: str,
+        password: str,
+    ) -> CALLBACK_TYPE:
+        """Feed a coordinator from its account's app stream, starting it if needed."""
+        if (stream := self.streams.get(email)) is None:
+            stream = self.streams[email] = RaypakStream(
+                self.hass,
+                self.session,
+                self.server,
+                email,
+                password,
+                lambda: self._async_stream_auth_failed(email, stream),
+            )
+            stream.async_start()
+        stream.coordinators[token] = coordinator
+
+        @callback
+        def _async_remove() -> None:
+            stream.coordinators.pop(token, None)
+            coordinator.async_set_push_connected(False)
+            if not stream.coordinators and self.streams.get(email) is stream:
+                del self.streams[email]
+                self.hass.async_create_background_task(
+                    stream.async_stop(), f"{DOMAIN} stream stop"
+                )
+
+        return _async_remove
+
+    @callback
+    def _async_stream_auth_failed(self, email: str, stream: RaypakStream) -> None:
+        """Drop a stream whose login was rejected and reauth its entries."""
+        if self.streams.get(email) is stream:
+            del self.streams[email]
+        for coordinator in stream.coordinators.values():
+            if (entry := coordinator.config_entry) is not None:
+                entry.async_start_reauth(self.hass, context={REAUTH_ACCOUNT: True})
+
+    @callback
+    def _async_remove_coordinator(self, entry_id: str) -> None:
+        """Stop polling a coordinator."""
+        self._coordinators.pop(entry_id, None)
+        if task := self._refresh_tasks.pop(entry_id, None):
+            task.cancel()
+        if not self._coordinators and self._unsub_poll is not None:
+            self._unsub_poll()
+            self._unsub_poll = None
+
+    @property
+    def poll_interval(self) -> float:
+        """Return the shortest poll interval requested by any member."""
+        return min(
+            coordinator.poll_interval for coordinator in self._coordinators.values()
+        )
+
+    @callback
+    def _async_schedule_poll(self) -> None:
+        """Schedule the next poll cycle."""
+        self._unsub_poll = async_call_later(
+            self.hass, self.poll_interval, self._async_poll_cycle
+        )
+
+    @callback
+    def _async_poll_cycle(self, _now: datetime) -> None:
+        """Start one poll of every member, staggered across the interval."""
+        spacing = self.poll_interval / len(self._coordinators)
+        for index, (entry_id, coordinator) in enumerate(self._coordinators.items()):
+            if (task := self._refresh_tasks.get(entry_id)) and not task.done():
+                _LOGGER.debug("Skipping %s, previous poll still running", entry_id)
+                continue
+            self._refresh_tasks[entry_id] = self.hass.async_create_background_task(
+                self._async_staggered_refresh(coordinator, index * spacing),
+                f"{DOMAIN} hub refresh {entry_id}",
+            )
+        self._async_schedule_poll()
+
+    async def _async_staggered_refresh(
+        self, coordinator: RaypakDataUpdateCoordinator, delay: float
+    ) -> None:
+        """Refresh a coordinator after its slot offset."""
+        await asyncio.sleep(delay)
+        await coordinator.async_refresh()
@@ -0,0 +1,235 @@
+"""Constant-memory timing and size metrics for Raypak pool heater."""
+
+from __future__ import annotations
+
+import contextlib
+import math
+import time
+from collections import Counter
+from collections.abc import Iterator
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+
+# Duration buckets: 10 µs upward in steps of sqrt(2), topping out near 5 min
+DURATION_BUCKET_START = 0.00001
+DURATION_BUCKET_FACTOR = math.sqrt(2)
+DURATION_BUCKETS = 50
+# Size buckets: 64 bytes upward in powers of two, topping out near 32 MiB
+SIZE_BUCKET_START = 64
+SIZE_BUCKET_FACTOR = 2.0
+SIZE_BUCKETS = 20
+# Histograms cover the current and the previous window (seconds)
+HISTOGRAM_WINDOW = 600.0
+
+# Counted at each request; see RaypakMetrics.count
+REQUESTS = "requests"
+ERRORS = "errors"
+TIMEOUTS = "timeouts"
+THROTTLED = "throttled"
+CIRCUIT_OPEN = "circuit_open"
+COMMAND_RETRIES = "command_retries"
+DNS_CACHE_HITS = "dns_cache_hits"
+CONNECTIONS_REUSED = "connections_reused"
+
+
+class Histogram:
+    """Rolling histogram with fixed, geometrically spaced buckets.
+
+    Memory is constant: two arrays of bucket counts, one for the current
+    window and one for the previous. Percentiles cover both, so they
+    reflect the last one to two windows, and are interpolated within the
+    bucket, so they are accurate to about one bucket width.
+    """
+
+    __slots__ = (
+        "_bounds",
+        "_current",
+        "_factor",
+        "_previous",
+        "_start",
+        "_window",
+        "_window_start",
+        "count",
+        "last",
+        "max",
+    )
+
+    def __init__(
+        self,
+        start: float = DURATION_BUCKET_START,
+        factor: float = DURATION_BUCKET_FACTOR,
+        buckets: int = DURATION_BUCKETS,
+        window: float = HISTOGRAM_WINDOW,
+    ) -> None:
+        """Initialize the histogram."""
+        self._start = start
+        self._factor = factor
+        self._bounds = [start * factor**index for index in range(buckets)]
+        self._current = [0] * (buckets + 1)
+        self._previous = [0] * (buckets + 1)
+        self._window = window
+        self._window_start = time.monotonic()
+        self.count = 0
+        self.last: float | None = None
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """Add a sample."""
+        now = time.monotonic()
+        if now - self._window_start >= self._window:
+            if now - self._window_start >= 2 * self._window:
+                self._previous = [0] * len(self._current)
+            else:
+                self._previous = self._current
+            self._current = [0] * len(self._previous)
+            self._window_start = now
+        if value <= self._start:
+            index = 0
+        else:
+            index = min(
+                len(self._bounds),
+                math.ceil(math.log(value / self._start, self._factor)),
+            )
+        self._current[index] += 1
+        self.count += 1
+        self.last = value
+        self.max = max(self.max, value)
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return a percentile of the recent samples."""
+        counts = [a + b for a, b in zip(self._current, self._previous)]
+        total = sum(counts)
+        if not total:
+            return None
+        rank = fraction * total
+        seen = 0
+        for index, count in enumerate(counts):
+            if count and seen + count >= rank:
+                upper = self._bounds[index] if index < len(self._bounds) else self.max
+                lower = self._bounds[index - 1] if index else 0.0
+                value = lower + (upper - lower) * (rank - seen) / count
+                return min(value, self.max)
+            seen += count
+        return self.max
+
+    def as_dict(self, scale: float = 1.0, digits: int = 1) -> dict[str, Any]:
+        """Return a summary, with values multiplied by ``scale``."""
+
+        def _scaled(value: float | None) -> float | None:
+            return None if value is None else round(value * scale, digits)
+
+        return {
+            "count": self.count,
+            "last": _scaled(self.last),
+            "p50": _scaled(self.percentile(0.5)),
+            "p90": _scaled(self.percentile(0.9)),
+            "p99": _scaled(self.percentile(0.99)),
+            "max": _scaled(self.max),
+        }
+
+
+class RaypakMetrics:
+    """Timing spans, sizes and counters for one heater's hot path."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.durations: dict[str, Histogram] = {}
+        self.sizes: dict[str, Histogram] = {}
+        self.counters: Counter[str] = Counter()
+
+    def record_duration(self, name: str, seconds: float) -> None:
+        """Add a duration sample."""
+        if (histogram := self.durations.get(name)) is None:
+            histogram = self.durations[name] = Histogram()
+        histogram.record(seconds)
+
+    def record_size(self, name: str, size: int) -> None:
+        """Add a size sample, in bytes."""
+        if (histogram := self.sizes.get(name)) is None:
+            histogram = self.sizes[name] = Histogram(
+                SIZE_BUCKET_START, SIZE_BUCKET_FACTOR, SIZE_BUCKETS
+            )
+        histogram.record(size)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Increment a counter."""
+        self.counters[name] += amount
+
+    @contextlib.contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time the enclosed block, including when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_duration(name, time.perf_counter() - start)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all metrics, durations in milliseconds and sizes in bytes."""
+        return {
+            "durations_ms": {
+                name: histogram.as_dict(1000)
+                for name, histogram in sorted(self.durations.items())
+            },
+            "sizes_bytes": {
+                name: histogram.as_dict(digits=0)
+                for name, histogram in sorted(self.sizes.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+
+def create_trace_config() -> aiohttp.TraceConfig:
+    """Return a TraceConfig timing DNS lookups and new connections.
+
+    Requests opt in by passing ``trace_request_ctx=metrics``; the time goes
+    to that RaypakMetrics. New connection time covers TCP connect and the
+    TLS handshake together, since aiohttp doesn't report them separately.
+    """
+    trace_config = aiohttp.TraceConfig()
+
+    async def _on_dns_start(
+        _session: aiohttp.ClientSession, context: SimpleNamespace, _params: Any
+    ) -> None:
+        context.dns_start = time.perf_counter()
+
+    async def _on_dns_end(
+        _session: aiohttp.ClientSession, context: SimpleNamespace, _params: Any
+    ) -> None:
+        if isinstance(metrics := context.trace_request_ctx, RaypakMetrics):
+            metrics.record_duration("dns", time.perf_counter() - context.dns_start)
+
+    async def _on_dns_cache_hit(
+        _session: aiohttp.ClientSession, context: SimpleNamespace, _params: Any
+    ) -> None:
+        if isinstance(metrics := context.trace_request_ctx, RaypakMetrics):
+            metrics.count(DNS_CACHE_HITS)
+
+    async def _on_connect_start(
+        _session: aiohttp.ClientSession, context: SimpleNamespace, _params: Any
+    ) -> None:
+        context.connect_start = time.perf_counter()
+
+    async def _on_connect_end(
+        _session: aiohttp.ClientSession, context: SimpleNamespace, _params: Any
+    ) -> None:
+        if isinstance(metrics := context.trace_request_ctx, RaypakMetrics):
+            metrics.record_duration(
+                "connect", time.perf_counter() - context.connect_start
+            )
+
+    async def _on_connection_reused(
+        _session: aiohttp.ClientSession, context: SimpleNamespace, _params: Any
+    ) -> None:
+        if isinstance(metrics := context.trace_request_ctx, RaypakMetrics):
+            metrics.count(CONNECTIONS_REUSED)
+
+    trace_config.on_dns_resolvehost_start.append(_on_dns_start)
+    trace_config.on_dns_resolvehost_end.append(_on_dns_end)
+    trace_config.on_dns_cache_hit.append(_on_dns_cache_hit)
+    trace_config.on_connection_create_start.append(_on_connect_start)
+    trace_config.on_connection_create_end.append(_on_connect_end)
+    trace_config.on_connection_reuseconn.append(_on_connection_reused)
+    return trace_config
@@ -0,0 +1,347 @@
+"""Price-aware heating schedules for Raypak pool heater."""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import math
+import time
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    PIN_INLET_TEMP,
+    PIN_OPERATION_MODE,
+    PIN_SETPOINT,
+    PLAN_MAX_HORIZON,
+    PLAN_REPLAN_TOLERANCE,
+    PLAN_SLOT_INTERVAL,
+    STORAGE_VERSION,
+)
+from .coordinator import (
+    SLOT_HEAT_MODE,
+    SLOT_INLET_TEMP,
+    SLOT_SETPOINT,
+    RaypakDataUpdateCoordinator,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def schedule_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the store holding an entry's heating schedule."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.schedule")
+
+
+class RaypakHeatingPlanner:
+    """Heat the pool to a target by a deadline in the cheapest slots.
+
+    The time until the deadline is split into PLAN_SLOT_INTERVAL slots on
+    the quarter hour, each priced from the tariff table in effect at its
+    start. Slots are ranked cheapest first, later slots winning ties as
+    the pool loses less heat before the deadline. The plan fires in the
+    fewest top-ranked slots that the thermal model predicts will reach the
+    target, found by binary search over the ranking.
+
+    Adjacent firing slots are merged into windows. The setpoint (v111) is
+    written once, and heat mode (v53) only at window edges where it has to
+    change. The plan is recomputed at each window edge and whenever the
+    pool drifts more than PLAN_REPLAN_TOLERANCE from its predicted
+    temperature, not on every poll. At the deadline heat mode is left on,
+    so the heater holds the target, and the schedule ends. A saved schedule
+    whose deadline passed while Home Assistant was stopped is dropped
+    without touching the heater.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: RaypakDataUpdateCoordinator,
+        entry_id: str,
+    ) -> None:
+        """Initialize the planner."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.target: float | None = None
+        self.ready_by: datetime | None = None
+        # (start timestamp, price) sorted by start
+        self.prices: list[tuple[float, float]] = []
+        self.windows: list[tuple[datetime, datetime]] = []
+        self.reachable = True
+        # Predicted pool temperature at each slot start of the current plan
+        self._expected: list[tuple[float, float]] = []
+        self._store = schedule_store(hass, entry_id)
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._listeners: list[CALLBACK_TYPE] = []
+
+    @property
+    def active(self) -> bool:
+        """Return True while a schedule is set."""
+        return self.ready_by is not None
+
+    @property
+    def plan(self) -> list[dict[str, str]] | None:
+        """Return the firing windows of the current plan."""
+        if not self.active:
+            return None
+        return [
+            {"start": start.isoformat(), "end": end.isoformat()}
+            for start, end in self.windows
+        ]
+
+    @property
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the schedule and plan for diagnostics."""
+        return {
+            "target": self.target,
+            "ready_by": self.ready_by.isoformat() if self.ready_by else None,
+            "prices": len(self.prices),
+            "reachable": self.reachable,
+            "windows": self.plan,
+        }
+
+    async def async_load(self) -> None:
+        """Load a saved schedule."""
+        if not (stored := await self._store.async_load()):
+            return
+        self.target = stored["target"]
+        self.ready_by = dt_util.parse_datetime(stored["ready_by"])
+        self.prices = [(start, price) for start, price in stored["prices"]]
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start following coordinator updates; return a stop callback."""
+        unsub = self.coordinator.async_add_listener(self._async_coordinator_updated)
+        if self.ready_by is not None and dt_util.utcnow() >= self.ready_by:
+            # Missed while stopped: holding the target now would be a surprise
+            _LOGGER.info("Dropping heating schedule that ended at %s", self.ready_by)
+            self.async_cancel()
+        elif self.active:
+            self._async_replan()
+
+        @callback
+        def _async_stop() -> None:
+            unsub()
+            self._async_cancel_timer()
+
+        return _async_stop
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Call back when the plan changes; return an unsubscribe callback."""
+        self._listeners.append(update_callback)
+        return lambda: self._listeners.remove(update_callback)
+
+    def validate_schedule(self, ready_by: datetime) -> None:
+        """Raise HomeAssistantError if a schedule can't be planned."""
+        remaining = (dt_util.as_utc(ready_by) - dt_util.utcnow()).total_seconds()
+        if not 0 < remaining <= PLAN_MAX_HORIZON:
+            raise HomeAssistantError(
+                "Ready-by time must be in the future and within "
+                f"{PLAN_MAX_HORIZON // 86400} days"
+            )
+        if not self.coordinator.thermal.trained:
+            raise HomeAssistantError(
+                "The heating rate of this pool hasn't been learned yet"
+            )
+
+    @callback
+    def async_set_schedule(
+        self,
+        target: float,
+        ready_by: datetime,
+        prices: list[tuple[datetime, float]],
+    ) -> None:
+        """Plan heating to target by ready_by at the given prices."""
+        self.validate_schedule(ready_by)
+        ready_by = dt_util.as_utc(ready_by)
+        # The heater takes whole degrees
+        target = round(target)
+        self.target = target
+        self.ready_by = ready_by
+        self.prices = sorted(
+            (dt_util.as_utc(start).timestamp(), price) for start, price in prices
+        )
+        self._store.async_delay_save(
+            lambda: {
+                "target": self.target,
+                "ready_by": self.ready_by.isoformat(),
+                "prices": self.prices,
+            },
+            1,
+        )
+        values = self.coordinator.data.values
+        if values[SLOT_SETPOINT] != target:
+            self.coordinator.commands.async_queue(PIN_SETPOINT, target)
+        self._async_replan()
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop the schedule, leaving the heater as it is."""
+        if not self.active:
+            return
+        self._async_cancel_timer()
+        self.target = self.ready_by = None
+        self.prices = []
+        self.windows = []
+        self._expected = []
+        self.hass.async_create_task(self._store.async_remove())
+        self._async_notify()
+
+    @callback
+    def _async_coordinator_updated(self) -> None:
+        """Recompute the plan if the pool has drifted from it."""
+        coordinator = self.coordinator
+        if not self.active or not self._expected or coordinator.data is None:
+            return
+        if PIN_INLET_TEMP not in coordinator.changed_pins:
+            return
+        if (current := coordinator.data.values[SLOT_INLET_TEMP]) is None:
+            return
+        index = bisect.bisect_right(self._expected, (time.time(), math.inf)) - 1
+        expected = self._expected[max(index, 0)][1]
+        if abs(current - expected) > PLAN_REPLAN_TOLERANCE:
+            _LOGGER.debug("Pool at %s°F, plan expected %s°F", current, expected)
+            self._async_replan()
+
+    @callback
+    def _async_replan(self) -> None:
+        """Recompute the firing windows from now and act on them."""
+        now = dt_util.utcnow()
+        if self.ready_by is None or now >= self.ready_by:
+            self._async_finish()
+            return
+        values = self.coordinator.data.values
+        current = values[SLOT_INLET_TEMP]
+        slots = self._slots(now.timestamp(), self.ready_by.timestamp())
+        self._plan(slots, current)
+        self._async_apply(now)
+        self._async_notify()
+
+    def _slots(self, start: float, end: float) -> list[tuple[float, float]]:
+        """Return the slots between start and end, aligned to the interval."""
+        edges = [start]
+        edge = (start // PLAN_SLOT_INTERVAL + 1) * PLAN_SLOT_INTERVAL
+        while edge < end:
+            edges.append(edge)
+            edge += PLAN_SLOT_INTERVAL
+        edges.append(end)
+        return list(zip(edges, edges[1:]))
+
+    def _price_at(self, timestamp: float) -> float:
+        """Return the price in effect at a time, inf before the table."""
+        index = bisect.bisect_right(self.prices, (timestamp, math.inf)) - 1
+        return self.prices[index][1] if index >= 0 else math.inf
+
+    def _plan(self, slots: list[tuple[float, float]], current: float | None) -> None:
+        """Choose the cheapest firing slots that reach the target."""
+        target = self.target
+        assert target is not None
+        thermal = self.coordinator.thermal
+        ranking = sorted(
+            range(len(slots)),
+            key=lambda index: (self._price_at(slots[index][0]), -index),
+        )
+
+        def simulate(count: int) -> list[float]:
+            """Return the temperature at each slot edge firing count slots."""
+            firing = set(ranking[:count])
+            temperature = current
+            temperatures = [temperature]
+            for index, (start, end) in enumerate(slots):
+                fraction = 1.0 if index in firing else 0.0
+                temperature = thermal.temperature_after(
+                    temperature, fraction, end - start
+                )
+                if fraction:
+                    # The heater's thermostat stops at the setpoint
+                    temperature = min(temperature, max(target, temperatures[-1]))
+                temperatures.append(temperature)
+            return temperatures
+
+        if current is None or not thermal.trained:
+            count = len(slots)
+        else:
+            low, high = 0, len(slots)
+            while low < high:
+                middle = (low + high) // 2
+                if simulate(middle)[-1] >= target:
+                    high = middle
+                else:
+                    low = middle + 1
+            count = low
+        self.reachable = current is not None and thermal.trained
+        if self.reachable:
+            temperatures = simulate(count)
+            self.reachable = temperatures[-1] >= target
+            self._expected = [
+                (start, temperature)
+                for (start, _), temperature in zip(slots, temperatures)
+            ]
+        else:
+            self._expected = []
+        if not self.reachable:
+            _LOGGER.warning(
+                "%.0f°F can't be reached by %s; heating until then",
+                target,
+                self.ready_by,
+            )
+
+        firing = sorted(ranking[:count])
+        windows: list[tuple[datetime, datetime]] = []
+        for index in firing:
+            start, end = (dt_util.utc_from_timestamp(edge) for edge in slots[index])
+            if windows and windows[-1][1] == start:
+                windows[-1] = (windows[-1][0], end)
+            else:
+                windows.append((start, end))
+        self.windows = windows
+
+    @callback
+    def _async_apply(self, now: datetime) -> None:
+        """Set heat mode for the current window and wait for the next edge."""
+        heating = any(start <= now < end for start, end in self.windows)
+        self._async_set_heat_mode(heating)
+        self._async_cancel_timer()
+        edges = [edge for window in self.windows for edge in window if edge > now]
+        self._unsub_timer = async_track_point_in_utc_time(
+            self.hass, self._async_edge_reached, min(edges, default=self.ready_by)
+        )
+
+    @callback
+    def _async_edge_reached(self, _now: datetime) -> None:
+        """Recompute the plan at a window edge."""
+        self._unsub_timer = None
+        self._async_replan()
+
+    @callback
+    def _async_finish(self) -> None:
+        """Leave the heater holding the target once the deadline passes."""
+        self._async_set_heat_mode(True)
+        self.async_cancel()
+
+    @callback
+    def _async_set_heat_mode(self, heating: bool) -> None:
+        """Write heat mode, only if the heater isn't already in it."""
+        if self.coordinator.data.values[SLOT_HEAT_MODE] != heating:
+            self.coordinator.commands.async_queue(PIN_OPERATION_MODE, int(heating))
+
+    @callback
+    def _async_cancel_timer(self) -> None:
+        """Stop waiting for the next window edge."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    @callback
+    def _async_notify(self) -> None:
+        """Call the plan listeners."""
+        for update_callback in list(self._listeners):
+            update_callback()
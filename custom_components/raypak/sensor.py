@@ -2,14 +2,459 @@
 
 from __future__ import annotations
 
-from homeassistant.components.sensor import SensorEntity
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    Platform,
+    UnitOfTemperature,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import RaypakSensorEntityDescription, SENSOR_DESCRIPTIONS
+from .api import BreakerState
+from .const import (
+    CONF_FLEET_SENSORS,
+    CONF_LONG_TERM_STATISTICS,
+    DEFAULT_FLEET_SENSORS,
+    DEFAULT_LONG_TERM_STATISTICS,
+    DOMAIN,
+    MANUFACTURER,
+    PIN_CAPACITY,
+    PIN_ERROR_TEXT,
+    PIN_FAULT_CODE,
+    PIN_FIRING_RATE,
+    PIN_FLAME_CURRENT,
+    PIN_FLOW_PRESSURE,
+    PIN_FLOW_RATE,
+    PIN_FLUE_TEMP,
+    PIN_HEATING_CYCLES,
+    PIN_HEATING_TIME,
+    PIN_IGNITION_VOLTAGE,
+    PIN_INLET_TEMP,
+    PIN_OPERATION_MODE,
+    PIN_OUTLET_TEMP,
+    PIN_POWER_CYCLES,
+    PIN_SETPOINT,
+    PIN_VSP_SPEED,
+    to_float_1,
+    to_float_2,
+    to_int,
+    to_str,
+    to_text,
+)
 from .coordinator import RaypakDataUpdateCoordinator
-from .entity import RaypakEntity
+from .discovery import PIN_TYPE_NUMBER, PinProfile
+from .entity import RaypakEntity, async_entity_disabled
+from .fleet import RaypakFleet, async_get_fleet
+from .snapshot import SNAPSHOT_SCHEMA
+from .statistics import RaypakStatisticsCompactor
+
+SLOT_INLET_TEMP = SNAPSHOT_SCHEMA.slot(PIN_INLET_TEMP, to_float_1)
+SLOT_OUTLET_TEMP = SNAPSHOT_SCHEMA.slot(PIN_OUTLET_TEMP, to_float_1)
+
+
+def series_rate(
+    pin: str, per: float, non_negative: bool = False
+) -> Callable[[Any], float | None]:
+    """Return a value_fn giving a pin's rate of change per ``per`` seconds.
+
+    The rate stays unknown until a quarter of the series horizon has been
+    seen, so a per-day rate isn't extrapolated from a few polls. With
+    ``non_negative`` a drop (a counter reset) reads as unknown.
+    """
+
+    def value_fn(coordinator: Any) -> float | None:
+        series = coordinator.series[pin]
+        if series.span() < series.horizon / 4:
+            return None
+        if (rate := series.rate()) is None or (non_negative and rate < 0):
+            return None
+        return round(rate * per, 1)
+
+    return value_fn
+
+
+def duty_cycle(coordinator: Any) -> float | None:
+    """Return the percentage of the last hour the burner was firing."""
+    if (mean := coordinator.series[PIN_FIRING_RATE].mean()) is None:
+        return None
+    return round(mean * 100, 1)
+
+
+def duration_metric(name: str) -> Callable[[Any], float | None]:
+    """Return a value_fn giving the median of a timing metric in ms."""
+
+    def value_fn(coordinator: Any) -> float | None:
+        if (histogram := coordinator.client.metrics.durations.get(name)) is None:
+            return None
+        if (median := histogram.percentile(0.5)) is None:
+            return None
+        return round(median * 1000, 1)
+
+    return value_fn
+
+
+def duration_metric_attributes(name: str) -> Callable[[Any], dict[str, Any] | None]:
+    """Return an attributes_fn giving the summary of a timing metric in ms."""
+
+    def attributes_fn(coordinator: Any) -> dict[str, Any] | None:
+        if (histogram := coordinator.client.metrics.durations.get(name)) is None:
+            return None
+        return histogram.as_dict(1000)
+
+    return attributes_fn
+
+
+def delta_t(coordinator: Any) -> float | None:
+    """Return the outlet minus inlet temperature."""
+    values = coordinator.data.values
+    inlet, outlet = values[SLOT_INLET_TEMP], values[SLOT_OUTLET_TEMP]
+    if inlet is None or outlet is None:
+        return None
+    return round(outlet - inlet, 1)
+
+
+def time_to_setpoint(coordinator: Any) -> int | None:
+    """Return the predicted minutes until the pool reaches the setpoint."""
+    if (seconds := coordinator.time_to_setpoint) is None:
+        return None
+    return round(seconds / 60)
+
+
+def discovered_description(
+    pin: str, profile: PinProfile
+) -> RaypakSensorEntityDescription:
+    """Return the description of a sensor generated for a discovered pin."""
+    numeric = profile.type == PIN_TYPE_NUMBER
+    return RaypakSensorEntityDescription(
+        key=f"pin_{pin}",
+        name=f"Pin {pin}",
+        pin=pin,
+        state_class=SensorStateClass.MEASUREMENT if numeric else None,
+        value_fn=to_float_2 if numeric else to_text,
+        entity_registry_enabled_default=False,
+    )
+
+
+@dataclass(frozen=True, kw_only=True)
+class RaypakSensorEntityDescription(SensorEntityDescription):
+    """Describes a Raypak sensor entity."""
+
+    pin: str
+    value_fn: Callable[[Any], Any] = lambda x: x
+    # False for slow-moving pins that tiered polling only refreshes via getAll
+    volatile: bool = True
+    # Downsampled into external statistics when long-term statistics is on
+    statistics: bool = False
+
+
+@dataclass(frozen=True, kw_only=True)
+class RaypakComputedSensorEntityDescription(SensorEntityDescription):
+    """Describes a Raypak sensor computed from coordinator state, not a pin."""
+
+    value_fn: Callable[[Any], Any]
+    attributes_fn: Callable[[Any], dict[str, Any] | None] = lambda _: None
+    # Live pins the value is computed from, fetched on every tiered poll
+    pins: tuple[str, ...] = ()
+    # Report even while the coordinator is failing
+    always_available: bool = False
+
+
+@dataclass(frozen=True, kw_only=True)
+class RaypakFleetSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor aggregated across all Raypak heaters."""
+
+    value_fn: Callable[[Any], Any]
+
+
+SENSOR_DESCRIPTIONS: tuple[RaypakSensorEntityDescription, ...] = (
+    RaypakSensorEntityDescription(
+        key="inlet_temperature",
+        translation_key="inlet_temperature",
+        pin=PIN_INLET_TEMP,
+        native_unit_of_measurement=UnitOfTemperature.FAHRENHEIT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=to_float_1,
+        statistics=True,
+    ),
+    RaypakSensorEntityDescription(
+        key="outlet_temperature",
+        translation_key="outlet_temperature",
+        pin=PIN_OUTLET_TEMP,
+        native_unit_of_measurement=UnitOfTemperature.FAHRENHEIT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=to_float_1,
+        statistics=True,
+    ),
+    RaypakSensorEntityDescription(
+        key="flue_temperature",
+        translation_key="flue_temperature",
+        pin=PIN_FLUE_TEMP,
+        native_unit_of_measurement=UnitOfTemperature.FAHRENHEIT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=to_float_1,
+        statistics=True,
+    ),
+    RaypakSensorEntityDescription(
+        key="ignition_voltage",
+        translation_key="ignition_voltage",
+        pin=PIN_IGNITION_VOLTAGE,
+        value_fn=to_text,
+    ),
+    RaypakSensorEntityDescription(
+        key="flame_current",
+        translation_key="flame_current",
+        pin=PIN_FLAME_CURRENT,
+        native_unit_of_measurement="µA",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=to_float_1,
+        statistics=True,
+    ),
+    RaypakSensorEntityDescription(
+        key="fault_code",
+        translation_key="fault_code",
+        pin=PIN_FAULT_CODE,
+        value_fn=to_str,
+    ),
+    RaypakSensorEntityDescription(
+        key="error_text",
+        translation_key="error_text",
+        pin=PIN_ERROR_TEXT,
+        value_fn=to_text,
+    ),
+    RaypakSensorEntityDescription(
+        key="capacity",
+        translation_key="capacity",
+        pin=PIN_CAPACITY,
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=to_float_1,
+    ),
+    RaypakSensorEntityDescription(
+        key="heating_cycles",
+        translation_key="heating_cycles",
+        pin=PIN_HEATING_CYCLES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=to_int,
+        volatile=False,
+    ),
+    RaypakSensorEntityDescription(
+        key="heating_time",
+        translation_key="heating_time",
+        pin=PIN_HEATING_TIME,
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=to_float_1,
+        volatile=False,
+    ),
+    RaypakSensorEntityDescription(
+        key="power_cycles",
+        translation_key="power_cycles",
+        pin=PIN_POWER_CYCLES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=to_int,
+        volatile=False,
+    ),
+    RaypakSensorEntityDescription(
+        key="flow_pressure",
+        translation_key="flow_pressure",
+        pin=PIN_FLOW_PRESSURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=to_float_2,
+    ),
+    RaypakSensorEntityDescription(
+        key="flow_rate",
+        translation_key="flow_rate",
+        pin=PIN_FLOW_RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=to_float_1,
+    ),
+    RaypakSensorEntityDescription(
+        key="vsp_speed",
+        translation_key="vsp_speed",
+        pin=PIN_VSP_SPEED,
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=to_float_1,
+    ),
+    RaypakSensorEntityDescription(
+        key="firing_rate",
+        translation_key="firing_rate",
+        pin=PIN_FIRING_RATE,
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=to_float_1,
+        statistics=True,
+    ),
+    RaypakSensorEntityDescription(
+        key="operation_mode",
+        translation_key="operation_mode_sensor",
+        pin=PIN_OPERATION_MODE,
+        value_fn=to_str,
+    ),
+)
+
+COMPUTED_SENSOR_DESCRIPTIONS: tuple[RaypakComputedSensorEntityDescription, ...] = (
+    RaypakComputedSensorEntityDescription(
+        key="heating_rate",
+        translation_key="heating_rate",
+        native_unit_of_measurement="°F/h",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=series_rate(PIN_INLET_TEMP, 3600),
+        pins=(PIN_INLET_TEMP,),
+    ),
+    RaypakComputedSensorEntityDescription(
+        key="delta_t",
+        translation_key="delta_t",
+        native_unit_of_measurement=UnitOfTemperature.FAHRENHEIT,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=delta_t,
+        pins=(PIN_INLET_TEMP, PIN_OUTLET_TEMP),
+    ),
+    RaypakComputedSensorEntityDescription(
+        key="duty_cycle",
+        translation_key="duty_cycle",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=duty_cycle,
+        pins=(PIN_FIRING_RATE,),
+    ),
+    RaypakComputedSensorEntityDescription(
+        key="heating_cycles_per_day",
+        translation_key="heating_cycles_per_day",
+        native_unit_of_measurement="cycles/d",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=series_rate(PIN_HEATING_CYCLES, 86400, non_negative=True),
+    ),
+    RaypakComputedSensorEntityDescription(
+        key="heating_time_per_day",
+        translation_key="heating_time_per_day",
+        native_unit_of_measurement="h/d",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=series_rate(PIN_HEATING_TIME, 86400, non_negative=True),
+    ),
+    RaypakComputedSensorEntityDescription(
+        key="power_cycles_per_day",
+        translation_key="power_cycles_per_day",
+        native_unit_of_measurement="cycles/d",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=series_rate(PIN_POWER_CYCLES, 86400, non_negative=True),
+    ),
+    RaypakComputedSensorEntityDescription(
+        key="time_to_setpoint",
+        translation_key="time_to_setpoint",
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        device_class=SensorDeviceClass.DURATION,
+        value_fn=time_to_setpoint,
+        pins=(
+            PIN_INLET_TEMP,
+            PIN_FIRING_RATE,
+            PIN_FLOW_RATE,
+            PIN_SETPOINT,
+            PIN_OPERATION_MODE,
+        ),
+    ),
+    RaypakComputedSensorEntityDescription(
+        key="poll_duration",
+        translation_key="poll_duration",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=duration_metric("update"),
+        attributes_fn=duration_metric_attributes("update"),
+    ),
+    RaypakComputedSensorEntityDescription(
+        key="request_duration",
+        translation_key="request_duration",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=duration_metric("request"),
+        attributes_fn=duration_metric_attributes("request"),
+    ),
+    RaypakComputedSensorEntityDescription(
+        key="fan_out_duration",
+        translation_key="fan_out_duration",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=duration_metric("fan_out"),
+        attributes_fn=duration_metric_attributes("fan_out"),
+    ),
+    RaypakComputedSensorEntityDescription(
+        key="cloud_connection",
+        translation_key="cloud_connection",
+        device_class=SensorDeviceClass.ENUM,
+        options=[state.value for state in BreakerState],
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda coordinator: coordinator.client.circuit_breaker.state,
+        attributes_fn=lambda coordinator: {
+            key: value
+            for key, value in coordinator.client.circuit_breaker.metrics.items()
+            if key != "state"
+        },
+        always_available=True,
+    ),
+)
+
+FLEET_SENSOR_DESCRIPTIONS: tuple[RaypakFleetSensorEntityDescription, ...] = (
+    RaypakFleetSensorEntityDescription(
+        key="heaters_reporting",
+        translation_key="heaters_reporting",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda fleet: fleet.heaters,
+    ),
+    RaypakFleetSensorEntityDescription(
+        key="heaters_firing",
+        translation_key="heaters_firing",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda fleet: fleet.firing,
+    ),
+    RaypakFleetSensorEntityDescription(
+        key="heaters_faulted",
+        translation_key="heaters_faulted",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda fleet: fleet.faulted,
+    ),
+    RaypakFleetSensorEntityDescription(
+        key="total_firing_rate",
+        translation_key="total_firing_rate",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda fleet: round(fleet.total_firing_rate, 1),
+    ),
+    RaypakFleetSensorEntityDescription(
+        key="max_flue_temperature",
+        translation_key="max_flue_temperature",
+        native_unit_of_measurement=UnitOfTemperature.FAHRENHEIT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda fleet: fleet.max_flue_temperature,
+    ),
+)
 
 
 async def async_setup_entry(
@@ -17,12 +462,72 @@ async def async_setup_entry(
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
-    """Set up Raypak sensor entities."""
+    """Set up Raypak sensor entities, skipping those disabled in the registry."""
     coordinator: RaypakDataUpdateCoordinator = entry.runtime_data
-    async_add_entities(
-        RaypakSensor(coordinator, entry.entry_id, description)
+    entry_id = entry.entry_id
+
+    def _enabled(unique_id: str) -> bool:
+        return not async_entity_disabled(hass, Platform.SENSOR, unique_id)
+
+    discovery = coordinator.discovery
+
+    def _discovered_sensors() -> list[SensorEntity]:
+        discovered = (
+            discovered_description(pin, profile)
+            for pin, profile in discovery.discovered_pins.items()
+        )
+        return [
+            RaypakSensor(coordinator, entry_id, description)
+            for description in discovered
+            if _enabled(f"{entry_id}_{description.key}")
+        ]
+
+    descriptions = [
+        description
         for description in SENSOR_DESCRIPTIONS
+        if _enabled(f"{entry_id}_{description.key}")
+    ]
+    entities: list[SensorEntity] = [
+        RaypakSensor(coordinator, entry_id, description)
+        for description in descriptions
+    ]
+    entities.extend(
+        RaypakComputedSensor(coordinator, entry_id, description)
+        for description in COMPUTED_SENSOR_DESCRIPTIONS
+        if _enabled(f"{entry_id}_{description.key}")
     )
+    if discovery is not None:
+        entities.extend(_discovered_sensors())
+
+        @callback
+        def _async_pins_discovered() -> None:
+            async_add_entities(_discovered_sensors())
+
+        entry.async_on_unload(discovery.async_add_listener(_async_pins_discovered))
+    if entry.options.get(CONF_FLEET_SENSORS, DEFAULT_FLEET_SENSORS):
+        fleet = async_get_fleet(hass)
+
+        @callback
+        def _async_add_fleet_sensors() -> None:
+            async_add_entities(
+                [
+                    RaypakFleetSensor(fleet, description)
+                    for description in FLEET_SENSOR_DESCRIPTIONS
+                    if _enabled(f"fleet_{description.key}")
+                ]
+            )
+
+        entry.async_on_unload(fleet.async_add_host(entry_id, _async_add_fleet_sensors))
+    if entry.options.get(CONF_LONG_TERM_STATISTICS, DEFAULT_LONG_TERM_STATISTICS):
+        compactor = RaypakStatisticsCompactor(
+            hass,
+            coordinator,
+            entry,
+            [description for description in descriptions if description.statistics],
+        )
+        entry.async_on_unload(compactor.async_start())
+    coordinator.async_sync_schema()
+    async_add_entities(entities)
 
 
 class RaypakSensor(RaypakEntity, SensorEntity):
@@ -40,12 +545,96 @@ class RaypakSensor(RaypakEntity, SensorEntity):
         super().__init__(coordinator, entry_id)
         self.entity_description = description
         self._attr_unique_id = f"{entry_id}_{description.key}"
+        self._pins = (description.pin,)
+        self._volatile = description.volatile
+        self._slot = SNAPSHOT_SCHEMA.slot(description.pin, description.value_fn)
 
     @property
     def native_value(self):
         """Return the sensor value."""
-        raw = self.coordinator.data.get(self.entity_description.pin)
-        try:
-            return self.entity_description.value_fn(raw)
-        except (ValueError, TypeError):
-            return None
+        return self.coordinator.data.values[self._slot]
+
+
+class RaypakComputedSensor(RaypakEntity, SensorEntity):
+    """Raypak sensor computed from coordinator state rather than read from a pin."""
+
+    entity_description: RaypakComputedSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: RaypakDataUpdateCoordinator,
+        entry_id: str,
+        description: RaypakComputedSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry_id)
+        self.entity_description = description
+        self._attr_unique_id = f"{entry_id}_{description.key}"
+        self._pins = description.pins
+        self._last_value: Any = None
+
+    @property
+    def available(self) -> bool:
+        """Return True if the value can be reported."""
+        return self.entity_description.always_available or super().available
+
+    def _coordinator_data_changed(self) -> bool:
+        """Return True if the reported value changed."""
+        value = self.entity_description.value_fn(self.coordinator)
+        if value == self._last_value:
+            return False
+        self._last_value = value
+        return True
+
+    @property
+    def native_value(self):
+        """Return the sensor value."""
+        return self.entity_description.value_fn(self.coordinator)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return details behind the value."""
+        return self.entity_description.attributes_fn(self.coordinator)
+
+
+class RaypakFleetSensor(SensorEntity):
+    """Sensor aggregated across every Raypak heater."""
+
+    entity_description: RaypakFleetSensorEntityDescription
+    has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        fleet: RaypakFleet,
+        description: RaypakFleetSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self.fleet = fleet
+        self.entity_description = description
+        self._attr_unique_id = f"fleet_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, "fleet")},
+            manufacturer=MANUFACTURER,
+            name="Raypak Fleet",
+        )
+        self._last_value: Any = None
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the fleet aggregates."""
+        await super().async_added_to_hass()
+        self._last_value = self.native_value
+        self.async_on_remove(self.fleet.async_add_listener(self._handle_fleet_update))
+
+    @callback
+    def _handle_fleet_update(self) -> None:
+        """Write state when this aggregate changed."""
+        if (value := self.native_value) == self._last_value:
+            return
+        self._last_value = value
+        self.async_write_ha_state()
+
+    @property
+    def native_value(self):
+        """Return the sensor value."""
+        return self.entity_description.value_fn(self.fleet)
@@ -0,0 +1,170 @@
+"""Services for Raypak pool heater."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import ATTR_TEMPERATURE
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.service import async_extract_config_entry_ids
+
+from .api import RaypakApiError
+from .const import (
+    ATTR_OPERATION_MODE,
+    ATTR_PRICE,
+    ATTR_PRICES,
+    ATTR_READY_BY,
+    ATTR_START,
+    BULK_MAX_CONCURRENT,
+    DOMAIN,
+    MAX_TEMP,
+    MIN_TEMP,
+    OPERATION_LIST,
+    OPERATION_OFF,
+    PIN_OPERATION_MODE,
+    PIN_SETPOINT,
+    SERVICE_BULK_SET,
+    SERVICE_CANCEL_HEATING_PLAN,
+    SERVICE_PLAN_HEATING,
+)
+from .coordinator import RaypakDataUpdateCoordinator
+
+PLAN_HEATING_SCHEMA = cv.make_entity_service_schema(
+    {
+        vol.Required(ATTR_TEMPERATURE): vol.All(
+            vol.Coerce(float), vol.Range(min=MIN_TEMP, max=MAX_TEMP)
+        ),
+        vol.Required(ATTR_READY_BY): cv.datetime,
+        vol.Optional(ATTR_PRICES, default=list): [
+            vol.Schema(
+                {
+                    vol.Required(ATTR_START): cv.datetime,
+                    vol.Required(ATTR_PRICE): vol.Coerce(float),
+                }
+            )
+        ],
+    }
+)
+CANCEL_HEATING_PLAN_SCHEMA = cv.make_entity_service_schema({})
+BULK_SET_SCHEMA = vol.All(
+    cv.make_entity_service_schema(
+        {
+            vol.Optional(ATTR_TEMPERATURE): vol.All(
+                vol.Coerce(int), vol.Range(min=MIN_TEMP, max=MAX_TEMP)
+            ),
+            vol.Optional(ATTR_OPERATION_MODE): vol.In(OPERATION_LIST),
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_TEMPERATURE, ATTR_OPERATION_MODE),
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services."""
+
+    async def _async_plan_heating(call: ServiceCall) -> None:
+        prices = [
+            (price[ATTR_START], price[ATTR_PRICE]) for price in call.data[ATTR_PRICES]
+        ]
+        planners = [
+            (coordinator.config_entry.title, coordinator.planner)
+            for coordinator in await _async_get_coordinators(hass, call)
+            if coordinator.planner is not None
+        ]
+        # Check every heater before scheduling any
+        for title, planner in planners:
+            try:
+                planner.validate_schedule(call.data[ATTR_READY_BY])
+            except HomeAssistantError as err:
+                raise HomeAssistantError(f"{title}: {err}") from err
+        for _, planner in planners:
+            planner.async_set_schedule(
+                call.data[ATTR_TEMPERATURE], call.data[ATTR_READY_BY], prices
+            )
+
+    async def _async_cancel_heating_plan(call: ServiceCall) -> None:
+        for coordinator in await _async_get_coordinators(hass, call):
+            if coordinator.planner is not None:
+                coordinator.planner.async_cancel()
+
+    async def _async_bulk_set(call: ServiceCall) -> ServiceResponse:
+        values: dict[str, Any] = {}
+        if ATTR_TEMPERATURE in call.data:
+            values[PIN_SETPOINT] = call.data[ATTR_TEMPERATURE]
+        if ATTR_OPERATION_MODE in call.data:
+            values[PIN_OPERATION_MODE] = int(
+                call.data[ATTR_OPERATION_MODE] != OPERATION_OFF
+            )
+        coordinators = await _async_get_coordinators(hass, call)
+        semaphore = asyncio.Semaphore(BULK_MAX_CONCURRENT)
+
+        async def _async_send(
+            coordinator: RaypakDataUpdateCoordinator,
+        ) -> dict[str, Any]:
+            async with semaphore:
+                try:
+                    applied = await coordinator.commands.async_send(values)
+                except RaypakApiError as err:
+                    return {"success": False, "error": str(err)}
+            return {"success": True, "applied": applied}
+
+        results = await asyncio.gather(
+            *(_async_send(coordinator) for coordinator in coordinators)
+        )
+        return {
+            "heaters": {
+                coordinator.config_entry.entry_id: {
+                    "name": coordinator.config_entry.title,
+                    **result,
+                }
+                for coordinator, result in zip(coordinators, results)
+            }
+        }
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PLAN_HEATING, _async_plan_heating, PLAN_HEATING_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CANCEL_HEATING_PLAN,
+        _async_cancel_heating_plan,
+        CANCEL_HEATING_PLAN_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BULK_SET,
+        _async_bulk_set,
+        BULK_SET_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+async def _async_get_coordinators(
+    hass: HomeAssistant, call: ServiceCall
+) -> list[RaypakDataUpdateCoordinator]:
+    """Return the coordinators of the loaded heaters a call targets."""
+    coordinators = []
+    for entry_id in await async_extract_config_entry_ids(hass, call):
+        entry = hass.config_entries.async_get_entry(entry_id)
+        if (
+            entry is not None
+            and entry.domain == DOMAIN
+            and entry.state is ConfigEntryState.LOADED
+        ):
+            coordinators.append(entry.runtime_data)
+    if not coordinators:
+        raise HomeAssistantError("No loaded Raypak heater is targeted")
+    return coordinators
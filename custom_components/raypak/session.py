@@ -0,0 +1,31 @@
+"""Shared HTTP session for Raypak pool heater."""
+
+from __future__ import annotations
+
+import aiohttp
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.util.ssl import get_default_context
+
+from .api import create_session
+from .const import DATA_SESSION, DOMAIN
+
+
+@callback
+def async_get_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Return the integration's shared session, creating it on first use.
+
+    The session outlives config entries, so the config flow, options
+    reloads and every coordinator reuse the same warm connections. It is
+    closed when Home Assistant shuts down.
+    """
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (session := domain_data.get(DATA_SESSION)) is None:
+        session = domain_data[DATA_SESSION] = create_session(get_default_context())
+
+        async def _async_close_session(_event: Event) -> None:
+            await session.close()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_session)
+    return session
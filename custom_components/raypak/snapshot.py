@@ -0,0 +1,103 @@
+"""Decoded pin snapshots for Raypak pool heater."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from .const import NUMERIC_DECODERS
+
+ValueFn = Callable[[Any], Any]
+
+
+class RaypakSnapshot:
+    """One poll's pin values, raw and decoded.
+
+    ``values`` is indexed by the slots handed out by SnapshotSchema, so
+    entities read a pre-decoded value without parsing the raw string.
+    """
+
+    __slots__ = ("raw", "values")
+
+    def __init__(self, raw: dict[str, Any], values: list[Any]) -> None:
+        """Initialize the snapshot."""
+        self.raw = raw
+        self.values = values
+
+    def get(self, pin: str, default: Any = None) -> Any:
+        """Return the raw value of a pin."""
+        return self.raw.get(pin, default)
+
+
+class SnapshotSchema:
+    """Slot layout mapping each distinct (pin, value_fn) pair to an index.
+
+    Slots are added as the modules and entities that read them are loaded,
+    so only pins something actually reads are decoded. ``pin_types`` is
+    kept up to date alongside: pins only read by numeric decoders are
+    parsed as floats, the rest are kept as strings.
+    """
+
+    __slots__ = ("_fields", "_index", "_slots_by_pin", "pin_types")
+
+    def __init__(self, fields: Iterable[tuple[str, ValueFn]] = ()) -> None:
+        """Initialize the schema."""
+        self._fields: list[tuple[str, ValueFn]] = []
+        self._index: dict[tuple[str, ValueFn], int] = {}
+        self._slots_by_pin: dict[str, list[int]] = {}
+        self.pin_types: dict[str, type] = {}
+        for pin, value_fn in fields:
+            self.slot(pin, value_fn)
+
+    def __len__(self) -> int:
+        """Return the number of slots."""
+        return len(self._fields)
+
+    def slot(self, pin: str, value_fn: ValueFn) -> int:
+        """Return the slot for a pin and decoder, adding it if new."""
+        key = (pin, value_fn)
+        if (index := self._index.get(key)) is None:
+            index = self._index[key] = len(self._fields)
+            self._fields.append(key)
+            self._slots_by_pin.setdefault(pin, []).append(index)
+            if value_fn not in NUMERIC_DECODERS:
+                self.pin_types[pin] = str
+            else:
+                self.pin_types.setdefault(pin, float)
+        return index
+
+    def decode(
+        self,
+        raw: dict[str, Any],
+        previous: RaypakSnapshot | None = None,
+        changed: Iterable[str] | None = None,
+    ) -> RaypakSnapshot:
+        """Decode raw pin values into a snapshot.
+
+        With a previous snapshot and the set of changed pins, only the slots
+        of those pins are decoded again; everything else is copied.
+        """
+        fields = self._fields
+        if previous is None or changed is None or len(previous.values) != len(fields):
+            return RaypakSnapshot(
+                raw, [_decode(raw.get(pin), value_fn) for pin, value_fn in fields]
+            )
+
+        values = previous.values.copy()
+        for pin in changed:
+            for index in self._slots_by_pin.get(pin, ()):
+                values[index] = _decode(raw.get(pin), fields[index][1])
+        return RaypakSnapshot(raw, values)
+
+
+def _decode(value: Any, value_fn: ValueFn) -> Any:
+    """Run a decoder, mapping missing or malformed values to None."""
+    if value is None:
+        return None
+    try:
+        return value_fn(value)
+    except (ValueError, TypeError):
+        return None
+
+
+SNAPSHOT_SCHEMA = SnapshotSchema()
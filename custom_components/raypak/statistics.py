@@ -0,0 +1,189 @@
+"""Downsampled long-term statistics for Raypak pool heater."""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from collections.abc import Iterable
+from itertools import chain
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    STATISTICS_BUFFER_SIZE,
+    STATISTICS_PERIOD,
+    STATISTICS_WINDOW,
+)
+from .coordinator import RaypakDataUpdateCoordinator
+from .snapshot import SNAPSHOT_SCHEMA
+from .timeseries import RingBuffer
+
+if TYPE_CHECKING:
+    from homeassistant.components.recorder.models import (
+        StatisticData,
+        StatisticMetaData,
+    )
+
+    from .sensor import RaypakSensorEntityDescription
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PinAggregator:
+    """Fold one pin's samples into windowed and hourly min, max and mean.
+
+    Samples go into a ring buffer. When a STATISTICS_WINDOW window ends, its
+    min, max and mean are computed in one pass over the buffered samples and
+    merged into the running hour. The hour's mean is the mean of its window
+    means, so a burst of samples in one window doesn't outweigh the rest.
+    """
+
+    __slots__ = (
+        "_hour_max",
+        "_hour_mean_total",
+        "_hour_min",
+        "_hour_start",
+        "_hour_windows",
+        "_samples",
+        "_window_count",
+        "_window_start",
+    )
+
+    def __init__(self, capacity: int = STATISTICS_BUFFER_SIZE) -> None:
+        """Initialize the aggregator."""
+        self._samples = RingBuffer(capacity)
+        self._window_start: float | None = None
+        self._window_count = 0
+        self._hour_start: float | None = None
+        self._hour_min = math.inf
+        self._hour_max = -math.inf
+        self._hour_mean_total = 0.0
+        self._hour_windows = 0
+
+    def add(self, timestamp: float, value: float) -> tuple[float, dict] | None:
+        """Add a sample, returning (hour start, stats) when an hour completes."""
+        completed = None
+        window_start = timestamp - timestamp % STATISTICS_WINDOW
+        if window_start != self._window_start:
+            self._close_window()
+            self._window_start = window_start
+            hour_start = timestamp - timestamp % STATISTICS_PERIOD
+            if hour_start != self._hour_start:
+                if self._hour_windows and self._hour_start is not None:
+                    completed = (
+                        self._hour_start,
+                        {
+                            "min": self._hour_min,
+                            "max": self._hour_max,
+                            "mean": self._hour_mean_total / self._hour_windows,
+                        },
+                    )
+                self._hour_start = hour_start
+                self._hour_min = math.inf
+                self._hour_max = -math.inf
+                self._hour_mean_total = 0.0
+                self._hour_windows = 0
+        self._samples.append(timestamp, value)
+        self._window_count = min(self._window_count + 1, self._samples.capacity)
+        return completed
+
+    def _close_window(self) -> None:
+        """Merge the current window's samples into the running hour."""
+        if not self._window_count:
+            return
+        segments = self._samples.tail(self._window_count)
+        self._hour_min = min(self._hour_min, *map(min, segments))
+        self._hour_max = max(self._hour_max, *map(max, segments))
+        self._hour_mean_total += math.fsum(chain(*segments)) / self._window_count
+        self._hour_windows += 1
+        self._window_count = 0
+        self._samples.clear()
+
+
+class RaypakStatisticsCompactor:
+    """Import downsampled sensor history as external statistics.
+
+    Samples every update of the given sensors. Home Assistant only accepts
+    imported statistics at hourly resolution, so 5-minute windows are
+    aggregated here and each completed hour is imported as
+    ``raypak:<entry>_<sensor>``. The hour in progress at shutdown is not
+    imported.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: RaypakDataUpdateCoordinator,
+        entry: ConfigEntry,
+        descriptions: Iterable[RaypakSensorEntityDescription],
+    ) -> None:
+        """Initialize the compactor."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self._pins: list[tuple[int, PinAggregator, StatisticMetaData]] = [
+            (
+                SNAPSHOT_SCHEMA.slot(description.pin, description.value_fn),
+                PinAggregator(),
+                _metadata(entry, description),
+            )
+            for description in descriptions
+        ]
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start sampling coordinator updates; return a stop callback."""
+        return self.coordinator.async_add_listener(self._async_sample)
+
+    @callback
+    def _async_sample(self) -> None:
+        """Add the current value of each tracked sensor."""
+        coordinator = self.coordinator
+        if coordinator.data is None or coordinator.stale:
+            return
+        if not coordinator.last_update_success:
+            return
+        now = time.time()
+        values = coordinator.data.values
+        for slot, aggregator, metadata in self._pins:
+            value = values[slot]
+            if not isinstance(value, (int, float)):
+                continue
+            if completed := aggregator.add(now, value):
+                start, stats = completed
+                self._async_import(metadata, start, stats)
+
+    @callback
+    def _async_import(
+        self, metadata: StatisticMetaData, start: float, stats: dict[str, float]
+    ) -> None:
+        """Hand one hour of statistics to the recorder."""
+        if "recorder" not in self.hass.config.components:
+            return
+        # pylint: disable-next=import-outside-toplevel
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        row: StatisticData = {"start": dt_util.utc_from_timestamp(start), **stats}
+        _LOGGER.debug("Importing %s: %s", metadata["statistic_id"], row)
+        async_add_external_statistics(self.hass, metadata, [row])
+
+
+def _metadata(
+    entry: ConfigEntry, description: RaypakSensorEntityDescription
+) -> StatisticMetaData:
+    """Return the external statistic metadata for a sensor."""
+    metadata: dict[str, Any] = {
+        "has_mean": True,
+        "has_sum": False,
+        "name": f"{entry.title} {description.key.replace('_', ' ').title()}",
+        "source": DOMAIN,
+        "statistic_id": f"{DOMAIN}:{entry.entry_id.lower()}_{description.key}",
+        "unit_of_measurement": description.native_unit_of_measurement,
+    }
+    return metadata  # type: ignore[return-value]
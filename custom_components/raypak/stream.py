@@ -0,0 +1,320 @@
+"""Blynk streaming transport for Raypak pool heaters."""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import random
+import struct
+import zlib
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+from yarl import URL
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .api import server_base_url
+from .const import DOMAIN, PUSH_RECONNECT_MAX_DELAY, PUSH_RECONNECT_MIN_DELAY
+
+if TYPE_CHECKING:
+    from .coordinator import RaypakDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Blynk message framing: command (u8), message id (u16), length (u16), body.
+# Responses carry their status code in the length field and have no body.
+HEADER = struct.Struct(">BHH")
+
+# Blynk app protocol commands. The app session, unlike a hardware login
+# with a device token, receives the pin writes the heaters make.
+CMD_RESPONSE = 0
+CMD_LOGIN = 2
+CMD_PING = 6
+CMD_ACTIVATE_DASHBOARD = 7
+CMD_HARDWARE = 20
+CMD_LOAD_PROFILE_GZIPPED = 24
+
+STATUS_OK = 200
+STATUS_INVALID_TOKEN = 9
+STATUS_USER_NOT_AUTHENTICATED = 5
+
+# App WebSocket endpoint, and how the session introduces itself at login
+STREAM_PATH = "/websockets"
+APP_OS = "other"
+APP_VERSION = "1.0.0"
+APP_NAME = "Blynk"
+
+PING_INTERVAL = 10
+REQUEST_TIMEOUT = 10
+
+
+class RaypakStreamError(Exception):
+    """Stream protocol error."""
+
+
+class RaypakStreamAuthError(RaypakStreamError):
+    """Stream login rejected."""
+
+
+def stream_url(server: str) -> URL:
+    """Return the app WebSocket URL for a server."""
+    url = URL(server_base_url(server))
+    return url.with_scheme("ws" if url.scheme == "http" else "wss").with_path(
+        STREAM_PATH
+    )
+
+
+def password_hash(email: str, password: str) -> str:
+    """Return the password hash the Blynk app logs in with."""
+    salt = hashlib.sha256(email.lower().encode()).digest()
+    return base64.b64encode(hashlib.sha256(password.encode() + salt).digest()).decode()
+
+
+def encode_frame(command: int, msg_id: int, body: bytes = b"") -> bytes:
+    """Encode a Blynk message."""
+    return HEADER.pack(command, msg_id, len(body)) + body
+
+
+def encode_response(msg_id: int, status: int) -> bytes:
+    """Encode a Blynk response message."""
+    return HEADER.pack(CMD_RESPONSE, msg_id, status)
+
+
+def decode_frame(data: bytes) -> tuple[int, int, int, bytes]:
+    """Decode a Blynk message into (command, msg_id, length/status, body)."""
+    if len(data) < HEADER.size:
+        raise RaypakStreamError(f"Short frame: {data!r}")
+    command, msg_id, length = HEADER.unpack_from(data)
+    if command == CMD_RESPONSE:
+        return command, msg_id, length, b""
+    return command, msg_id, length, data[HEADER.size : HEADER.size + length]
+
+
+def parse_virtual_write(body: bytes) -> tuple[str, str, str] | None:
+    """Return (target, pin, value) for a device's 'vw' message, else None.
+
+    The target is ``<dashboard id>-<device id>``.
+    """
+    parts = body.decode("utf-8", errors="replace").split("\0")
+    if len(parts) < 4 or parts[1] != "vw":
+        return None
+    target = parts[0] if "-" in parts[0] else f"{parts[0]}-0"
+    # Multi-value writes are joined the way getAll reports them
+    return target, f"v{parts[2]}", ",".join(parts[3:])
+
+
+def profile_targets(profile: dict[str, Any]) -> dict[str, str]:
+    """Return the device token of each dashboard device in a user profile."""
+    return {
+        f"{dashboard['id']}-{device['id']}": device["token"]
+        for dashboard in profile.get("dashBoards", [])
+        for device in dashboard.get("devices", [])
+        if device.get("token")
+    }
+
+
+class RaypakStream:
+    """One Blynk app session per server, feeding heater pin writes to coordinators.
+
+    Logs in with the RayMoTe account, loads the account's profile to map
+    each dashboard device to its token, and activates those dashboards so
+    the server forwards the heaters' own pin writes. A coordinator is only
+    told it is pushed to once a write from its heater has arrived, so an
+    account that can't see a heater leaves it polling normally.
+
+    Reconnects with jittered exponential backoff. A rejected login ends
+    the stream and calls auth_failed_callback.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        session: aiohttp.ClientSession,
+        server: str,
+        email: str,
+        password: str,
+        auth_failed_callback: CALLBACK_TYPE | None = None,
+    ) -> None:
+        """Initialize the stream."""
+        self.hass = hass
+        self._session = session
+        self._url = stream_url(server)
+        self._email = email
+        self._password = password
+        self._auth_failed_callback = auth_failed_callback
+        # Coordinators fed by this stream, by device token
+        self.coordinators: dict[str, RaypakDataUpdateCoordinator] = {}
+        self._targets: dict[str, str] = {}
+        self._task: asyncio.Task[None] | None = None
+        self._msg_id = 0
+
+    @callback
+    def async_start(self) -> None:
+        """Start streaming in the background."""
+        self._task = self.hass.async_create_background_task(
+            self._async_run(), f"{DOMAIN} stream"
+        )
+
+    async def async_stop(self) -> None:
+        """Stop streaming."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._async_set_disconnected()
+
+    async def async_validate_login(self) -> None:
+        """Log in once without streaming.
+
+        Raises RaypakStreamAuthError if the account is rejected.
+        """
+        async with self._session.ws_connect(self._url) as websocket:
+            await self._async_login(websocket)
+
+    def _next_msg_id(self) -> int:
+        """Return the next message id."""
+        self._msg_id = self._msg_id % 0xFFFF + 1
+        return self._msg_id
+
+    @callback
+    def _async_set_disconnected(self) -> None:
+        """Return every coordinator to regular polling."""
+        self._targets = {}
+        for coordinator in self.coordinators.values():
+            coordinator.async_set_push_connected(False)
+
+    async def _async_run(self) -> None:
+        """Connect and reconnect until cancelled."""
+        failures = 0
+        while True:
+            try:
+                await self._async_connect_and_listen()
+                failures = 0
+            except RaypakStreamAuthError as err:
+                _LOGGER.warning("Stream login rejected, staying on polling: %s", err)
+                if self._auth_failed_callback is not None:
+                    self._auth_failed_callback()
+                return
+            except (
+                aiohttp.ClientError,
+                asyncio.TimeoutError,
+                RaypakStreamError,
+            ) as err:
+                failures += 1
+                _LOGGER.debug("Stream disconnected: %s", err)
+            except Exception:
+                failures += 1
+                _LOGGER.exception("Unexpected stream error")
+            finally:
+                self._async_set_disconnected()
+            delay = min(
+                PUSH_RECONNECT_MAX_DELAY, PUSH_RECONNECT_MIN_DELAY * 2**failures
+            )
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+    async def _async_connect_and_listen(self) -> None:
+        """Run one connection until it closes."""
+        async with self._session.ws_connect(
+            self._url, heartbeat=PING_INTERVAL
+        ) as websocket:
+            await self._async_login(websocket)
+            self._targets = await self._async_load_targets(websocket)
+            for dashboard_id in sorted({t.split("-")[0] for t in self._targets}):
+                await self._async_request(
+                    websocket, CMD_ACTIVATE_DASHBOARD, dashboard_id.encode()
+                )
+            _LOGGER.debug(
+                "Stream connected to %s with %d devices", self._url, len(self._targets)
+            )
+            ping = self.hass.async_create_background_task(
+                self._async_ping(websocket), f"{DOMAIN} stream ping"
+            )
+            try:
+                async for message in websocket:
+                    if message.type is not aiohttp.WSMsgType.BINARY:
+                        continue
+                    await self._async_handle(websocket, message.data)
+            finally:
+                ping.cancel()
+
+    async def _async_request(
+        self, websocket: aiohttp.ClientWebSocketResponse, command: int, body: bytes
+    ) -> tuple[int, int, bytes]:
+        """Send a message and return (command, length/status, body) of its reply."""
+        msg_id = self._next_msg_id()
+        await websocket.send_bytes(encode_frame(command, msg_id, body))
+        async with asyncio.timeout(REQUEST_TIMEOUT):
+            while True:
+                message = await websocket.receive()
+                if message.type is not aiohttp.WSMsgType.BINARY:
+                    raise RaypakStreamError(f"Unexpected reply: {message.type}")
+                reply, reply_id, status, reply_body = decode_frame(message.data)
+                if reply_id != msg_id:
+                    continue
+                if reply == CMD_RESPONSE and status != STATUS_OK:
+                    if status in (STATUS_INVALID_TOKEN, STATUS_USER_NOT_AUTHENTICATED):
+                        raise RaypakStreamAuthError(f"Rejected with status {status}")
+                    raise RaypakStreamError(
+                        f"Command {command} failed with status {status}"
+                    )
+                return reply, status, reply_body
+
+    async def _async_login(self, websocket: aiohttp.ClientWebSocketResponse) -> None:
+        """Log in to the app protocol with the account."""
+        body = "\0".join(
+            (
+                self._email,
+                password_hash(self._email, self._password),
+                APP_OS,
+                APP_VERSION,
+                APP_NAME,
+            )
+        )
+        await self._async_request(websocket, CMD_LOGIN, body.encode())
+
+    async def _async_load_targets(
+        self, websocket: aiohttp.ClientWebSocketResponse
+    ) -> dict[str, str]:
+        """Load the account's profile and map its devices to their tokens."""
+        command, _, body = await self._async_request(
+            websocket, CMD_LOAD_PROFILE_GZIPPED, b""
+        )
+        if command != CMD_LOAD_PROFILE_GZIPPED:
+            raise RaypakStreamError(f"Unexpected profile reply command {command}")
+        try:
+            profile = json.loads(zlib.decompress(body))
+        except (zlib.error, ValueError) as err:
+            raise RaypakStreamError(f"Unreadable profile: {err}") from err
+        return profile_targets(profile)
+
+    async def _async_ping(self, websocket: aiohttp.ClientWebSocketResponse) -> None:
+        """Send Blynk pings so the server keeps the session alive."""
+        while True:
+            await asyncio.sleep(PING_INTERVAL)
+            await websocket.send_bytes(encode_frame(CMD_PING, self._next_msg_id()))
+
+    async def _async_handle(
+        self, websocket: aiohttp.ClientWebSocketResponse, data: bytes
+    ) -> None:
+        """Handle one message from the server."""
+        command, msg_id, _, body = decode_frame(data)
+        if command == CMD_PING:
+            await websocket.send_bytes(encode_response(msg_id, STATUS_OK))
+            return
+        if command != CMD_HARDWARE or not (write := parse_virtual_write(body)):
+            return
+        target, pin, value = write
+        token = self._targets.get(target)
+        if (coordinator := self.coordinators.get(token or "")) is None:
+            return
+        # Only a write from the heater itself shows pushes reach it
+        coordinator.async_set_push_connected(True)
+        coordinator.async_push_pin_value(pin, value)
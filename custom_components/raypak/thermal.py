@@ -0,0 +1,195 @@
+"""Learned pool heat-up model for Raypak pool heater."""
+
+from __future__ import annotations
+
+import math
+from typing import Any
+
+from .const import (
+    THERMAL_FORGETTING_FACTOR,
+    THERMAL_MIN_SAMPLES,
+    THERMAL_SAMPLE_INTERVAL,
+)
+
+# Initial parameter uncertainty, and the cap that stops it growing without
+# bound while the inputs don't vary (forgetting inflates it every update)
+INITIAL_COVARIANCE = 1000.0
+MAX_COVARIANCE_TRACE = 1e6
+
+
+class ThermalModel:
+    """Per-pool heating rate and heat loss, fitted online.
+
+    The pool temperature T is modelled as
+
+        dT/dt = heating_rate * firing + loss * T + offset
+
+    in °F per hour, where firing is the fraction of the time the burner was
+    firing. ``loss`` is negative and ``-offset / loss`` is the temperature
+    the pool settles at with the heater off. Inlet temperature is only
+    read as the pool temperature while water flows.
+
+    Samples are folded into fixed intervals. Each completed interval gives
+    one observation of the average slope, which updates the parameters by
+    recursive least squares with exponential forgetting, so the model
+    follows seasonal change. Every update is O(1) on a 3x3 matrix.
+    """
+
+    __slots__ = (
+        "_covariance",
+        "_firing_area",
+        "_last",
+        "_start",
+        "_temperature_area",
+        "samples",
+        "theta",
+    )
+
+    def __init__(self) -> None:
+        """Initialize the model."""
+        # heating_rate, loss, offset
+        self.theta = [0.0, 0.0, 0.0]
+        self._covariance = [
+            [INITIAL_COVARIANCE if row == col else 0.0 for col in range(3)]
+            for row in range(3)
+        ]
+        self.samples = 0
+        # Interval in progress: (time, temperature) at its start and at the
+        # last sample with that sample's firing, plus running integrals
+        self._start: tuple[float, float] | None = None
+        self._last: tuple[float, float, float] = (0.0, 0.0, 0.0)
+        self._firing_area = 0.0
+        self._temperature_area = 0.0
+
+    @property
+    def heating_rate(self) -> float:
+        """Return the temperature rise per hour of firing, in °F/h."""
+        return self.theta[0]
+
+    @property
+    def loss_coefficient(self) -> float:
+        """Return the fraction of the excess over equilibrium lost per hour."""
+        return -self.theta[1]
+
+    @property
+    def trained(self) -> bool:
+        """Return True once the fit can be used for predictions."""
+        return self.samples >= THERMAL_MIN_SAMPLES and self.heating_rate > 0
+
+    def add(
+        self, timestamp: float, temperature: float, firing: float, flowing: bool
+    ) -> None:
+        """Add a sample of pool temperature and firing fraction (0-1)."""
+        if not flowing:
+            self._start = None
+            return
+        if self._start is not None:
+            last_time, last_temperature, last_firing = self._last
+            elapsed = timestamp - last_time
+            if elapsed > 2 * THERMAL_SAMPLE_INTERVAL:
+                # A gap in polling; don't average across it
+                self._start = None
+            elif elapsed > 0:
+                self._firing_area += last_firing * elapsed
+                self._temperature_area += last_temperature * elapsed
+        if self._start is None:
+            self._begin(timestamp, temperature, firing)
+            return
+        self._last = (timestamp, temperature, firing)
+
+        start_time, start_temperature = self._start
+        duration = timestamp - start_time
+        if duration < THERMAL_SAMPLE_INTERVAL:
+            return
+        slope = (temperature - start_temperature) * 3600 / duration
+        self._update(
+            [self._firing_area / duration, self._temperature_area / duration, 1.0],
+            slope,
+        )
+        self._begin(timestamp, temperature, firing)
+
+    def _begin(self, timestamp: float, temperature: float, firing: float) -> None:
+        """Start a new interval at a sample."""
+        self._start = (timestamp, temperature)
+        self._last = (timestamp, temperature, firing)
+        self._firing_area = 0.0
+        self._temperature_area = 0.0
+
+    def _update(self, x: list[float], y: float) -> None:
+        """Fold one observation into the fit."""
+        covariance = self._covariance
+        px = [sum(covariance[row][i] * x[i] for i in range(3)) for row in range(3)]
+        denominator = THERMAL_FORGETTING_FACTOR + sum(x[i] * px[i] for i in range(3))
+        gain = [value / denominator for value in px]
+        error = y - sum(self.theta[i] * x[i] for i in range(3))
+        self.theta = [self.theta[i] + gain[i] * error for i in range(3)]
+        trace = sum(covariance[i][i] for i in range(3))
+        forgetting = THERMAL_FORGETTING_FACTOR if trace < MAX_COVARIANCE_TRACE else 1.0
+        self._covariance = [
+            [
+                (covariance[row][col] - gain[row] * px[col]) / forgetting
+                for col in range(3)
+            ]
+            for row in range(3)
+        ]
+        self.samples += 1
+
+    def time_to_target(self, current: float, target: float) -> float | None:
+        """Return the seconds to heat from current to target, firing fully.
+
+        None if the model isn't trained yet or predicts the pool can't
+        reach the target.
+        """
+        if current >= target:
+            return 0.0
+        if not self.trained:
+            return None
+        heating_rate, loss, offset = self.theta
+        rate = heating_rate + loss * current + offset
+        if rate <= 0:
+            return None
+        if loss >= -1e-6:
+            return (target - current) / rate * 3600
+        # Exponential approach to the temperature where gain equals loss
+        ceiling = -(heating_rate + offset) / loss
+        if ceiling <= target:
+            return None
+        return math.log((ceiling - current) / (ceiling - target)) / -loss * 3600
+
+    def temperature_after(self, current: float, firing: float, seconds: float) -> float:
+        """Return the predicted temperature after a period at a firing fraction."""
+        heating_rate, loss, offset = self.theta
+        gain = heating_rate * firing + offset
+        hours = seconds / 3600
+        if loss >= -1e-6:
+            return current + (gain + loss * current) * hours
+        equilibrium = -gain / loss
+        return equilibrium + (current - equilibrium) * math.exp(loss * hours)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the fitted state, to persist across restarts."""
+        return {
+            "theta": self.theta,
+            "covariance": self._covariance,
+            "samples": self.samples,
+        }
+
+    def restore(self, stored: dict[str, Any]) -> None:
+        """Restore a fitted state saved with as_dict."""
+        self.theta = list(stored["theta"])
+        self._covariance = [list(row) for row in stored["covariance"]]
+        self.samples = stored["samples"]
+
+    @property
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the fit for diagnostics."""
+        heating_rate, loss, offset = self.theta
+        return {
+            "samples": self.samples,
+            "trained": self.trained,
+            "heating_rate": round(heating_rate, 3),
+            "loss_coefficient": round(-loss, 5),
+            "equilibrium_temperature": (
+                round(-offset / loss, 1) if loss < -1e-6 else None
+            ),
+        }
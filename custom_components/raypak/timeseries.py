@@ -0,0 +1,155 @@
+"""Fixed-size sample buffers for Raypak pool heater."""
+
+from __future__ import annotations
+
+from array import array
+
+
+class RingBuffer:
+    """Fixed-capacity time series of float samples.
+
+    Timestamps and values live in two preallocated ``array('d')`` buffers,
+    so appending is O(1) with no per-sample object, and the newest samples
+    can be handed out as at most two contiguous slices for batch math.
+    """
+
+    __slots__ = ("_capacity", "_head", "_size", "_times", "_values")
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize the buffer."""
+        self._capacity = capacity
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return the number of samples held."""
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        """Return the maximum number of samples held."""
+        return self._capacity
+
+    def append(self, timestamp: float, value: float) -> None:
+        """Add a sample, overwriting the oldest one when full."""
+        if self._size < self._capacity:
+            index = (self._head + self._size) % self._capacity
+            self._size += 1
+        else:
+            index = self._head
+            self._head = (self._head + 1) % self._capacity
+        self._times[index] = timestamp
+        self._values[index] = value
+
+    def __getitem__(self, index: int) -> tuple[float, float]:
+        """Return the (timestamp, value) sample at an index, oldest first."""
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("ring buffer index out of range")
+        index = (self._head + index) % self._capacity
+        return self._times[index], self._values[index]
+
+    def popleft(self) -> tuple[float, float]:
+        """Remove and return the oldest sample."""
+        sample = self[0]
+        self._head = (self._head + 1) % self._capacity
+        self._size -= 1
+        return sample
+
+    def clear(self) -> None:
+        """Drop all samples."""
+        self._head = 0
+        self._size = 0
+
+    def tail(self, count: int) -> list[array]:
+        """Return the values of the newest ``count`` samples, oldest first.
+
+        The result is one or two array slices, depending on whether the
+        samples wrap around the end of the buffer.
+        """
+        count = min(count, self._size)
+        if not count:
+            return []
+        start = (self._head + self._size - count) % self._capacity
+        end = start + count
+        if end <= self._capacity:
+            return [self._values[start:end]]
+        return [self._values[start:], self._values[: end - self._capacity]]
+
+
+class TimeSeries:
+    """Recent history of one pin with O(1) rate and time-weighted mean.
+
+    Samples closer than ``min_interval`` to the last stored one only update
+    ``latest``, and samples that fall out of ``horizon`` are evicted, so the
+    buffer stays small. A running integral of the stored samples is updated
+    on every append and eviction, so neither the rate nor the mean scans the
+    buffer.
+    """
+
+    __slots__ = ("_area", "_buffer", "_horizon", "_min_interval", "latest")
+
+    def __init__(self, horizon: float, min_interval: float = 0.0) -> None:
+        """Initialize the series."""
+        self._horizon = horizon
+        self._min_interval = min_interval
+        self._buffer = RingBuffer(int(horizon / max(min_interval, 1.0)) + 2)
+        self._area = 0.0
+        self.latest: tuple[float, float] | None = None
+
+    def __len__(self) -> int:
+        """Return the number of stored samples."""
+        return len(self._buffer)
+
+    @property
+    def horizon(self) -> float:
+        """Return the seconds of history kept."""
+        return self._horizon
+
+    def append(self, timestamp: float, value: float) -> None:
+        """Add a sample."""
+        self.latest = (timestamp, value)
+        buffer = self._buffer
+        if buffer:
+            last_time, last_value = buffer[-1]
+            if timestamp - last_time < self._min_interval:
+                return
+            self._area += last_value * (timestamp - last_time)
+        if len(buffer) == buffer.capacity:
+            self._evict()
+        buffer.append(timestamp, value)
+        # Keep one sample at or before the horizon so the span covers it
+        cutoff = timestamp - self._horizon
+        while len(buffer) > 1 and buffer[1][0] <= cutoff:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop the oldest sample and its share of the integral."""
+        buffer = self._buffer
+        oldest_time, oldest_value = buffer.popleft()
+        if buffer:
+            self._area -= oldest_value * (buffer[0][0] - oldest_time)
+        else:
+            self._area = 0.0
+
+    def span(self) -> float:
+        """Return the seconds between the oldest and latest sample."""
+        if not self._buffer or self.latest is None:
+            return 0.0
+        return self.latest[0] - self._buffer[0][0]
+
+    def rate(self) -> float | None:
+        """Return the change per second across the series."""
+        if (span := self.span()) <= 0:
+            return None
+        return (self.latest[1] - self._buffer[0][1]) / span
+
+    def mean(self) -> float | None:
+        """Return the time-weighted mean across the series."""
+        if (span := self.span()) <= 0:
+            return None
+        last_time, last_value = self._buffer[-1]
+        return (self._area + last_value * (self.latest[0] - last_time)) / span
@@ -13,16 +13,27 @@ from homeassistant.const import UnitOfTemperature
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import PIN_INLET_TEMP, PIN_OPERATION_MODE, PIN_SETPOINT
+from .const import (
+    ATTR_HEATING_PLAN,
+    ATTR_TIME_TO_SETPOINT,
+    MAX_TEMP,
+    MIN_TEMP,
+    OPERATION_HEAT,
+    OPERATION_LIST,
+    OPERATION_OFF,
+    PIN_INLET_TEMP,
+    PIN_OPERATION_MODE,
+    PIN_SETPOINT,
+    to_float_1,
+    to_heat_mode,
+)
 from .coordinator import RaypakDataUpdateCoordinator
 from .entity import RaypakEntity
+from .snapshot import SNAPSHOT_SCHEMA
 
-OPERATION_OFF = "off"
-OPERATION_HEAT = "heat"
-OPERATION_LIST = [OPERATION_OFF, OPERATION_HEAT]
-
-MIN_TEMP = 60
-MAX_TEMP = 104
+SLOT_CURRENT_TEMPERATURE = SNAPSHOT_SCHEMA.slot(PIN_INLET_TEMP, to_float_1)
+SLOT_TARGET_TEMPERATURE = SNAPSHOT_SCHEMA.slot(PIN_SETPOINT, to_float_1)
+SLOT_HEAT_MODE = SNAPSHOT_SCHEMA.slot(PIN_OPERATION_MODE, to_heat_mode)
 
 
 async def async_setup_entry(
@@ -32,7 +43,9 @@ async def async_setup_entry(
 ) -> None:
     """Set up the water heater platform."""
     coordinator: RaypakDataUpdateCoordinator = entry.runtime_data
-    async_add_entities([RaypakWaterHeater(coordinator, entry.entry_id)])
+    entity = RaypakWaterHeater(coordinator, entry.entry_id)
+    coordinator.async_sync_schema()
+    async_add_entities([entity])
 
 
 class RaypakWaterHeater(RaypakEntity, WaterHeaterEntity):
@@ -47,6 +60,7 @@ class RaypakWaterHeater(RaypakEntity, WaterHeaterEntity):
     _attr_min_temp = MIN_TEMP
     _attr_max_temp = MAX_TEMP
     _attr_translation_key = "pool_heater"
+    _pins = (PIN_INLET_TEMP, PIN_SETPOINT, PIN_OPERATION_MODE)
 
     def __init__(
         self,
@@ -56,52 +70,68 @@ class RaypakWaterHeater(RaypakEntity, WaterHeaterEntity):
         """Initialize the water heater."""
         super().__init__(coordinator, entry_id)
         self._attr_unique_id = f"{entry_id}_water_heater"
+        self._last_minutes: int | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Update the state when the heating plan changes."""
+        await super().async_added_to_hass()
+        if (planner := self.coordinator.planner) is not None:
+            self.async_on_remove(planner.async_add_listener(self.async_write_ha_state))
+
+    def _minutes_to_setpoint(self) -> int | None:
+        """Return the predicted minutes to reach the setpoint."""
+        seconds = self.coordinator.time_to_setpoint
+        return None if seconds is None else round(seconds / 60)
+
+    def _coordinator_data_changed(self) -> bool:
+        """Return True if a read pin or the time to setpoint changed.
+
+        The prediction also depends on pins the entity doesn't read.
+        """
+        changed = super()._coordinator_data_changed()
+        minutes = self._minutes_to_setpoint()
+        if minutes != self._last_minutes:
+            self._last_minutes = minutes
+            return True
+        return changed
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Add the predicted minutes to reach the setpoint and the plan."""
+        planner = self.coordinator.planner
+        return {
+            **(super().extra_state_attributes or {}),
+            ATTR_TIME_TO_SETPOINT: self._minutes_to_setpoint(),
+            ATTR_HEATING_PLAN: planner.plan if planner is not None else None,
+        }
 
     @property
     def current_temperature(self) -> float | None:
         """Return the current inlet temperature."""
-        value = self.coordinator.data.get(PIN_INLET_TEMP)
-        if value is None:
-            return None
-        try:
-            return round(float(value), 1)
-        except (ValueError, TypeError):
-            return None
+        return self.coordinator.data.values[SLOT_CURRENT_TEMPERATURE]
 
     @property
     def target_temperature(self) -> float | None:
         """Return the target temperature (setpoint)."""
-        value = self.coordinator.data.get(PIN_SETPOINT)
-        if value is None:
-            return None
-        try:
-            return round(float(value), 1)
-        except (ValueError, TypeError):
-            return None
+        return self.coordinator.data.values[SLOT_TARGET_TEMPERATURE]
 
     @property
     def current_operation(self) -> str:
         """Return the current operation mode."""
-        value = self.coordinator.data.get(PIN_OPERATION_MODE)
-        if value is None:
-            return OPERATION_OFF
-        try:
-            return OPERATION_HEAT if int(float(value)) != 0 else OPERATION_OFF
-        except (ValueError, TypeError):
-            return OPERATION_OFF
+        if self.coordinator.data.values[SLOT_HEAT_MODE]:
+            return OPERATION_HEAT
+        return OPERATION_OFF
 
     async def async_set_temperature(self, **kwargs: Any) -> None:
         """Set the target temperature."""
         temperature = kwargs.get("temperature")
         if temperature is None:
             return
-        await self.coordinator.client.async_update_pin(
+        await self.coordinator.commands.async_queue_and_wait(
             PIN_SETPOINT, int(temperature)
         )
-        await self.coordinator.async_request_refresh()
 
     async def async_set_operation_mode(self, operation_mode: str) -> None:
         """Set the operation mode."""
         value = 0 if operation_mode == OPERATION_OFF else 1
-        await self.coordinator.client.async_update_pin(PIN_OPERATION_MODE, value)
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.commands.async_queue_and_wait(PIN_OPERATION_MODE, value)
@@ -0,0 +1,393 @@
+"""Load test the integration against a local fake RayMoTe server.
+
+Starts scripts/fake_raymote.py in-process with many simulated heaters,
+then drives real API clients, coordinators and entities against it and
+reports:
+
+- poll throughput and p50/p99 poll cycle latency
+- requests served by the fake server, and injected errors
+- event loop blocking (scheduling lag of a 50 ms heartbeat)
+- entity state writes per second
+- memory allocated per heater during setup
+- getAll body decode time, generic JSON parsing versus decode_pins
+- integration import time and per-heater setup time, against budgets
+
+    python scripts/benchmark.py --heaters 200 --duration 60 --latency 0.05
+
+Use ``--json`` to print the results as JSON for comparing runs, and
+``--check-budget`` to exit non-zero when import or setup time is over budget.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_raymote import FakeRaymote  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers import entity_registry as er  # noqa: E402
+
+from custom_components.raypak import (  # noqa: E402
+    binary_sensor,
+    sensor,
+    water_heater,
+)
+from custom_components.raypak.api import (  # noqa: E402
+    RaypakRateLimiter,
+    decode_pins,
+)
+from custom_components.raypak.coordinator import (  # noqa: E402
+    RaypakDataUpdateCoordinator,
+)
+from custom_components.raypak.entity import RaypakEntity  # noqa: E402
+from custom_components.raypak.hub import async_get_hub  # noqa: E402
+from custom_components.raypak.snapshot import SNAPSHOT_SCHEMA  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+PLATFORMS = (water_heater, sensor, binary_sensor)
+HEARTBEAT = 0.05
+# Heaters set up with tracemalloc on to measure memory; the rest are timed
+MEMORY_PROBE_HEATERS = 10
+
+# Budgets checked by --check-budget (milliseconds)
+IMPORT_BUDGET_MS = 50
+PLATFORM_IMPORT_BUDGET_MS = 50
+SETUP_BUDGET_MS = 2.0  # per heater, excluding its first refresh
+
+# Imports the integration in a fresh interpreter. Home Assistant's own modules
+# are loaded first, as they are by the time a real start reaches it.
+IMPORT_PROBE = """
+import sys, time
+sys.path.insert(0, {root!r})
+import homeassistant.config_entries
+import homeassistant.components.binary_sensor
+import homeassistant.components.sensor
+import homeassistant.components.water_heater
+import homeassistant.helpers.update_coordinator
+start = time.perf_counter()
+import custom_components.raypak
+loaded = time.perf_counter()
+import custom_components.raypak.binary_sensor
+import custom_components.raypak.sensor
+import custom_components.raypak.water_heater
+print(loaded - start, time.perf_counter() - loaded)
+"""
+
+
+class Results:
+    """Counters collected while the benchmark runs."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.cycle_times: list[float] = []
+        self.failed_cycles = 0
+        self.state_writes = 0
+        self.loop_lag: list[float] = []
+
+    def percentile(self, values: list[float], fraction: float) -> float:
+        """Return a percentile of a list of samples."""
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _time_updates(coordinator: RaypakDataUpdateCoordinator, results: Results) -> None:
+    """Record the duration of each of a coordinator's poll cycles."""
+    update = coordinator._async_update_data  # noqa: SLF001
+
+    async def _timed_update() -> Any:
+        start = time.perf_counter()
+        try:
+            return await update()
+        except Exception:
+            results.failed_cycles += 1
+            raise
+        finally:
+            results.cycle_times.append(time.perf_counter() - start)
+
+    coordinator._async_update_data = _timed_update  # type: ignore[method-assign]
+
+
+async def _async_add_entities(
+    hass: HomeAssistant,
+    coordinator: RaypakDataUpdateCoordinator,
+    entry_id: str,
+    results: Results,
+) -> int:
+    """Create the heater's entities, counting their state writes."""
+    entry = SimpleNamespace(entry_id=entry_id, options={}, runtime_data=coordinator)
+    entities: list[RaypakEntity] = []
+    for platform in PLATFORMS:
+        await platform.async_setup_entry(hass, entry, entities.extend)
+
+    def _count_write() -> None:
+        results.state_writes += 1
+
+    # Stand in for the entity platform: listen and track pins as
+    # RaypakEntity.async_added_to_hass would, but only count the writes
+    for entity in entities:
+        entity.async_write_ha_state = _count_write  # type: ignore[method-assign]
+        coordinator.async_add_listener(
+            entity._handle_coordinator_update  # noqa: SLF001
+        )
+        if entity._volatile and entity._pins:  # noqa: SLF001
+            coordinator.async_track_pins(entity._pins)  # noqa: SLF001
+    return len(entities)
+
+
+async def _async_heartbeat(results: Results) -> None:
+    """Measure how late the event loop runs a periodic sleep."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(HEARTBEAT)
+        results.loop_lag.append(max(0.0, loop.time() - start - HEARTBEAT))
+
+
+def measure_decode(extra_pins: int, number: int = 2000) -> dict[str, float]:
+    """Time decoding one getAll body, in microseconds per body."""
+    device = FakeRaymote(["x"], extra_pins=extra_pins).devices["x"]
+    body = json.dumps(device).encode()
+    pin_types = SNAPSHOT_SCHEMA.pin_types
+    generic = timeit.timeit(lambda: json.loads(body.decode()), number=number)
+    fast = timeit.timeit(lambda: decode_pins(body, pin_types), number=number)
+    return {
+        "body_bytes": len(body),
+        "generic_us": round(generic / number * 1e6, 1),
+        "decode_pins_us": round(fast / number * 1e6, 1),
+    }
+
+
+def measure_import(runs: int = 5) -> dict[str, float]:
+    """Time importing the integration and then its platforms, in ms.
+
+    Each run uses a fresh interpreter; the fastest run is reported, so
+    bytecode compilation and a cold disk cache don't count.
+    """
+    samples = [
+        tuple(
+            map(
+                float,
+                subprocess.run(
+                    [sys.executable, "-c", IMPORT_PROBE.format(root=str(ROOT))],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout.split(),
+            )
+        )
+        for _ in range(runs)
+    ]
+    return {
+        "integration_ms": round(min(s[0] for s in samples) * 1000, 1),
+        "platforms_ms": round(min(s[1] for s in samples) * 1000, 1),
+    }
+
+
+def over_budget(results: dict[str, Any]) -> list[str]:
+    """Return a line for each import or setup time over its budget."""
+    imports = results["import"]
+    checks = (
+        ("integration import ms", imports["integration_ms"], IMPORT_BUDGET_MS),
+        ("platform import ms", imports["platforms_ms"], PLATFORM_IMPORT_BUDGET_MS),
+        ("setup ms per heater", results["setup_per_heater_ms"], SETUP_BUDGET_MS),
+    )
+    return [
+        f"{name} {value} is over the budget of {budget}"
+        for name, value, budget in checks
+        if value is not None and value > budget
+    ]
+
+
+async def async_run(args: argparse.Namespace) -> dict[str, Any]:
+    """Run one benchmark and return its results."""
+    tokens = [f"bench-{index}" for index in range(args.heaters)]
+    server = FakeRaymote(
+        tokens,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        extra_pins=args.extra_pins,
+    )
+    runner = web.AppRunner(server.build_app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # noqa: SLF001
+    url = f"http://127.0.0.1:{port}"
+
+    hass = HomeAssistant(tempfile.mkdtemp())
+    await er.async_load(hass)
+    await hass.async_start()
+    results = Results()
+
+    hub = async_get_hub(hass, url)
+    if args.rate_limit:
+        hub.rate_limiter = RaypakRateLimiter(args.rate_limit, int(args.rate_limit) * 2)
+    coordinators: list[RaypakDataUpdateCoordinator] = []
+    entity_count = 0
+
+    async def _async_setup(batch: list[str]) -> None:
+        nonlocal entity_count
+        for token in batch:
+            client = hub.async_create_client(token, token)
+            coordinator = RaypakDataUpdateCoordinator(
+                hass,
+                client,
+                args.poll_interval,
+                hub_mode=args.hub_mode,
+                tiered_polling=args.tiered_polling,
+            )
+            entity_count += await _async_add_entities(
+                hass, coordinator, token, results
+            )
+            coordinators.append(coordinator)
+
+    # The first heaters also load the platform modules, so they are the
+    # memory probe; setup time is measured on the rest, without tracemalloc
+    probe, timed = tokens[:MEMORY_PROBE_HEATERS], tokens[MEMORY_PROBE_HEATERS:]
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    await _async_setup(probe)
+    await asyncio.gather(*(c.async_refresh() for c in coordinators))
+    setup = tracemalloc.take_snapshot().compare_to(baseline, "filename")
+    tracemalloc.stop()
+    memory_per_heater = sum(stat.size_diff for stat in setup) / len(probe)
+
+    start = time.perf_counter()
+    await _async_setup(timed)
+    setup_time = (time.perf_counter() - start) / len(timed) if timed else None
+    await asyncio.gather(
+        *(c.async_refresh() for c in coordinators[len(probe) :])
+    )
+
+    for token, coordinator in zip(tokens, coordinators):
+        _time_updates(coordinator, results)
+        if args.hub_mode:
+            hub.async_add_coordinator(token, coordinator)
+    server.requests.clear()
+    results.state_writes = 0
+
+    heartbeat = asyncio.create_task(_async_heartbeat(results))
+    simulation = asyncio.create_task(server.simulate(args.change_interval))
+    start = time.perf_counter()
+    await asyncio.sleep(args.duration)
+    elapsed = time.perf_counter() - start
+    heartbeat.cancel()
+    simulation.cancel()
+
+    for coordinator in coordinators:
+        await coordinator.async_shutdown()
+    await hass.async_stop()
+    await runner.cleanup()
+
+    cycles = results.cycle_times
+    decode_times = [
+        histogram.percentile(0.5) or 0.0
+        for coordinator in coordinators
+        if (histogram := coordinator.client.metrics.durations.get("decode"))
+    ]
+    return {
+        "heaters": args.heaters,
+        "entities": entity_count,
+        "duration": round(elapsed, 1),
+        "polls_per_second": round(len(cycles) / elapsed, 2),
+        "failed_polls": results.failed_cycles,
+        "poll_p50_ms": round(results.percentile(cycles, 0.5) * 1000, 1),
+        "poll_p99_ms": round(results.percentile(cycles, 0.99) * 1000, 1),
+        "requests_per_second": round(sum(server.requests.values()) / elapsed, 2),
+        "requests": dict(server.requests),
+        "injected_errors": server.errors,
+        "rate_limiter": hub.rate_limiter.metrics,
+        "loop_lag_max_ms": round(max(results.loop_lag, default=0) * 1000, 1),
+        "loop_lag_mean_ms": round(
+            statistics.fmean(results.loop_lag or [0]) * 1000, 2
+        ),
+        "state_writes_per_second": round(results.state_writes / elapsed, 2),
+        "memory_per_heater_kib": round(memory_per_heater / 1024, 1),
+        "setup_per_heater_ms": (
+            None if setup_time is None else round(setup_time * 1000, 2)
+        ),
+        "import": measure_import(),
+        "poll_decode_p50_us": round(statistics.median(decode_times or [0]) * 1e6, 1),
+        "getall_decode": measure_decode(args.extra_pins),
+    }
+
+
+def main() -> None:
+    """Parse arguments, run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--heaters", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--poll-interval", type=int, default=10, help="seconds")
+    parser.add_argument("--hub-mode", action="store_true")
+    parser.add_argument("--tiered-polling", action="store_true")
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=0,
+        help="requests/second budget for the server (default: the integration's)",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds added to each response"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="random +/- seconds of latency"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="fraction of requests failing"
+    )
+    parser.add_argument(
+        "--extra-pins", type=int, default=0, help="unused pins added to each heater"
+    )
+    parser.add_argument(
+        "--change-interval",
+        type=float,
+        default=5,
+        help="seconds between simulated pin changes",
+    )
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument(
+        "--check-budget",
+        action="store_true",
+        help="exit non-zero if import or setup time is over budget",
+    )
+    parser.add_argument("--verbose", action="store_true", help="show integration logs")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    if not args.verbose:
+        # Injected errors and polls cut off at shutdown are expected here
+        logging.getLogger("custom_components.raypak").setLevel(logging.CRITICAL)
+        logging.getLogger("homeassistant").setLevel(logging.ERROR)
+
+    results = asyncio.run(async_run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        width = max(map(len, results))
+        for key, value in results.items():
+            print(f"{key:<{width}}  {value}")
+    if args.check_budget and (failures := over_budget(results)):
+        sys.exit("\n".join(failures))
+
+
+if __name__ == "__main__":
+    main()
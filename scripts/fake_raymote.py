@@ -0,0 +1,309 @@
+"""Local stand-in for a RayMoTe (Blynk) server.
+
+Serves the HTTP endpoints the integration polls and the Blynk app
+WebSocket used for push updates, with simulated heaters whose pins drift
+over time. Point the integration at it by entering the server as
+``http://127.0.0.1:8080``, and for push updates the account
+``--email``/``--password``.
+
+    python scripts/fake_raymote.py --port 8080 --tokens token1 token2
+
+Only the heaters' own (simulated) pin writes are streamed, as on a real
+server; writes made through the HTTP API are not echoed back.
+
+Latency, server errors and extra pins can be added to test the integration
+under less friendly conditions; see ``--help``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import zlib
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from aiohttp import WSMsgType, web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.raypak.stream import (  # noqa: E402
+    CMD_ACTIVATE_DASHBOARD,
+    CMD_HARDWARE,
+    CMD_LOAD_PROFILE_GZIPPED,
+    CMD_LOGIN,
+    CMD_PING,
+    STATUS_OK,
+    STATUS_USER_NOT_AUTHENTICATED,
+    STREAM_PATH,
+    decode_frame,
+    encode_frame,
+    encode_response,
+    password_hash,
+)
+
+# Every heater sits on this dashboard of the account, device id by position
+DASHBOARD_ID = 1
+
+_LOGGER = logging.getLogger("fake_raymote")
+
+
+def initial_pins() -> dict[str, str]:
+    """Return a plausible idle heater."""
+    return {
+        "v52": "78.4",
+        "v5": "79.1",
+        "v6": "81.0",
+        "v53": "1",
+        "v55": '"No Demand"',
+        "v111": "84",
+        "v10": "0.0",
+        "v11": "0",
+        "v13": '""',
+        "v105": "0",
+        "v45": "1520",
+        "v25": "812.5",
+        "v27": "96",
+        "v29": "12.4",
+        "v7": "45.0",
+        "v14": "60",
+        "v160": "0",
+        "v162": "1",
+    }
+
+
+def padding_pins(count: int) -> dict[str, str]:
+    """Return pins the integration doesn't read, to grow the getAll payload."""
+    return {
+        f"v{200 + index}": f"{random.uniform(0, 1000):.2f}" for index in range(count)
+    }
+
+
+class FakeRaymote:
+    """Simulated heaters behind one server.
+
+    ``latency`` and ``jitter`` delay every HTTP response (seconds),
+    ``error_rate`` is the fraction of HTTP requests answered with a 500, and
+    ``extra_pins`` adds unused pins to each heater. All heaters belong to
+    one app account, ``email`` and ``password``.
+    """
+
+    def __init__(
+        self,
+        tokens: list[str],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        extra_pins: int = 0,
+        email: str = "test@example.com",
+        password: str = "test",
+    ) -> None:
+        """Initialize the fake server."""
+        self.devices = {
+            token: {**initial_pins(), **padding_pins(extra_pins)} for token in tokens
+        }
+        self.connected = dict.fromkeys(tokens, True)
+        self.device_ids = {token: index for index, token in enumerate(tokens)}
+        self.email = email
+        self.password = password
+        # App sessions with the dashboard activated
+        self._sockets: set[web.WebSocketResponse] = set()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        # Requests served per endpoint, and how many got an injected error
+        self.requests: Counter[str] = Counter()
+        self.errors = 0
+
+    @web.middleware
+    async def _conditions(
+        self,
+        request: web.Request,
+        handler: Callable[[web.Request], Awaitable[web.StreamResponse]],
+    ) -> web.StreamResponse:
+        """Apply the configured latency and error rate to HTTP requests."""
+        if request.path == STREAM_PATH:
+            return await handler(request)
+        self.requests[request.path.rsplit("/", 1)[-1]] += 1
+        if delay := self.latency + random.uniform(-self.jitter, self.jitter):
+            await asyncio.sleep(max(0.0, delay))
+        if self.error_rate and random.random() < self.error_rate:
+            self.errors += 1
+            raise web.HTTPInternalServerError(text="Simulated failure")
+        return await handler(request)
+
+    def build_app(self) -> web.Application:
+        """Return the aiohttp application."""
+        app = web.Application(middlewares=[self._conditions])
+        app.router.add_get("/external/api/getAll", self.handle_get_all)
+        app.router.add_get("/external/api/get", self.handle_get)
+        app.router.add_get("/external/api/update", self.handle_update)
+        app.router.add_get("/external/api/batch/update", self.handle_update)
+        app.router.add_get(
+            "/external/api/isHardwareConnected", self.handle_is_connected
+        )
+        app.router.add_get(STREAM_PATH, self.handle_websocket)
+        return app
+
+    def _device(self, request: web.Request) -> dict[str, str]:
+        """Return the pins of the device named by the request token."""
+        token = request.query.get("token", "")
+        if token not in self.devices:
+            raise web.HTTPUnauthorized(text="Invalid token.")
+        return self.devices[token]
+
+    @staticmethod
+    def _pins(request: web.Request) -> list[str]:
+        """Return the pin names in a request's query."""
+        return [key for key in request.query if key != "token"]
+
+    async def handle_get_all(self, request: web.Request) -> web.Response:
+        """Return every pin."""
+        return web.json_response(self._device(request))
+
+    async def handle_get(self, request: web.Request) -> web.Response:
+        """Return selected pins."""
+        device = self._device(request)
+        pins = self._pins(request)
+        if len(pins) == 1:
+            return web.Response(text=str(device.get(pins[0], "")))
+        return web.json_response({pin: device[pin] for pin in pins if pin in device})
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        """Write one or more pins, without streaming them to app sessions."""
+        device = self._device(request)
+        for pin in self._pins(request):
+            device[pin] = request.query[pin]
+        return web.Response()
+
+    async def handle_is_connected(self, request: web.Request) -> web.Response:
+        """Return whether the heater is online."""
+        self._device(request)
+        return web.json_response(self.connected[request.query["token"]])
+
+    async def handle_websocket(self, request: web.Request) -> web.WebSocketResponse:
+        """Serve the Blynk app protocol push stream."""
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        logged_in = False
+        async for message in websocket:
+            if message.type is not WSMsgType.BINARY:
+                continue
+            command, msg_id, _, body = decode_frame(message.data)
+            if command == CMD_LOGIN and not logged_in:
+                email, hashed, *_ = body.decode().split("\0")
+                if email != self.email or hashed != password_hash(
+                    self.email, self.password
+                ):
+                    await websocket.send_bytes(
+                        encode_response(msg_id, STATUS_USER_NOT_AUTHENTICATED)
+                    )
+                    break
+                logged_in = True
+                await websocket.send_bytes(encode_response(msg_id, STATUS_OK))
+            elif not logged_in:
+                break
+            elif command == CMD_LOAD_PROFILE_GZIPPED:
+                await websocket.send_bytes(
+                    encode_frame(CMD_LOAD_PROFILE_GZIPPED, msg_id, self._profile())
+                )
+            elif command == CMD_ACTIVATE_DASHBOARD:
+                self._sockets.add(websocket)
+                await websocket.send_bytes(encode_response(msg_id, STATUS_OK))
+            elif command == CMD_PING:
+                await websocket.send_bytes(encode_response(msg_id, STATUS_OK))
+        self._sockets.discard(websocket)
+        return websocket
+
+    def _profile(self) -> bytes:
+        """Return the account profile, compressed as the app expects."""
+        devices = [
+            {"id": device_id, "token": token}
+            for token, device_id in self.device_ids.items()
+        ]
+        profile = {"dashBoards": [{"id": DASHBOARD_ID, "devices": devices}]}
+        return zlib.compress(json.dumps(profile).encode())
+
+    async def device_write(self, token: str, pin: str, value: str) -> None:
+        """Change a pin from the heater and stream it to app sessions."""
+        self.devices[token][pin] = value
+        body = b"\0".join(
+            (
+                f"{DASHBOARD_ID}-{self.device_ids[token]}".encode(),
+                b"vw",
+                pin.removeprefix("v").encode(),
+                value.encode(),
+            )
+        )
+        for websocket in list(self._sockets):
+            await websocket.send_bytes(encode_frame(CMD_HARDWARE, 0, body))
+
+    async def simulate(self, interval: float) -> None:
+        """Drift the temperatures and fire the burner now and then."""
+        while True:
+            await asyncio.sleep(interval)
+            for token, pins in self.devices.items():
+                firing = random.random() < 0.3
+                inlet = float(pins["v52"]) + (0.2 if firing else -0.05)
+                await self.device_write(token, "v52", f"{inlet:.1f}")
+                await self.device_write(
+                    token, "v5", f"{inlet + (8 if firing else 0.5):.1f}"
+                )
+                await self.device_write(token, "v160", "85" if firing else "0")
+
+
+async def _async_main(args: argparse.Namespace) -> None:
+    """Run the fake server until interrupted."""
+    server = FakeRaymote(
+        args.tokens,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        extra_pins=args.extra_pins,
+        email=args.email,
+        password=args.password,
+    )
+    runner = web.AppRunner(server.build_app())
+    await runner.setup()
+    await web.TCPSite(runner, args.host, args.port).start()
+    _LOGGER.info("Fake RayMoTe on http://%s:%s", args.host, args.port)
+    try:
+        await server.simulate(args.interval)
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    """Parse arguments and run the server."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--tokens", nargs="+", default=["test-token"])
+    parser.add_argument("--email", default="test@example.com", help="app account")
+    parser.add_argument("--password", default="test", help="app account password")
+    parser.add_argument(
+        "--interval", type=float, default=5, help="seconds between simulated changes"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds added to each response"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="random +/- seconds of latency"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="fraction of requests failing"
+    )
+    parser.add_argument(
+        "--extra-pins", type=int, default=0, help="unused pins added to each heater"
+    )
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_async_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Tests for the Raypak Pool Heater integration."""
@@ -0,0 +1,176 @@
+"""Tests for the per-server circuit breaker."""
+
+from __future__ import annotations
+
+import asyncio
+
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+import pytest
+
+from custom_components.raypak import api
+from custom_components.raypak.api import (
+    BREAKER_BASE_DELAY,
+    BREAKER_FAILURE_THRESHOLD,
+    MAX_REQUEST_TIMEOUT,
+    MIN_REQUEST_TIMEOUT,
+    BreakerState,
+    RaypakApiClient,
+    RaypakCircuitBreaker,
+    RaypakCircuitOpenError,
+    RaypakRateLimitedError,
+    RaypakRateLimiter,
+)
+
+
+class FakeClock:
+    """Monotonic clock the test moves by hand."""
+
+    def __init__(self) -> None:
+        """Start the clock."""
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    """Replace the breaker's clock."""
+    fake = FakeClock()
+    monkeypatch.setattr(api.time, "monotonic", fake)
+    return fake
+
+
+def _open(breaker: RaypakCircuitBreaker) -> None:
+    """Fail enough requests to open the breaker."""
+    for _ in range(BREAKER_FAILURE_THRESHOLD):
+        assert breaker.before_request() is False
+        breaker.record_failure()
+
+
+def test_closed_until_threshold(clock: FakeClock) -> None:
+    """Failures below the threshold leave the breaker closed."""
+    breaker = RaypakCircuitBreaker()
+    for _ in range(BREAKER_FAILURE_THRESHOLD - 1):
+        breaker.record_failure()
+
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.before_request() is False
+
+
+def test_success_resets_failure_count(clock: FakeClock) -> None:
+    """Only consecutive failures count towards opening."""
+    breaker = RaypakCircuitBreaker()
+    for _ in range(BREAKER_FAILURE_THRESHOLD - 1):
+        breaker.record_failure()
+    breaker.record_success(0.1)
+    breaker.record_failure()
+
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.consecutive_failures == 1
+
+
+def test_opens_and_rejects(clock: FakeClock) -> None:
+    """An open breaker rejects requests until its delay has passed."""
+    breaker = RaypakCircuitBreaker()
+    _open(breaker)
+
+    assert breaker.state is BreakerState.OPEN
+    assert BREAKER_BASE_DELAY / 2 <= breaker.retry_in <= BREAKER_BASE_DELAY
+    with pytest.raises(RaypakCircuitOpenError):
+        breaker.before_request()
+
+
+def test_half_open_allows_one_probe(clock: FakeClock) -> None:
+    """After the delay a single probe goes through, and its success closes."""
+    breaker = RaypakCircuitBreaker()
+    _open(breaker)
+    clock.now += BREAKER_BASE_DELAY
+
+    assert breaker.before_request() is True
+    assert breaker.state is BreakerState.HALF_OPEN
+    with pytest.raises(RaypakCircuitOpenError):
+        breaker.before_request()
+
+    breaker.record_success(0.1)
+    breaker.release_probe()
+
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.consecutive_failures == 0
+    assert breaker.before_request() is False
+
+
+def test_released_probe_allows_another(clock: FakeClock) -> None:
+    """A probe that ended without an answer lets the next request probe."""
+    breaker = RaypakCircuitBreaker()
+    _open(breaker)
+    clock.now += BREAKER_BASE_DELAY
+
+    assert breaker.before_request() is True
+    breaker.release_probe()
+
+    assert breaker.before_request() is True
+
+
+def test_failed_probe_backs_off(clock: FakeClock) -> None:
+    """A failed probe reopens the breaker for twice as long."""
+    breaker = RaypakCircuitBreaker()
+    _open(breaker)
+    clock.now += BREAKER_BASE_DELAY
+    breaker.before_request()
+    breaker.record_failure()
+    breaker.release_probe()
+
+    assert breaker.state is BreakerState.OPEN
+    assert BREAKER_BASE_DELAY <= breaker.retry_in <= 2 * BREAKER_BASE_DELAY
+
+
+def test_timeout_follows_p99(clock: FakeClock) -> None:
+    """The timeout tracks three times the p99 latency, within bounds."""
+    breaker = RaypakCircuitBreaker()
+    assert breaker.timeout == MAX_REQUEST_TIMEOUT
+
+    for _ in range(api.MIN_LATENCY_SAMPLES):
+        breaker.record_success(0.9)
+    assert breaker.timeout == pytest.approx(2.7)
+
+    for _ in range(api.LATENCY_SAMPLES):
+        breaker.record_success(0.1)
+    assert breaker.timeout == MIN_REQUEST_TIMEOUT
+
+    for _ in range(api.LATENCY_SAMPLES):
+        breaker.record_success(30)
+    assert breaker.timeout == MAX_REQUEST_TIMEOUT
+
+
+def test_throttled_probe_leaves_breaker() -> None:
+    """A 429 is neither a success nor a failure, and frees the probe."""
+
+    async def throttled(request: web.Request) -> web.Response:
+        return web.Response(status=429, headers={"Retry-After": "1"})
+
+    async def run() -> RaypakCircuitBreaker:
+        app = web.Application()
+        app.router.add_get("/external/api/getAll", throttled)
+        breaker = RaypakCircuitBreaker()
+        _open(breaker)
+        breaker._retry_at = 0
+        async with TestServer(app) as server, ClientSession() as session:
+            client = RaypakApiClient(
+                session,
+                str(server.make_url("")),
+                "token",
+                rate_limiter=RaypakRateLimiter(),
+                circuit_breaker=breaker,
+            )
+            with pytest.raises(RaypakRateLimitedError):
+                await client.async_get_all()
+        return breaker
+
+    breaker = asyncio.run(run())
+
+    assert breaker.state is BreakerState.HALF_OPEN
+    assert breaker.consecutive_failures == BREAKER_FAILURE_THRESHOLD
+    assert breaker.before_request() is True
@@ -0,0 +1,140 @@
+"""Tests for the heating planner's slot selection."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.raypak.const import PLAN_SLOT_INTERVAL
+from custom_components.raypak.planner import RaypakHeatingPlanner
+from custom_components.raypak.thermal import ThermalModel
+
+# A quarter-hour boundary
+BASE = 1_700_000_100 // PLAN_SLOT_INTERVAL * PLAN_SLOT_INTERVAL
+HOUR = 3600
+
+
+def _at(timestamp: float) -> datetime:
+    """Return a timestamp as a UTC datetime."""
+    return dt_util.utc_from_timestamp(timestamp)
+
+
+@pytest.fixture
+def planner() -> RaypakHeatingPlanner:
+    """Return a planner for a pool heating 3°F/h and settling at 60°F."""
+    thermal = ThermalModel()
+    thermal.restore(
+        {
+            "theta": [3.0, -0.05, 3.0],
+            "covariance": [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]],
+            "samples": 100,
+        }
+    )
+    planner = RaypakHeatingPlanner(None, SimpleNamespace(thermal=thermal), "entry")
+    planner.target = 75
+    planner.ready_by = _at(BASE + 6 * HOUR)
+    return planner
+
+
+def _plan(planner: RaypakHeatingPlanner, current: float | None) -> None:
+    """Plan from BASE until the planner's deadline."""
+    slots = planner._slots(BASE, planner.ready_by.timestamp())
+    planner._plan(slots, current)
+
+
+def test_slots_align_to_interval(planner: RaypakHeatingPlanner) -> None:
+    """Slots break on the interval, with partial slots at either end."""
+    assert planner._slots(BASE + 100, BASE + 2 * PLAN_SLOT_INTERVAL + 50) == [
+        (BASE + 100, BASE + PLAN_SLOT_INTERVAL),
+        (BASE + PLAN_SLOT_INTERVAL, BASE + 2 * PLAN_SLOT_INTERVAL),
+        (BASE + 2 * PLAN_SLOT_INTERVAL, BASE + 2 * PLAN_SLOT_INTERVAL + 50),
+    ]
+
+
+def test_price_at(planner: RaypakHeatingPlanner) -> None:
+    """Each price holds from its start until the next, unknown before."""
+    planner.prices = [(BASE, 0.2), (BASE + HOUR, 0.1)]
+
+    assert planner._price_at(BASE - 1) == float("inf")
+    assert planner._price_at(BASE) == 0.2
+    assert planner._price_at(BASE + HOUR - 1) == 0.2
+    assert planner._price_at(BASE + HOUR) == 0.1
+    assert planner._price_at(BASE + 10 * HOUR) == 0.1
+
+
+def test_fires_in_cheapest_slots(planner: RaypakHeatingPlanner) -> None:
+    """The cheap period is used first, then the latest of the rest."""
+    planner.prices = [
+        (BASE, 0.3),
+        (BASE + HOUR, 0.1),
+        (BASE + 2 * HOUR, 0.3),
+    ]
+    _plan(planner, 70)
+
+    assert planner.reachable
+    assert planner.windows[0] == (_at(BASE + HOUR), _at(BASE + 2 * HOUR))
+    assert len(planner.windows) == 2
+    start, end = planner.windows[1]
+    assert end == planner.ready_by
+    assert start > _at(BASE + 2 * HOUR)
+
+
+def test_fires_in_fewest_slots(planner: RaypakHeatingPlanner) -> None:
+    """One slot less than planned would miss the target."""
+    _plan(planner, 70)
+    ((start, end),) = planner.windows
+    thermal = planner.coordinator.thermal
+    seconds = (end - start).total_seconds()
+
+    idle = thermal.temperature_after(70, 0.0, start.timestamp() - BASE)
+    assert thermal.temperature_after(idle, 1.0, seconds) >= planner.target
+    idle = thermal.temperature_after(idle, 0.0, PLAN_SLOT_INTERVAL)
+    shorter = thermal.temperature_after(idle, 1.0, seconds - PLAN_SLOT_INTERVAL)
+    assert shorter < planner.target
+
+
+@pytest.mark.parametrize(
+    "prices",
+    [[], [(BASE, 0.2)]],
+    ids=["no_prices", "flat_prices"],
+)
+def test_heats_as_late_as_possible(
+    planner: RaypakHeatingPlanner, prices: list[tuple[float, float]]
+) -> None:
+    """Without a cheaper time, heating ends right at the deadline."""
+    planner.prices = prices
+    _plan(planner, 70)
+
+    assert planner.reachable
+    ((start, end),) = planner.windows
+    assert end == planner.ready_by
+    assert start > _at(BASE)
+
+
+def test_already_at_target(planner: RaypakHeatingPlanner) -> None:
+    """A pool that stays warm enough needs no heating."""
+    planner.target = 60
+    _plan(planner, 70)
+
+    assert planner.reachable
+    assert planner.windows == []
+
+
+@pytest.mark.parametrize(
+    ("target", "current"),
+    [(130, 70), (75, None)],
+    ids=["above_ceiling", "unknown_temperature"],
+)
+def test_unreachable_heats_throughout(
+    planner: RaypakHeatingPlanner, target: float, current: float | None
+) -> None:
+    """If the target can't be shown reachable, every slot fires."""
+    planner.target = target
+    _plan(planner, current)
+
+    assert not planner.reachable
+    assert planner.windows == [(_at(BASE), planner.ready_by)]
@@ -0,0 +1,120 @@
+"""Tests for the shared request rate limiter."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.raypak import api
+from custom_components.raypak.api import (
+    RaypakRateLimitedError,
+    RaypakRateLimiter,
+    RequestPriority,
+)
+
+
+@pytest.fixture(autouse=True)
+def short_counters_wait(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Let counter requests wait for one token at most."""
+    monkeypatch.setitem(api.MAX_QUEUE_WAIT, RequestPriority.COUNTERS, 0.1)
+
+
+def test_burst_is_granted_immediately() -> None:
+    """Requests within the burst don't queue."""
+
+    async def run() -> RaypakRateLimiter:
+        limiter = RaypakRateLimiter(rate=10, burst=3)
+        for _ in range(3):
+            await limiter.acquire(RequestPriority.COUNTERS)
+        return limiter
+
+    limiter = asyncio.run(run())
+
+    assert limiter.granted == 3
+    assert limiter.queued == 0
+
+
+def test_counters_shed_behind_polls() -> None:
+    """A counter request is shed when polls already fill its wait budget."""
+
+    async def run() -> RaypakRateLimiter:
+        limiter = RaypakRateLimiter(rate=10, burst=1)
+        await limiter.acquire(RequestPriority.POLL)
+        polls = [
+            asyncio.create_task(limiter.acquire(RequestPriority.POLL))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        with pytest.raises(RaypakRateLimitedError):
+            await limiter.acquire(RequestPriority.COUNTERS)
+        await asyncio.gather(*polls)
+        return limiter
+
+    limiter = asyncio.run(run())
+
+    assert limiter.shed == 1
+    assert limiter.granted == 3
+    assert limiter.queued == 2
+
+
+def test_command_jumps_the_queue() -> None:
+    """A queued command is granted before polls that queued earlier."""
+
+    async def run() -> list[str]:
+        limiter = RaypakRateLimiter(rate=10, burst=1)
+        await limiter.acquire(RequestPriority.POLL)
+        order: list[str] = []
+
+        async def request(name: str, priority: RequestPriority) -> None:
+            await limiter.acquire(priority)
+            order.append(name)
+
+        tasks = [
+            asyncio.create_task(request("poll 1", RequestPriority.POLL)),
+            asyncio.create_task(request("poll 2", RequestPriority.POLL)),
+        ]
+        await asyncio.sleep(0)
+        tasks.append(
+            asyncio.create_task(request("command", RequestPriority.COMMAND))
+        )
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(run()) == ["command", "poll 1", "poll 2"]
+
+
+def test_penalize_sheds_until_retry_after() -> None:
+    """After a 429 the bucket runs dry for the retry-after period."""
+
+    async def run() -> RaypakRateLimiter:
+        limiter = RaypakRateLimiter(rate=10, burst=10)
+        limiter.penalize(5)
+        with pytest.raises(RaypakRateLimitedError):
+            await limiter.acquire(RequestPriority.COUNTERS)
+        return limiter
+
+    limiter = asyncio.run(run())
+
+    assert limiter.throttled == 1
+    assert limiter.shed == 1
+    assert limiter.metrics["tokens"] < -49
+
+
+def test_cancelled_waiter_releases_its_place() -> None:
+    """A waiter cancelled while queued doesn't consume a token."""
+
+    async def run() -> RaypakRateLimiter:
+        limiter = RaypakRateLimiter(rate=10, burst=1)
+        await limiter.acquire(RequestPriority.POLL)
+        cancelled = asyncio.create_task(limiter.acquire(RequestPriority.POLL))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await limiter.acquire(RequestPriority.POLL)
+        return limiter
+
+    limiter = asyncio.run(run())
+
+    assert limiter.granted == 2
+    assert limiter.queued == 2
+    assert limiter.metrics["waiting"] == 0
@@ -0,0 +1,117 @@
+"""Tests for the Blynk stream framing."""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+
+import pytest
+
+from custom_components.raypak.stream import (
+    CMD_HARDWARE,
+    CMD_PING,
+    CMD_RESPONSE,
+    HEADER,
+    STATUS_OK,
+    RaypakStreamError,
+    decode_frame,
+    encode_frame,
+    encode_response,
+    parse_virtual_write,
+    password_hash,
+    profile_targets,
+    stream_url,
+)
+
+
+def test_frame_round_trip() -> None:
+    """A message decodes to the command, id, length and body it was sent with."""
+    body = b"1-0\0vw\x0052\x0081.5"
+    frame = encode_frame(CMD_HARDWARE, 42, body)
+
+    assert len(frame) == HEADER.size + len(body)
+    assert decode_frame(frame) == (CMD_HARDWARE, 42, len(body), body)
+
+
+def test_frame_ignores_trailing_bytes() -> None:
+    """Only the body length given in the header is returned."""
+    frame = encode_frame(CMD_PING, 7) + b"junk"
+
+    assert decode_frame(frame) == (CMD_PING, 7, 0, b"")
+
+
+def test_response_carries_status_not_body() -> None:
+    """A response puts its status in the length field and has no body."""
+    assert decode_frame(encode_response(9, STATUS_OK)) == (
+        CMD_RESPONSE,
+        9,
+        STATUS_OK,
+        b"",
+    )
+
+
+def test_short_frame() -> None:
+    """A frame shorter than the header is a protocol error."""
+    with pytest.raises(RaypakStreamError):
+        decode_frame(b"\x14\x00")
+
+
+def test_parse_virtual_write() -> None:
+    """A device's virtual write gives its target, pin and value."""
+    assert parse_virtual_write(b"1-0\0vw\x0052\x0081.5") == ("1-0", "v52", "81.5")
+
+
+def test_parse_virtual_write_without_device_id() -> None:
+    """A bare dashboard id targets the dashboard's first device."""
+    assert parse_virtual_write(b"3\0vw\x007\x0012") == ("3-0", "v7", "12")
+
+
+def test_parse_virtual_write_multi_value() -> None:
+    """Multiple values are joined the way getAll reports them."""
+    assert parse_virtual_write(b"1-2\0vw\x0020\x00a\x00b") == ("1-2", "v20", "a,b")
+
+
+@pytest.mark.parametrize(
+    "body",
+    [b"1-0\0dw\x005\x001", b"1-0\0vw\x0052", b""],
+    ids=["digital", "no_value", "empty"],
+)
+def test_parse_virtual_write_ignores_others(body: bytes) -> None:
+    """Anything but a complete virtual write is ignored."""
+    assert parse_virtual_write(body) is None
+
+
+def test_profile_targets() -> None:
+    """Each dashboard device with a token maps to that token."""
+    profile = {
+        "dashBoards": [
+            {
+                "id": 1,
+                "devices": [{"id": 0, "token": "tok-a"}, {"id": 1, "token": ""}],
+            },
+            {"id": 4, "devices": [{"id": 2, "token": "tok-b"}]},
+            {"id": 5},
+        ]
+    }
+
+    assert profile_targets(profile) == {"1-0": "tok-a", "4-2": "tok-b"}
+
+
+def test_password_hash() -> None:
+    """The password is hashed with the SHA-256 of the lowercased email."""
+    salt = hashlib.sha256(b"user@example.com").digest()
+    expected = base64.b64encode(hashlib.sha256(b"secret" + salt).digest()).decode()
+
+    assert password_hash("User@Example.com", "secret") == expected
+
+
+@pytest.mark.parametrize(
+    ("server", "url"),
+    [
+        ("raymote.raypak.com", "wss://raymote.raypak.com/websockets"),
+        ("http://127.0.0.1:8080", "ws://127.0.0.1:8080/websockets"),
+    ],
+)
+def test_stream_url(server: str, url: str) -> None:
+    """The app WebSocket URL follows the server's scheme."""
+    assert str(stream_url(server)) == url
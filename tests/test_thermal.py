@@ -0,0 +1,111 @@
+"""Tests for the learned heat-up model."""
+
+from __future__ import annotations
+
+import math
+import random
+
+import pytest
+
+from custom_components.raypak.const import THERMAL_MIN_SAMPLES, THERMAL_SAMPLE_INTERVAL
+from custom_components.raypak.thermal import ThermalModel
+
+HEATING_RATE = 3.0
+LOSS = -0.05
+OFFSET = 3.0  # settles at 60°F with the heater off
+STEP = 60
+
+
+def _simulate(model: ThermalModel, days: float, seed: int = 1) -> float:
+    """Feed the model a pool following the reference model; return the end time."""
+    rng = random.Random(seed)
+    temperature = 70.0
+    firing = 0.0
+    timestamp = 0.0
+    for step in range(int(days * 86400 / STEP)):
+        if step % 120 == 0:
+            firing = rng.choice((0.0, 0.5, 1.0))
+        model.add(timestamp, temperature, firing, True)
+        gain = HEATING_RATE * firing + OFFSET
+        equilibrium = -gain / LOSS
+        temperature = equilibrium + (temperature - equilibrium) * math.exp(
+            LOSS * STEP / 3600
+        )
+        timestamp += STEP
+    return timestamp
+
+
+@pytest.fixture(scope="module")
+def fitted() -> ThermalModel:
+    """Return a model fitted to ten days of the reference pool."""
+    model = ThermalModel()
+    _simulate(model, days=10)
+    return model
+
+
+def test_fit_recovers_parameters(fitted: ThermalModel) -> None:
+    """The fit converges on the pool's heating rate, loss and offset."""
+    assert fitted.trained
+    assert fitted.heating_rate == pytest.approx(HEATING_RATE, rel=0.05)
+    assert fitted.loss_coefficient == pytest.approx(-LOSS, rel=0.05)
+    assert fitted.diagnostics["equilibrium_temperature"] == pytest.approx(60, abs=1)
+
+
+def test_untrained_until_min_samples() -> None:
+    """The model isn't used before enough intervals were observed."""
+    model = ThermalModel()
+    _simulate(model, days=(THERMAL_MIN_SAMPLES - 1) * THERMAL_SAMPLE_INTERVAL / 86400)
+
+    assert model.samples < THERMAL_MIN_SAMPLES
+    assert not model.trained
+    assert model.time_to_target(70, 80) is None
+
+
+def test_no_flow_breaks_the_interval() -> None:
+    """Samples without flow start a fresh interval instead of averaging."""
+    model = ThermalModel()
+    model.add(0, 70, 1, True)
+    model.add(THERMAL_SAMPLE_INTERVAL / 2, 71, 1, True)
+    model.add(THERMAL_SAMPLE_INTERVAL * 0.75, 50, 0, False)
+    model.add(THERMAL_SAMPLE_INTERVAL, 72, 1, True)
+
+    assert model.samples == 0
+
+    model.add(THERMAL_SAMPLE_INTERVAL * 2, 73, 1, True)
+    assert model.samples == 1
+
+
+def test_polling_gap_breaks_the_interval() -> None:
+    """A long gap between samples isn't averaged over."""
+    model = ThermalModel()
+    model.add(0, 70, 1, True)
+    model.add(THERMAL_SAMPLE_INTERVAL * 3, 75, 1, True)
+
+    assert model.samples == 0
+
+
+def test_time_to_target(fitted: ThermalModel) -> None:
+    """The time to target follows the exponential approach to the ceiling."""
+    ceiling = -(HEATING_RATE + OFFSET) / LOSS
+    expected = math.log((ceiling - 70) / (ceiling - 80)) / -LOSS * 3600
+
+    assert fitted.time_to_target(80, 80) == 0
+    assert fitted.time_to_target(70, 80) == pytest.approx(expected, rel=0.05)
+    assert fitted.time_to_target(70, ceiling + 5) is None
+
+
+def test_temperature_after_inverts_time_to_target(fitted: ThermalModel) -> None:
+    """Firing for the predicted time reaches the target."""
+    seconds = fitted.time_to_target(70, 85)
+
+    assert fitted.temperature_after(70, 1.0, seconds) == pytest.approx(85)
+    assert fitted.temperature_after(70, 0.0, 3600) < 70
+
+
+def test_restore_round_trip(fitted: ThermalModel) -> None:
+    """A restored model predicts the same as the one it was saved from."""
+    model = ThermalModel()
+    model.restore(fitted.as_dict())
+
+    assert model.samples == fitted.samples
+    assert model.time_to_target(70, 80) == fitted.time_to_target(70, 80)
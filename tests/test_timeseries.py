@@ -0,0 +1,112 @@
+"""Tests for the sample buffers."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from custom_components.raypak.timeseries import RingBuffer, TimeSeries
+
+
+def _samples(buffer: RingBuffer) -> list[tuple[float, float]]:
+    """Return a buffer's samples, oldest first."""
+    return [buffer[index] for index in range(len(buffer))]
+
+
+def test_ring_buffer_wraps() -> None:
+    """A full buffer overwrites its oldest samples."""
+    buffer = RingBuffer(3)
+    for second in range(5):
+        buffer.append(second, second * 10)
+
+    assert len(buffer) == 3
+    assert _samples(buffer) == [(2, 20), (3, 30), (4, 40)]
+    assert buffer[-1] == (4, 40)
+    assert buffer.popleft() == (2, 20)
+    assert len(buffer) == 2
+
+
+def test_ring_buffer_index_error() -> None:
+    """Indexing past the stored samples raises IndexError."""
+    buffer = RingBuffer(4)
+    buffer.append(0, 1)
+
+    with pytest.raises(IndexError):
+        buffer[1]
+    with pytest.raises(IndexError):
+        buffer[-2]
+
+
+def test_ring_buffer_tail() -> None:
+    """The tail is one slice, or two once it wraps."""
+    buffer = RingBuffer(4)
+    assert buffer.tail(2) == []
+
+    for second in range(3):
+        buffer.append(second, second)
+    assert [list(part) for part in buffer.tail(2)] == [[1, 2]]
+
+    for second in range(3, 6):
+        buffer.append(second, second)
+    assert [list(part) for part in buffer.tail(10)] == [[2, 3], [4, 5]]
+
+
+def test_mean_is_time_weighted() -> None:
+    """Each value is weighted by how long it held."""
+    series = TimeSeries(horizon=3600)
+    series.append(0, 10)
+    series.append(10, 20)
+    series.append(30, 0)
+
+    assert series.span() == 30
+    assert series.mean() == pytest.approx((10 * 10 + 20 * 20) / 30)
+    assert series.rate() == pytest.approx(-10 / 30)
+
+
+def test_single_sample_has_no_rate() -> None:
+    """Rate and mean need samples spanning some time."""
+    series = TimeSeries(horizon=60)
+    assert series.mean() is None
+
+    series.append(0, 5)
+    assert series.mean() is None
+    assert series.rate() is None
+
+
+def test_min_interval_only_updates_latest() -> None:
+    """A sample too close to the last stored one isn't stored."""
+    series = TimeSeries(horizon=600, min_interval=30)
+    series.append(0, 1)
+    series.append(10, 100)
+
+    assert len(series) == 1
+    assert series.latest == (10, 100)
+    assert series.mean() == pytest.approx(1)
+    assert series.rate() == pytest.approx(99 / 10)
+
+    series.append(30, 4)
+    assert len(series) == 2
+
+
+def test_horizon_eviction_keeps_integral() -> None:
+    """Evicting old samples keeps the mean equal to a full recomputation."""
+    rng = random.Random(4)
+    series = TimeSeries(horizon=300, min_interval=5)
+    timestamp = 0.0
+    for _ in range(500):
+        timestamp += rng.uniform(1, 20)
+        series.append(timestamp, rng.uniform(50, 100))
+
+    stored = _samples(series._buffer)
+    assert stored[0][0] <= timestamp - series.horizon < stored[1][0]
+
+    last_time, last_value = series.latest
+    area = sum(
+        value * (next_time - time)
+        for (time, value), (next_time, _) in zip(stored, stored[1:])
+    ) + stored[-1][1] * (last_time - stored[-1][0])
+    assert series.mean() == pytest.approx(area / (last_time - stored[0][0]))
+    assert series.rate() == pytest.approx(
+        (last_value - stored[0][1]) / (last_time - stored[0][0])
+    )